@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Parsing many independent sentences on several cores"""
+
+import multiprocessing
+import os
+
+# parser and builder of the worker processes, see _init_worker()
+_parser = _builder = None
+
+
+def _init_worker(parser, builder):
+    """Pool initializer: with the fork start method, the arguments are
+    inherited by the workers rather than pickled, so the tables are
+    shared copy-on-write; otherwise they are pickled once per worker"""
+    global _parser, _builder
+    _parser, _builder = parser, builder
+
+
+def _parse(parser, builder, sentence):
+    """Value of sentence, or the NotInLanguage exception it raised;
+    builder is only passed to parser if it is not None, for the parsers
+    without builders"""
+    try:
+        if builder is None:
+            return parser.parse(sentence)
+        return parser.parse(sentence, builder)
+    except parser.NotInLanguage as err:
+        return err
+
+
+def _parse_one(sentence):
+    """_parse() with the parser and builder of a worker process"""
+    return _parse(_parser, _builder, sentence)
+
+
+def parse_many(parser, sentences, workers=None, chunksize=64, builder=None):
+    """Iterator of the values of sentences (an iterable of sentences),
+    in order, as given by parser.parse(sentence, builder), for any of
+    the parsers here; with builder=None (the default), parser.parse(
+    sentence) is called instead, so the table-driven and generated
+    parsers (LRTables, LLTables, LRCode, LLCode), which take no builder,
+    work too. GLR only takes builder=None.
+
+    Sentences that are not in the language give their NotInLanguage
+    exception instead of a value. Work is spread over a pool of worker
+    processes (by default, one per core) by chunks of chunksize
+    sentences; with workers=1, everything happens in this process.
+    Values, exceptions and sentences must be picklable."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:  # no globals here, other iterators may be running
+        for sentence in sentences:
+            yield _parse(parser, builder, sentence)
+        return
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:  # pragma: no cover
+        context = multiprocessing.get_context()
+    with context.Pool(workers, _init_worker, (parser, builder)) as pool:
+        yield from pool.imap(_parse_one, sentences, chunksize)
@@ -0,0 +1,605 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Rough benchmarks, see usage below"""
+
+from builders import Builder, FlatTree, ReductionLog, SharedTreeBuilder
+from earley import Earley
+from glr import GLR
+from grammar import Grammar
+from incremental import IncrementalParser
+from lalr import LALR
+from ll1 import LL1
+from llcode import LLCode
+from lltables import LLTables
+from lr1 import LR1
+from lrcode import LRCode
+from lrtables import LRTables
+from parse_tree import ParseTree
+from push import LL1PushParser, LRPushParser
+from slr import SLR
+from transform import Transform
+from tree_file import TreeFile, write
+from itertools import chain
+import glob
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def layered_grammar(levels):
+    """Rules for an expression grammar with one precedence level per
+    binary operator, as in [TRDB] (4.1) p. 160 but with many levels.
+    Has 2 * levels + 2 productions."""
+    rules = []
+    for i in range(levels):
+        rules.append("E{0} -> E{0} o{0} E{1} | E{1}".format(i, i + 1))
+    rules.append("E{} -> ( E0 ) | id".format(levels))
+    return rules
+
+
+def lr1_grammar(copies):
+    """Rules for an LR(1) grammar that is not LALR(1), made of copies of
+    the example p. 620 of [DP82] sharing the same E and F"""
+    rules = ["S -> " + " | ".join("X{}".format(i) for i in range(copies))]
+    for i in range(copies):
+        rules.append("X{0} -> a{0} E c{0} | a{0} F d{0} "
+                     "| b{0} F c{0} | b{0} E d{0}".format(i))
+    rules.extend(("E -> e", "F -> e"))
+    return rules
+
+
+def layered_sentence(levels, length):
+    """A sentence of the language of layered_grammar(levels)"""
+    words = ["id"]
+    for i in range(length - 1):
+        words.extend(("o{}".format(i % levels), "id"))
+    return words
+
+
+def expression_sentence(length):
+    """A sentence of at least length tokens for examples/ex-4.34"""
+    unit = "( id + id ) * id + id * ( id * id + id ) +".split()
+    words = unit * (length // len(unit) + 1)
+    words.append("id")
+    return words
+
+
+def timed(func, *args, repeat=3):
+    """Best time in seconds of repeat calls to func(*args)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_grammar(scale):
+    """Grammar init (First and Follow sets) on growing grammars"""
+    print("productions\tGrammar() (ms)\tµs / production")
+    for levels in (scale // 4, scale // 2, scale, 2 * scale):
+        rules = layered_grammar(levels)
+        nb_prods = 2 * levels + 2
+        t = timed(Grammar, rules)
+        print("{}\t{:.1f}\t{:.1f}".format(nb_prods, t * 1e3,
+                                          t * 1e6 / nb_prods))
+
+
+def peak_memory(func, *args):
+    """Peak memory allocated in KB during a call to func(*args)"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_slr(scale):
+    """SLR table construction on growing grammars"""
+    print("productions\tstates\titems\tkernel items\t"
+          "SLR() (ms)\tpeak (KB)")
+    for levels in (scale // 8, scale // 4, scale // 2, scale):
+        gram = Grammar(layered_grammar(levels))
+        t = timed(SLR, gram)
+        peak = peak_memory(SLR, gram)
+        slr = SLR(gram)
+        nb_kernel = sum(len(k) for k in slr.kernels)
+        nb_items = sum(len(s) for s in slr.ccol)
+        print("{}\t{}\t{}\t{}\t{:.1f}\t{:.0f}".format(
+            len(gram.productions), len(slr.kernels), nb_items, nb_kernel,
+            t * 1e3, peak))
+
+
+def bench_lr1(scale):
+    """States and build time (ms) of LR table generators"""
+    grammars = [(path, open(path).readlines())
+                for path in sorted(glob.glob("examples/*"))]
+    for levels in (scale // 8, scale // 2):
+        grammars.append(("layered-{}".format(levels),
+                         layered_grammar(levels)))
+    for copies in (scale // 8, scale // 2):
+        grammars.append(("lr1-{}".format(copies), lr1_grammar(copies)))
+
+    generators = (
+            ("SLR", SLR),
+            ("LALR", LALR),
+            ("LR1", LR1),
+            ("LR1-canon", lambda g: LR1(g, merge=False)),
+    )
+    print("grammar\t" + "\t".join(name for name, _ in generators))
+    for name, rules in grammars:
+        gram = Grammar(rules)
+        results = []
+        for _, gen in generators:
+            try:
+                states = len(gen(gram).kernels)
+            except SLR.GrammarNotSLR:
+                results.append("conflict")
+            else:
+                t = timed(gen, gram, repeat=1)
+                results.append("{} / {:.1f}".format(states, t * 1e3))
+        print(name + "\t" + "\t".join(results))
+
+
+def table_size(table):
+    """Approximate size in bytes of a dict table with tuple keys/values"""
+    size = sys.getsizeof(table)
+    for key, value in table.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+def bench_tables(scale):
+    """Dict tables (SLR) vs compressed tables (LRTables)"""
+    print("grammar\tdict tables (KB)\tcompressed (KB)\t"
+          "tok/s: SLR.parse\tLRTables.parse\tLRTables.recognize")
+    grammars = [("ex-4.34", open("examples/ex-4.34").readlines(),
+                 expression_sentence(scale * 4))]
+    for levels in (scale // 8, scale // 2):
+        grammars.append(("layered-{}".format(levels),
+                         layered_grammar(levels),
+                         layered_sentence(levels, scale * 4)))
+
+    for name, rules, sentence in grammars:
+        slr = SLR(Grammar(rules))
+        tables = LRTables(slr)
+        dict_kb = (table_size(slr.actions) + table_size(slr.gotos)) / 1024
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (slr.parse, tables.parse, tables.recognize)]
+        print("{}\t{:.0f}\t{:.1f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            name, dict_kb, tables.nbytes / 1024, *speeds))
+
+
+def bench_lltables(scale):
+    """Dict table (LL1) vs compiled table (LLTables), in tok/s"""
+    print("tokens\tLL1.parse\tLLTables.parse\tLL1.recognize\t"
+          "LLTables.recognize")
+    ll1 = LL1(Grammar(open("examples/ex-4.17").readlines()))
+    tables = LLTables(ll1)
+    for length in (scale * 4, scale * 40):
+        sentence = expression_sentence(length)
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (ll1.parse, tables.parse,
+                            ll1.recognize, tables.recognize)]
+        print("{}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            len(sentence), *speeds))
+
+
+def bench_llcode(scale):
+    """Table-driven (LL1, LLTables) vs recursive-descent (LLCode), in
+    tok/s; without loops, long sentences hit the recursion limit"""
+    print("tokens\tfunction\tLL1\tLLTables\tLLCode\t"
+          "LLCode(loops=False)")
+    ll1 = LL1(Grammar(open("examples/ex-4.17").readlines()))
+    parsers = (ll1, LLTables(ll1), LLCode(ll1), LLCode(ll1, loops=False))
+    for length in (scale * 4, scale * 40):
+        sentence = expression_sentence(length)
+        for name in ("parse", "recognize"):
+            speeds = []
+            for parser in parsers:
+                try:
+                    t = timed(getattr(parser, name), sentence)
+                    speeds.append("{:.0f}".format(len(sentence) / t))
+                except RecursionError:
+                    speeds.append("-")
+            print("{}\t{}\t{}".format(len(sentence), name,
+                                      "\t".join(speeds)))
+
+
+def bench_code(scale):
+    """Table-driven (LRTables) vs direct-coded (LRCode) parsers"""
+    print("grammar\tLRCode() (ms)\tsource (KB)\ttok/s: LRTables.parse\t"
+          "LRCode.parse\tLRTables.recognize\tLRCode.recognize")
+    grammars = [("ex-4.34", open("examples/ex-4.34").readlines(),
+                 expression_sentence(scale * 40))]
+    for levels in (scale // 8, scale // 2):
+        grammars.append(("layered-{}".format(levels),
+                         layered_grammar(levels),
+                         layered_sentence(levels, scale * 4)))
+
+    for name, rules, sentence in grammars:
+        slr = SLR(Grammar(rules))
+        tables = LRTables(slr)
+        t = timed(LRCode, slr, repeat=1)
+        code = LRCode(slr)
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (tables.parse, code.parse,
+                            tables.recognize, code.recognize)]
+        print("{}\t{:.1f}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            name, t * 1e3, len(code.source) / 1024, *speeds))
+
+
+def bench_builders(scale):
+    """Parse trees vs no values (Builder) vs recognize(), in tok/s"""
+    print("parser\tparse()\tparse(builder)\trecognize()")
+    sentence = expression_sentence(scale * 40)
+    for name, parser_class, path in (("SLR", SLR, "examples/ex-4.34"),
+                                     ("LL1", LL1, "examples/ex-4.17")):
+        parser = parser_class(Grammar(open(path).readlines()))
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (parser.parse,
+                            lambda s: parser.parse(s, Builder()),
+                            parser.recognize)]
+        print("{}\t{:.0f}\t{:.0f}\t{:.0f}".format(name, *speeds))
+
+
+def bench_log(scale):
+    """Parse trees vs reduction logs (ReductionLog) with SLR"""
+    print("tokens\ttree (KB)\tlog (KB)\ttok/s: tree\tlog\t"
+          "log + unparse()")
+    slr = SLR(Grammar(open("examples/ex-4.34").readlines()))
+
+    def log_parse(sentence):
+        return slr.parse(sentence, ReductionLog(slr.g))
+
+    for length in (scale * 4, scale * 40):
+        sentence = expression_sentence(length)
+        sizes = [peak_memory(f, sentence) for f in (slr.parse, log_parse)]
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (slr.parse, log_parse,
+                            lambda s: log_parse(s).unparse())]
+        print("{}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            len(sentence), *sizes, *speeds))
+
+
+def bench_flat(scale):
+    """Parse trees (ParseTree nodes) vs flat trees (FlatTree) with SLR"""
+    print("tokens\tnodes\ttree (KB)\tflat (KB)\ttok/s: tree\tflat\t"
+          "flat + unparse()")
+    slr = SLR(Grammar(open("examples/ex-4.34").readlines()))
+
+    def flat_parse(sentence):
+        flat = FlatTree(slr.g)
+        slr.parse(sentence, flat)
+        return flat
+
+    for length in (scale * 4, scale * 40):
+        sentence = expression_sentence(length)
+        nodes = len(flat_parse(sentence))
+        sizes = [peak_memory(f, sentence) for f in (slr.parse, flat_parse)]
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (slr.parse, flat_parse,
+                            lambda s: flat_parse(s).unparse())]
+        print("{}\t{}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            len(sentence), nodes, *sizes, *speeds))
+
+
+def comb_tree(nodes):
+    """Parse tree for examples/a-star with about nodes nodes: as deep
+    as it is big"""
+    tree = ParseTree("S", [ParseTree("")])
+    for _ in range(nodes // 2):
+        tree = ParseTree("S", [ParseTree("a"), tree])
+    return tree
+
+
+def balanced_tree(nodes):
+    """Parse tree for examples/ambiguous with about nodes nodes, as
+    shallow as possible"""
+    trees = [ParseTree("E", [ParseTree("id")]) for _ in range(nodes // 4)]
+    while len(trees) > 1:
+        pairs = zip(trees[::2], trees[1::2])
+        trees = [ParseTree("E", [left, ParseTree("+"), right])
+                 for left, right in pairs] + trees[len(trees) & ~1:]
+    return trees[0]
+
+
+def bench_traversal(scale):
+    """Traversals of big trees, written to /dev/null: time (ms), and
+    peak memory (KB) on top of the tree; the output of write_lines() is
+    quadratic on deep trees, and full derivations (rightmost()) always
+    are, so they are only run on small ones"""
+    print("tree\tnodes\tms: unparse()\twrite_steps()\twrite_lines()\t"
+          "rightmost()\tKB: write_steps()\twrite_lines()")
+
+    def derivation(tree, out):
+        out.writelines(form + "\n" for form in tree.rightmost())
+
+    with open(os.devnull, "w") as out:
+        for nodes in (scale * 200, scale * 2000):
+            for name, tree in (("balanced", balanced_tree(nodes)),
+                               ("comb", comb_tree(nodes))):
+                nb_nodes = sum(1 for _ in chain(tree.steps(), tree.leaves()))
+                cells = ["{:.0f}".format(timed(tree.unparse, repeat=1) * 1e3),
+                         "{:.0f}".format(timed(tree.write_steps, out,
+                                               repeat=1) * 1e3)]
+                small = nb_nodes <= 20000
+                quadratic = ((tree.write_lines, small or name == "balanced"),
+                             (lambda o: derivation(tree, o), small))
+                for func, run in quadratic:
+                    cells.append("{:.0f}".format(timed(func, out, repeat=1)
+                                                 * 1e3) if run else "-")
+                for func, run in ((tree.write_steps, True), quadratic[0]):
+                    cells.append("{:.0f}".format(peak_memory(func, out))
+                                 if run else "-")
+                print("{}\t{}\t{}".format(name, nb_nodes, "\t".join(cells)))
+
+
+def bench_tree_file(scale):
+    """Pickled trees vs tree files (TreeFile): size in KB, and time in
+    ms to save, load, and get the sentence back"""
+    print("nodes\tKB: pickle\tfile\tms: pickle.dump()\twrite()\t"
+          "pickle.load()\tTreeFile()\t+ unparse()\t+ root.unparse()")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tree")
+        for nodes in (scale * 200, scale * 2000):
+            tree = balanced_tree(nodes)
+            with open(path + ".pickle", "wb") as out:
+                dump_time = timed(pickle.dump, tree, out, repeat=1)
+            with open(path, "wb") as out:
+                write_time = timed(write, tree, out, repeat=1)
+            sizes = [os.path.getsize(p) / 1024
+                     for p in (path + ".pickle", path)]
+
+            def load():
+                with open(path + ".pickle", "rb") as f:
+                    return pickle.load(f)
+
+            def unparse(view):
+                with TreeFile(path) as tree_file:
+                    tree = tree_file.root if view else tree_file
+                    return tree.unparse()
+
+            times = [dump_time, write_time]
+            times.extend(timed(f, *args) for f, args in (
+                    (load, ()), (lambda: TreeFile(path).close(), ()),
+                    (unparse, (False,)), (unparse, (True,))))
+            with TreeFile(path) as tree_file:
+                nb_nodes = len(tree_file)
+            print("{}\t{:.0f}\t{:.0f}\t{}".format(
+                    nb_nodes, *sizes,
+                    "\t".join("{:.1f}".format(t * 1e3) for t in times)))
+
+
+def bench_shared(scale):
+    """Parse trees vs hash-consed ones (SharedTreeBuilder): nodes kept,
+    peak KB and tok/s"""
+    print("parser\ttokens\tshared nodes\tKB: tree\tshared\t"
+          "tok/s: tree\tshared")
+    for name, parser_class, path in (("SLR", SLR, "examples/ex-4.34"),
+                                     ("LL1", LL1, "examples/ex-4.17")):
+        parser = parser_class(Grammar(open(path).readlines()))
+
+        def shared_parse(sentence):
+            return parser.parse(sentence, SharedTreeBuilder())
+
+        for length in (scale * 4, scale * 40):
+            sentence = expression_sentence(length)
+            builder = SharedTreeBuilder()
+            parser.parse(sentence, builder)
+            sizes = [peak_memory(f, sentence)
+                     for f in (parser.parse, shared_parse)]
+            speeds = [len(sentence) / timed(f, sentence)
+                      for f in (parser.parse, shared_parse)]
+            print("{}\t{}\t{}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+                    name, len(sentence), len(builder), *sizes, *speeds))
+
+
+def bench_push(scale):
+    """Pull (parse()) vs push parsers, in tok/s"""
+    print("parser\tparse()\tfeed(sentence)\tfeed() by token")
+    sentence = expression_sentence(scale * 40)
+    for name, parser_class, push_class, path in (
+            ("SLR", SLR, LRPushParser, "examples/ex-4.34"),
+            ("LL1", LL1, LL1PushParser, "examples/ex-4.17")):
+        parser = parser_class(Grammar(open(path).readlines()))
+
+        def push_all(sentence):
+            push = push_class(parser)
+            push.feed(sentence)
+            return push.feed_end()
+
+        def push_each(sentence):
+            push = push_class(parser)
+            for token in sentence:
+                push.feed((token,))
+            return push.feed_end()
+
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (parser.parse, push_all, push_each)]
+        print("{}\t{:.0f}\t{:.0f}\t{:.0f}".format(name, *speeds))
+
+
+def bench_incremental(scale):
+    """Reparsing after replacing one id with ( id ) on ex-4.34"""
+    print("tokens\tedit at\tparse() (ms)\treparse() (ms)\tshifted")
+    slr = SLR(Grammar(open("examples/ex-4.34").readlines()))
+    inc = IncrementalParser(slr)
+    for length in (scale * 4, scale * 40):
+        sentence = expression_sentence(length)
+        tree = inc.parse(sentence)
+        t_parse = timed(slr.parse, sentence)
+        for where in (0, len(sentence) // 2, len(sentence) - 2):
+            i = sentence.index("id", where)
+            new = sentence[:i] + ["(", "id", ")"] + sentence[i + 1:]
+            t = timed(inc.reparse, tree, (i, i + 1, i + 3), new)
+            print("{}\t{}\t{:.1f}\t{:.1f}\t{}".format(
+                len(sentence), i, t_parse * 1e3, t * 1e3, inc.nb_shifted))
+
+
+def bench_batch(scale):
+    """parse_many() with one and several processes, in sentences/s"""
+    nb_workers = max(2, os.cpu_count() or 1)
+    print("parser\tvalues\t1 process\t{} processes".format(nb_workers))
+    sentences = [expression_sentence(20)] * (scale * 20)
+    for name, parser_class, path in (("SLR", SLR, "examples/ex-4.34"),
+                                     ("LL1", LL1, "examples/ex-4.17")):
+        parser = parser_class(Grammar(open(path).readlines()))
+        for values, builder in (("trees", None), ("none", Builder())):
+            speeds = []
+            for workers in (1, nb_workers):
+                t = timed(lambda s: list(parser.parse_many(
+                    s, workers, builder=builder)), sentences, repeat=1)
+                speeds.append(len(sentences) / t)
+            print("{}\t{}\t{:.0f}\t{:.0f}".format(name, values, *speeds))
+
+
+def bench_prec(scale):
+    """Layered (ex-4.34) vs ambiguous grammar with precedence"""
+    print("grammar\tstates\treductions / token\ttok/s: parse()\t"
+          "recognize()\tLRTables.recognize()")
+    sentence = expression_sentence(scale * 40)
+    ambiguous = open("examples/ambiguous").readlines()
+    for name, rules in (
+            ("ex-4.34", open("examples/ex-4.34").readlines()),
+            ("ambiguous + %left", ["%left +", "%left *"] + ambiguous)):
+        slr = SLR(Grammar(rules))
+        log = slr.parse(sentence, ReductionLog(slr.g))
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (slr.parse, slr.recognize,
+                            LRTables(slr).recognize)]
+        print("{}\t{}\t{:.2f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            name, len(slr.kernels), len(log) / len(sentence), *speeds))
+
+
+def bench_units(scale):
+    """SLR.parse() with and without unit reductions (unit_chains)"""
+    print("grammar\tunits\treduce() calls / token\ttok/s: parse()\t"
+          "parse(builder=Builder())")
+    grammars = [("ex-4.34", open("examples/ex-4.34").readlines(),
+                 expression_sentence(scale * 40))]
+    levels = scale // 8
+    grammars.append(("layered-{}".format(levels), layered_grammar(levels),
+                     layered_sentence(levels, scale * 4)))
+
+    for name, rules, sentence in grammars:
+        slr = SLR(Grammar(rules))
+        for units in ("reduce", "keep", "collapse"):
+            log = slr.parse(sentence, ReductionLog(slr.g), units)
+            speeds = [len(sentence) / timed(
+                lambda s: slr.parse(s, builder, units), sentence)
+                for builder in (None, Builder())]
+            print("{}\t{}\t{:.2f}\t{:.0f}\t{:.0f}".format(
+                name, units, len(log) / len(sentence), *speeds))
+
+
+def bench_earley(scale):
+    """Earley vs SLR on grammars both accept, in tok/s"""
+    print("grammar\ttokens\titems / token\ttok/s: SLR\tEarley\t"
+          "Earley.recognize()")
+    levels = max(scale // 50, 2)
+    grammars = (
+            ("ex-4.34", open("examples/ex-4.34").readlines(),
+             expression_sentence(scale * 8)),
+            ("layered-{}".format(levels), layered_grammar(levels),
+             layered_sentence(levels, scale * 2)),
+            ("a-star", open("examples/a-star").readlines(),
+             ["a"] * scale * 8),
+            ("a-star", open("examples/a-star").readlines(),
+             ["a"] * scale * 32))
+    for name, rules, sentence in grammars:
+        g = Grammar(rules)
+        slr, earley = SLR(g), Earley(g)
+        earley.recognize(sentence)
+        speeds = [len(sentence) / timed(f, sentence)
+                  for f in (slr.parse, earley.parse, earley.recognize)]
+        print("{}\t{}\t{:.2f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+            name, len(sentence), earley.nb_items / len(sentence), *speeds))
+
+
+def bench_glr(scale):
+    """GLR vs SLR on ex-4.34, and GLR on the ambiguous grammar"""
+    print("grammar\ttokens\tparse trees\ttok/s: SLR\tGLR")
+    sentence = expression_sentence(scale * 4)
+    rules = open("examples/ex-4.34").readlines()
+    slr, glr = SLR(Grammar(rules)), GLR(Grammar(rules))
+    speeds = [len(sentence) / timed(p.parse, sentence) for p in (slr, glr)]
+    print("ex-4.34\t{}\t1\t{:.0f}\t{:.0f}".format(len(sentence), *speeds))
+
+    # Catalan numbers of trees, but polynomial time: about n^3 here
+    glr = GLR(Grammar(open("examples/ambiguous").readlines()))
+    for ids in (4, 8, 16, 32)[:2 if scale < 100 else 4]:
+        sentence = " + ".join(["id"] * ids).split()
+        count = glr.parse(sentence).count()
+        print("ambiguous\t{}\t{}\t-\t{:.0f}".format(
+            len(sentence), count, len(sentence) / timed(glr.parse, sentence)))
+
+
+def bench_transform(scale):
+    """SLR on ex-4.34 vs LL(1) parsers for its transformed grammar, with
+    trees in the shape of ex-4.34, in tok/s"""
+    print("tokens\tfunction\tSLR\tLL1\tLLTables\tLLCode")
+    slr = SLR(Grammar(open("examples/ex-4.34").readlines()))
+    transform = Transform(slr.g)
+    ll1 = LL1(transform.grammar)
+    tables, code = LLTables(ll1), LLCode(ll1)
+    for length in (scale * 4, scale * 40):
+        sentence = expression_sentence(length)
+        parses = (slr.parse,
+                  lambda s: ll1.parse(s, transform.builder()),
+                  lambda s: transform.restore(tables.parse(s)),
+                  lambda s: transform.restore(code.parse(s)))
+        recognizes = (slr.recognize, ll1.recognize, tables.recognize,
+                      code.recognize)
+        for name, funcs in (("parse", parses), ("recognize", recognizes)):
+            speeds = [len(sentence) / timed(f, sentence) for f in funcs]
+            print("{}\t{}\t{:.0f}\t{:.0f}\t{:.0f}\t{:.0f}".format(
+                len(sentence), name, *speeds))
+
+
+BENCHES = {
+        "batch": bench_batch,
+        "builders": bench_builders,
+        "code": bench_code,
+        "earley": bench_earley,
+        "flat": bench_flat,
+        "glr": bench_glr,
+        "grammar": bench_grammar,
+        "incremental": bench_incremental,
+        "llcode": bench_llcode,
+        "lltables": bench_lltables,
+        "log": bench_log,
+        "lr1": bench_lr1,
+        "prec": bench_prec,
+        "push": bench_push,
+        "shared": bench_shared,
+        "slr": bench_slr,
+        "tables": bench_tables,
+        "traversal": bench_traversal,
+        "tree_file": bench_tree_file,
+        "transform": bench_transform,
+        "units": bench_units,
+}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    args = sys.argv[1:]
+    scale = 500
+    if args and args[0] == "--quick":
+        args.pop(0)
+        scale = 8
+
+    if not set(args) <= set(BENCHES):
+        usage = "Usage: bench.py [--quick] [{}]...\n"
+        sys.stderr.write(usage.format("|".join(sorted(BENCHES))))
+        sys.exit(1)
+
+    for name in args or sorted(BENCHES):
+        print("{}: {}".format(name, BENCHES[name].__doc__))
+        BENCHES[name](scale)
+        print()
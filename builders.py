@@ -0,0 +1,273 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Builders: what parsers make of the tokens and reductions they see
+
+A builder has two methods, called by the parsers as they go:
+- shift(token) returns the value of a token;
+- reduce(prod_nb, lhs, values) returns the value of a non-terminal lhs
+  derived with production number prod_nb, given the values of the
+  symbols of its right-hand side (in order, empty for an ε-production).
+The parsers return the value of the start symbol.
+"""
+
+from array import array
+from collections import OrderedDict
+from parse_tree import ParseTree, TreeView
+
+
+class Builder:
+    """Base class for builders (or visitors): tokens are their own value,
+    non-terminals have no value"""
+
+    def shift(self, token):
+        return token
+
+    def reduce(self, prod_nb, lhs, values):
+        return None
+
+
+class TreeBuilder(Builder):
+    """Build ParseTree nodes, the default for all parsers"""
+
+    def shift(self, token):
+        return ParseTree(token)
+
+    def reduce(self, prod_nb, lhs, values):
+        return ParseTree(lhs, values or [ParseTree('')])
+
+
+class SharedTreeBuilder(Builder):
+    """Build ParseTree nodes with hash-consing: identical leaves and
+    subtrees are the same node, so trees are DAGs, whose size grows with
+    the number of distinct subtrees rather than the length of sentences
+
+    Nodes are interned in a table, also shared by the following parses,
+    holding at most maxsize of them (None for no limit): the least
+    recently used ones are dropped first, and only lose their sharing.
+    Shared nodes must not be modified, and are not suited to tools that
+    tell nodes apart by identity, like IncrementalParser."""
+
+    def __init__(self, maxsize=1 << 16):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        # token -> leaf, and (lhs, ids of children) -> node: the node
+        # keeps its children alive, so their ids are not reused while
+        # its key is in the table
+        self._table = OrderedDict()
+
+    def __len__(self):
+        return len(self._table)
+
+    def _intern(self, key, symbol, children):
+        """Node from the table for key, or a new one"""
+        table = self._table
+        node = table.get(key)
+        if node is not None:
+            self.hits += 1
+            table.move_to_end(key)
+            return node
+        self.misses += 1
+        node = table[key] = ParseTree(symbol, children)
+        if self.maxsize is not None and len(table) > self.maxsize:
+            table.popitem(last=False)
+        return node
+
+    def shift(self, token):
+        return self._intern(token, token, None)
+
+    def reduce(self, prod_nb, lhs, values):
+        if not values:
+            values = [self.shift('')]
+        key = (lhs,) + tuple(map(id, values))
+        return self._intern(key, lhs, values)
+
+
+class Actions(Builder):
+    """Builder calling a function for each production, yacc-style
+
+    actions maps productions to functions taking the values of the
+    right-hand side as arguments and returning the value of the
+    left-hand side. Productions are given either by number, as a string
+    "lhs -> rhs" (see Grammar.pprod()), or by left-hand side for all of
+    its productions; the more specific wins. Productions without an
+    action get the value of their first symbol, or None if empty."""
+
+    def __init__(self, grammar, actions):
+        by_string = {grammar.pprod(i): i
+                     for i in range(len(grammar.productions))}
+        self._actions = [None] * len(grammar.productions)
+        for kind in (str, int):  # lhs and productions, then numbers
+            for key, func in actions.items():
+                if not isinstance(key, kind):
+                    continue
+                if key in by_string:
+                    self._actions[by_string[key]] = func
+                elif key in grammar.productions_by_lhs:
+                    for i in grammar.productions_by_lhs[key]:
+                        if self._actions[i] is None:
+                            self._actions[i] = func
+                elif kind is int and 0 <= key < len(self._actions):
+                    self._actions[key] = func
+                else:
+                    raise KeyError("Unknown production: {!r}".format(key))
+
+    def reduce(self, prod_nb, lhs, values):
+        func = self._actions[prod_nb]
+        if func is not None:
+            return func(*values)
+        return values[0] if values else None
+
+
+class ReductionLog(Builder):
+    """Compact parse result: the production numbers in reduction order
+    (the reversed rightmost derivation), from which trees, derivations
+    and the sentence are rebuilt on demand
+
+    Used as a builder, it is also the value of every non-terminal, so
+    parse(sentence, ReductionLog(grammar)) returns it; use a new one for
+    each parse. positions[i] is the number of tokens read before the
+    i-th reduction, ie the end of the span of its left-hand side."""
+
+    def __init__(self, grammar):
+        self.g = grammar
+        self.prods = array('i')
+        self.positions = array('i')
+        self.nb_tokens = 0
+
+    def shift(self, token):
+        self.nb_tokens += 1
+
+    def reduce(self, prod_nb, lhs, values):
+        self.prods.append(prod_nb)
+        self.positions.append(self.nb_tokens)
+        return self
+
+    def __len__(self):
+        return len(self.prods)
+
+    @property
+    def nbytes(self):
+        """Size of the log in bytes"""
+        return sum(a.itemsize * len(a) for a in (self.prods, self.positions))
+
+    def tree(self):
+        """The parse tree, as given by TreeBuilder"""
+        productions = self.g.productions
+        non_terminals = self.g.non_terminals
+        nodes = []  # of the non-terminals reduced so far
+        for prod_nb in self.prods:
+            lhs, rhs = productions[prod_nb]
+            nb_nts = sum(s in non_terminals for s in rhs)
+            nts = iter(nodes[len(nodes) - nb_nts:])
+            del nodes[len(nodes) - nb_nts:]
+            children = [next(nts) if s in non_terminals else ParseTree(s)
+                        for s in rhs]
+            nodes.append(ParseTree(lhs, children or [ParseTree('')]))
+        return nodes[-1]
+
+    def _expand(self):
+        """Iterator over the steps of the rightmost derivation, as
+        (prefix, symbol, suffix) where symbol is the non-terminal to be
+        expanded next (None at the end), prefix the symbols before it
+        and suffix the final symbols after it, in reverse order and with
+        '' for ε; prefix and suffix are not copied"""
+        productions = self.g.productions
+        non_terminals = self.g.non_terminals
+        prods = reversed(self.prods)
+        prefix = [self.g.start_symbol]
+        suffix = []
+        while prefix:
+            sym = prefix.pop()
+            if sym in non_terminals:
+                yield prefix, sym, suffix
+                prefix.extend(productions[next(prods)][1] or ('',))
+            else:
+                suffix.append(sym)
+        yield prefix, None, suffix
+
+    def rightmost(self):
+        """Iterator of steps in a rightmost derivation, as given by
+        ParseTree.rightmost()"""
+        for prefix, sym, suffix in self._expand():
+            middle = [sym] if sym is not None else []
+            yield " ".join(prefix + middle + suffix[::-1])
+
+    def unparse(self):
+        """Return the sentence that was parsed"""
+        for _, _, suffix in self._expand():
+            pass
+        return " ".join(s for s in reversed(suffix) if s)
+
+
+class FlatTree(Builder):
+    """Compact parse tree as a struct of arrays, built directly by the
+    parsers: node i has symbol id symbols[i] (see Grammar.symbol_ids),
+    its first child first_child[i] and its next sibling next_sibling[i],
+    -1 meaning none. Nodes are numbered in the order they are built,
+    children before their parent, so the root is the last one.
+
+    Used as a builder, the value of each node is its number; use a new
+    FlatTree for each parse. view(i) is a ParseTree for node i, reading
+    the arrays on demand, and root is the view of the last node. Symbol
+    id 1 is '', for ε leaves."""
+
+    def __init__(self, grammar):
+        self.g = grammar
+        self.symbol_names = grammar.symbol_names
+        self._ids = grammar.symbol_ids
+        self.symbols = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+
+    def shift(self, token):
+        self.symbols.append(self._ids[token])
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        return len(self.symbols) - 1
+
+    def reduce(self, prod_nb, lhs, values):
+        if not values:
+            values = (self.shift(''),)
+        next_sibling = self.next_sibling
+        for i in range(len(values) - 1):
+            next_sibling[values[i]] = values[i + 1]
+        self.symbols.append(self._ids[lhs])
+        self.first_child.append(values[0])
+        self.next_sibling.append(-1)
+        return len(self.symbols) - 1
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def nbytes(self):
+        """Size of the arrays in bytes"""
+        return sum(a.itemsize * len(a) for a in (
+                self.symbols, self.first_child, self.next_sibling))
+
+    def unparse(self):
+        """Return the sentence that was parsed: the leaves, which are
+        built in order"""
+        names = self.symbol_names
+        return " ".join(names[s] for s, c in zip(self.symbols,
+                                                 self.first_child)
+                        if c < 0 and s != 1)
+
+    def child_indexes(self, index):
+        """Numbers of the children of node number index"""
+        children = []
+        child = self.first_child[index]
+        while child >= 0:
+            children.append(child)
+            child = self.next_sibling[child]
+        return children
+
+    def view(self, index):
+        """ParseTree for node number index"""
+        return TreeView(self, index)
+
+    @property
+    def root(self):
+        """ParseTree for the last node built, the root after a parse"""
+        return TreeView(self, len(self.symbols) - 1)
@@ -0,0 +1,284 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+from batch import parse_many
+from builders import TreeBuilder
+
+# tags of the children of a node, see Earley._children()
+_SHIFT, _ITEM, _NODE = range(3)
+
+
+class Earley:
+    """Earley parser [Earley: An Efficient Context-Free Parsing Algorithm,
+    CACM 13(2), 1970], for any grammar
+
+    Nullable non-terminals are handled as in [Aycock, Horspool: Practical
+    Earley Parsing, The Computer Journal 45(6), 2002]: the dot moves over
+    them as they are predicted. Right recursion takes linear time thanks
+    to [Leo: A General Context-Free Parsing Algorithm Running in Linear
+    Time on Every LR(k) Grammar Without Using Lookahead, TCS 82(1), 1991]:
+    when an item is the only one waiting for a non-terminal, and completes
+    with it, only the topmost item of such a chain is added.
+
+    Items are (dotted rule, origin) pairs of ints. Each Earley set maps
+    its items to the way they were first derived, and indexes them by
+    the symbol after their dot, so completion and scanning only look at
+    the items they advance."""
+
+    def __init__(self, grammar):
+        """Generate Earley parser corresponding to a Grammar object"""
+        self.g = grammar
+        g = self.g
+        self.nb_items = 0  # items in the Earley sets of the last parse
+
+        # dotted rules, numbered in order, with the symbol after the dot
+        # (-1 when complete), the production and its lhs
+        self._next, self._prod, self._lhs, self._dot = [], [], [], []
+        self._starts = {n: [] for n in range(g.first_nt_id,
+                                             len(g.symbol_names))}
+        for i, (lhs, rhs) in enumerate(g.int_productions):
+            self._starts[lhs].append(len(self._next))
+            for dot in range(len(rhs) + 1):
+                self._next.append(rhs[dot] if dot < len(rhs) else -1)
+                self._prod.append(i)
+                self._lhs.append(lhs)
+                self._dot.append(dot)
+        self._last = [dot == len(g.int_productions[p][1]) - 1
+                      for p, dot in zip(self._prod, self._dot)]
+        self._nullable = {g.symbol_ids[n] for n in g.nullable}
+        self._start_id = g.symbol_ids[g.start_symbol]
+
+        # derivation of ε for each nullable non-terminal, as a node
+        self._empty = {}
+        while len(self._empty) < len(self._nullable):
+            for i, (lhs, rhs) in enumerate(g.int_productions):
+                if lhs not in self._empty and all(
+                        s in self._empty for s in rhs):
+                    self._empty[lhs] = (_NODE, i,
+                                        [self._empty[s] for s in rhs])
+
+    class NotInLanguage(ValueError):
+        pass
+
+    def _recognize(self, sentence):
+        """Earley sets for sentence: a list of dicts mapping items to
+        their first derivation, and a list of dicts mapping each symbol
+        to the items waiting for it; raise NotInLanguage if sentence is
+        not in the language"""
+        ids = self.g.symbol_ids
+        first_nt = self.g.first_nt_id
+        next_sym, lhs_of, starts = self._next, self._lhs, self._starts
+        nullable = self._nullable
+        tokens = list(sentence)
+
+        items = {(r, 0): None for r in starts[self._start_id]}
+        sets, waitings, leos = [], [], []
+        for i in range(len(tokens) + 1):
+            token = tokens[i] if i < len(tokens) else self.g.END
+            token_id = ids[token] if token in self.g.terminals else -1
+            waiting = {}
+            sets.append(items)
+            waitings.append(waiting)
+            leos.append({self._start_id: None} if i == 0 else {})
+            predicted = set()
+
+            worklist = list(items)
+            for key in worklist:
+                r, origin = key
+                sym = next_sym[r]
+                if sym < 0:  # completion, ε ones are done by prediction
+                    if origin == i:
+                        continue
+                    top = self._leo(origin, lhs_of[r], waitings, leos)
+                    if top is not None:
+                        if top not in items:
+                            items[top] = (None, key)
+                            worklist.append(top)
+                        continue
+                    waiting_lhs = waitings[origin].get(lhs_of[r], ())
+                    for w_rule, w_origin in waiting_lhs:
+                        new = (w_rule + 1, w_origin)
+                        if new not in items:
+                            items[new] = (origin, key)
+                            worklist.append(new)
+                elif sym >= first_nt:  # prediction
+                    if sym in waiting:
+                        waiting[sym].append(key)
+                    else:
+                        waiting[sym] = [key]
+                    if sym not in predicted:
+                        predicted.add(sym)
+                        for start in starts[sym]:
+                            new = (start, i)
+                            if new not in items:
+                                items[new] = None
+                                worklist.append(new)
+                    if sym in nullable:
+                        new = (r + 1, origin)
+                        if new not in items:
+                            items[new] = (i, None)
+                            worklist.append(new)
+                elif sym == token_id:  # ready for scanning
+                    if sym in waiting:
+                        waiting[sym].append(key)
+                    else:
+                        waiting[sym] = [key]
+
+            if i < len(tokens):
+                items = {(r + 1, origin): (i, None)
+                         for r, origin in waiting.get(token_id, ())}
+                if not items:
+                    msg = "After {} tokens, got '{}'".format(i, token)
+                    raise self.NotInLanguage(msg)
+
+        self.nb_items = sum(map(len, sets))
+        for r in starts[self._start_id]:
+            while next_sym[r] >= 0:
+                r += 1
+            if (r, 0) in items:
+                return sets, waitings, (r, 0)
+        msg = "After {} tokens, got '{}'".format(len(tokens), self.g.END)
+        raise self.NotInLanguage(msg)
+
+    def _leo(self, j, symbol, waitings, leos):
+        """Topmost item of the chain of items that complete when symbol
+        does from set j, each being the only item waiting for the lhs of
+        the previous one, with it as its last symbol; None if there is
+        no such chain. Results are memorised in leos, for each set."""
+        chain = []
+        seen = set()
+        top = None
+        while True:
+            memo = leos[j]
+            if symbol in memo:
+                top = memo[symbol]
+                break
+            waiting = waitings[j].get(symbol)
+            if not waiting or len(waiting) > 1 or \
+                    not self._last[waiting[0][0]] or (j, symbol) in seen:
+                memo[symbol] = None
+                break
+            seen.add((j, symbol))
+            item = waiting[0]
+            chain.append((memo, symbol, item))
+            j, symbol = item[1], self._lhs[item[0]]
+
+        for memo, symbol, (rule, origin) in reversed(chain):
+            if top is None:
+                top = (rule + 1, origin)
+            memo[symbol] = top
+        return top
+
+    def _children(self, sets, waitings, key, e):
+        """Children for the symbols before the dot of item key of set e:
+        (_SHIFT, token), (_ITEM, item key, set) for a non-terminal derived
+        as a complete item, or (_NODE, production number, children) for
+        a non-terminal derived with production number"""
+        names = self.g.symbol_names
+        first_nt = self.g.first_nt_id
+        children = []
+        rule, origin = key
+        while self._dot[rule]:
+            k, child = sets[e][key]
+            sym = self._next[rule - 1]
+            if k is None:
+                k, child = self._chain(sets, waitings, key, child, e)
+            elif child is not None:
+                child = (_ITEM, child, e)
+            elif sym < first_nt:
+                child = (_SHIFT, names[sym])
+            else:
+                child = self._empty[sym]
+            children.append(child)
+            rule -= 1
+            key, e = (rule, origin), k
+        children.reverse()
+        return children
+
+    def _chain(self, sets, waitings, top, bottom, e):
+        """Last child of item top of set e, added as the top of the chain
+        starting with item bottom (see _leo()), and the set where its
+        derivation starts"""
+        node = (_ITEM, bottom, e)
+        j, symbol = bottom[1], self._lhs[bottom[0]]
+        while True:
+            rule, origin = item = waitings[j][symbol][0]
+            if (rule + 1, origin) == top:
+                return j, node
+            children = self._children(sets, waitings, item, j)
+            children.append(node)
+            node = (_NODE, self._prod[rule], children)
+            j, symbol = origin, self._lhs[rule]
+
+    def parse(self, sentence, builder=None):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, return the value built for it by
+          builder (see builders.py): by default, one of its parse trees
+        - otherwise, raise NotInLanguage"""
+        if builder is None:
+            builder = TreeBuilder()
+        productions = self.g.productions
+        sets, waitings, key = self._recognize(sentence)
+        n = len(sets) - 1
+
+        # depth-first, with an explicit stack of nodes being built:
+        # (production number, iterator of children, values of children)
+        stack = [(self._prod[key[0]],
+                  iter(self._children(sets, waitings, key, n)), [])]
+        while True:
+            prod_nb, children, values = stack[-1]
+            for child in children:
+                if child[0] == _SHIFT:
+                    values.append(builder.shift(child[1]))
+                elif child[0] == _ITEM:
+                    rule = child[1][0]
+                    stack.append((self._prod[rule], iter(self._children(
+                            sets, waitings, child[1], child[2])), []))
+                    break
+                else:
+                    stack.append((child[1], iter(child[2]), []))
+                    break
+            else:
+                stack.pop()
+                value = builder.reduce(prod_nb, productions[prod_nb][0],
+                                       values)
+                if not stack:
+                    return value
+                stack[-1][2].append(value)
+
+    def recognize(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, do nothing,
+        - otherwise, raise NotInLanguage"""
+        self._recognize(sentence)
+
+    def parse_many(self, sentences, workers=None, chunksize=64,
+                   builder=None):
+        """Iterator of the values of sentences, in order, using several
+        processes; see batch.parse_many()"""
+        return parse_many(self, sentences, workers, chunksize, builder)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from grammar import Grammar
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.stderr.write("Usage: earley.py grammar_file string_to_parse\n")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as gram_in:
+        earley = Earley(Grammar(gram_in))
+
+    try:
+        tree = earley.parse(sys.argv[2].split())
+    except Earley.NotInLanguage as err:
+        sys.stderr.write("Sentence not in language:\n{}\n".format(err))
+        sys.exit(1)
+
+    print("Parse tree:")
+    tree.write_lines(sys.stdout)
+    print()
+
+    print("Rightmost derivation:")
+    print(" -> ".join(tree.rightmost()))
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Write parsers as standalone Python modules, with pre-computed tables
+
+The generated modules only depend on parse_tree.py, and define:
+- NotInLanguage, raised by the functions below on invalid sentences;
+- parse(sentence), returning a ParseTree;
+- recognize(sentence), returning None.
+Table-driven modules also define Tables, and the functions of lrtables.py
+or lltables.py that parse with them, copied from their source.
+"""
+
+from llcode import LLCode
+import inspect
+import lltables
+import lrtables
+import textwrap
+
+
+def _literal(name, values):
+    """Assignment of a tuple literal in a class body, wrapped to fit in
+    79 columns"""
+    body = textwrap.fill(", ".join(map(repr, values)) + ",", 71,
+                         initial_indent="        ",
+                         subsequent_indent="        ",
+                         break_long_words=False, break_on_hyphens=False)
+    return "    {} = (\n{}\n    )\n".format(name, body)
+
+
+def _tables(doc, tables, attributes):
+    """Class Tables, with doc and the given attributes of tables, as
+    needed by their parse_tables() and recognize_tables() functions"""
+    lines = [
+            "",
+            "class Tables:",
+            '    """{}"""'.format(doc),
+            "",
+            "    NotInLanguage = NotInLanguage",
+    ]
+    code = "\n".join(lines) + "\n"
+    code += _literal("symbol_names", tables.symbol_names)
+    code += "    first_nt_id = unknown = {}\n".format(tables.first_nt_id)
+    code += ("    terminal_ids = {s: i for i, s in "
+             "enumerate(symbol_names[:first_nt_id])\n"
+             "                    if s != ''}\n")
+    for name in attributes:
+        values = getattr(tables, name)
+        if isinstance(values, int):
+            code += "    {} = {}\n".format(name, values)
+        else:
+            code += _literal(name, values)
+    return code
+
+
+def _drivers(module):
+    """Source of the parse_tables() and recognize_tables() functions of
+    module, copied in the generated modules so that they parse exactly
+    like its tables"""
+    return "".join("\n\n" + inspect.getsource(f) for f in (
+            module.parse_tables, module.recognize_tables))
+
+
+_HEADER = '''\
+"""{kind} parser{source}, generated by {generator}; do not edit
+
+Usage: parse(sentence) returns a ParseTree, recognize(sentence) returns
+None; both raise NotInLanguage for invalid sentences."""
+
+from itertools import chain
+from parse_tree import ParseTree
+
+
+class NotInLanguage(ValueError):
+    pass
+
+'''
+
+_DRIVER = '''
+
+def parse(sentence):
+    """Read a sentence (iterable of terminals), and:
+    - if it's in the language, return its parse tree
+    - otherwise, raise NotInLanguage"""
+    return parse_tables(Tables, sentence)
+
+
+def recognize(sentence):
+    """Read a sentence (iterable of terminals), and:
+    - if it's in the language, do nothing,
+    - otherwise, raise NotInLanguage"""
+    recognize_tables(Tables, sentence)
+'''
+
+
+def _header(kind, generator, source):
+    source = " for {}".format(source) if source else ""
+    return _HEADER.format(kind=kind, generator=generator, source=source)
+
+
+def emit_lr(parser, out, source=None):
+    """Write a standalone module for an SLR parser (or a subclass) to the
+    file object out; source is the grammar name, for the docstring"""
+    tables = lrtables.LRTables(parser)
+    name = type(parser).__name__
+
+    out.write(_header(name, name.lower() + ".py --emit", source))
+    out.write(_tables("Compressed tables, see LRTables in lrtables.py",
+                      tables, ("accept", "prod_lhs", "prod_len", "base",
+                               "value", "check", "default", "goto_base",
+                               "goto_value", "goto_check", "goto_default")))
+    out.write(_drivers(lrtables))
+    out.write(_DRIVER)
+
+
+def emit_ll1(parser, out, source=None):
+    """Write a standalone module for an LL1 parser to the file object
+    out; source is the grammar name, for the docstring"""
+    tables = lltables.LLTables(parser)
+
+    out.write(_header("LL(1)", "ll1.py --emit", source))
+    out.write(_tables("Compiled table, see LLTables in lltables.py",
+                      tables, ("start", "predict", "rhs_reversed")))
+    out.write(_drivers(lltables))
+    out.write(_DRIVER)
+
+
+def emit_rd(parser, out, source=None, loops=True):
+    """Write a standalone recursive-descent module for an LL1 parser to
+    the file object out, see LLCode in llcode.py; source is the grammar
+    name, for the docstring"""
+    out.write(_header("LL(1)", "ll1.py --emit-rd", source))
+    out.write("\n" + LLCode(parser, loops).source.lstrip("\n"))
@@ -0,0 +1,345 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+from batch import parse_many
+from grammar import digraph
+from parse_tree import ParseTree
+from slr import SLR
+
+
+class ForestNode:
+    """Node of a shared packed parse forest: symbol derives the tokens
+    from start to end (excluded) in one or more ways
+
+    Each family is a (production number, children) pair, children being
+    a tuple of ForestNode; terminals have no families. Nodes are shared
+    between all the derivations that use them."""
+
+    __slots__ = ("symbol", "start", "end", "families", "_family_set")
+
+    def __init__(self, symbol, start, end):
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.families = []
+        self._family_set = set()
+
+    def add_family(self, prod_nb, children):
+        family = (prod_nb, children)
+        if family not in self._family_set:
+            self._family_set.add(family)
+            self.families.append(family)
+
+    def __str__(self):
+        return "('{}', {}:{}, {} families)".format(
+                self.symbol, self.start, self.end, len(self.families))
+
+    def count(self):
+        """Number of parse trees in the forest"""
+        # memoised post-order, with an explicit stack: a node is counted
+        # when all its children are
+        memo = {}
+        todo = [self]
+        while todo:
+            node = todo[-1]
+            if node in memo:
+                todo.pop()
+                continue
+            pending = [c for _, children in node.families for c in children
+                       if c not in memo]
+            if pending:
+                todo.extend(pending)
+                continue
+            todo.pop()
+            if not node.families:
+                memo[node] = 1
+                continue
+            total = 0
+            for _, children in node.families:
+                product = 1
+                for child in children:
+                    product *= memo[child]
+                total += product
+            memo[node] = total
+        return memo[self]
+
+    def tree(self):
+        """One of the parse trees, using the first family of each node"""
+        return self._tree([], [])
+
+    def trees(self):
+        """Iterator of all the parse trees (beware: there can be
+        exponentially many)"""
+        # each tree is given by the family chosen at each of its nodes
+        # with families, in preorder: go through these lists of choices
+        # in lexicographic order, the last one changing first
+        choices = []
+        while True:
+            sizes = []
+            yield self._tree(choices, sizes)
+            while choices and choices[-1] + 1 == sizes[len(choices) - 1]:
+                choices.pop()
+            if not choices:
+                return
+            choices[-1] += 1
+
+    def _tree(self, choices, sizes):
+        """Parse tree using family choices[k] at the k-th node with
+        families in preorder, or the first one past the end of choices,
+        which is extended; sizes gets the number of families of these
+        nodes"""
+        def new_tree(node):
+            """Tree for node, and an iterator of the children to add to
+            it, if any"""
+            tree = ParseTree(node.symbol)
+            if not node.families:
+                return tree, None
+            k = len(sizes)
+            if k == len(choices):
+                choices.append(0)
+            sizes.append(len(node.families))
+            tree.children = []
+            return tree, iter(node.families[choices[k]][1])
+
+        root, children = new_tree(self)
+        # depth-first, with an explicit stack of (tree, its children)
+        todo = [(root, children)] if children else []
+        while todo:
+            tree, children = todo[-1]
+            child = next(children, None)
+            if child is None:
+                todo.pop()
+                if not tree.children:
+                    tree.children = [ParseTree('')]
+                continue
+            child, grandchildren = new_tree(child)
+            tree.children.append(child)
+            if grandchildren:
+                todo.append((child, grandchildren))
+        return root
+
+
+class _StackNode:
+    """Node of a graph-structured stack: a state at a position, with
+    edges to the nodes below it, labelled with ForestNodes"""
+
+    __slots__ = ("state", "edges", "_below")
+
+    def __init__(self, state):
+        self.state = state
+        self.edges = []  # of (node below, ForestNode)
+        self._below = set()
+
+    def add_edge(self, below, value):
+        """Add an edge to below labelled with value, and return it, or
+        None if there is already an edge to below"""
+        if below in self._below:
+            return None
+        self._below.add(below)
+        edge = (below, value)
+        self.edges.append(edge)
+        return edge
+
+
+class _Tables(SLR):
+    """SLR(1) automaton and tables, keeping all the actions of conflicts:
+    actions[state, symbol] is a tuple of (action, info)"""
+
+    def _set_action(self, state, symbol, action, info=0):
+        actions = self.actions.get((state, symbol), ())
+        if (action, info) not in actions:
+            self.actions[state, symbol] = actions + ((action, info),)
+
+
+class GLR:
+    """Generalised LR parser [Tomita, Efficient Parsing for Natural
+    Language, 1986], with Farshi's correction for ε-productions
+
+    Uses the SLR(1) automaton, but keeps all the actions of conflicts:
+    actions[state, symbol] is a tuple of (action, info). The parser
+    follows all of them at once on a graph-structured stack and returns
+    a shared packed parse forest, so it accepts any grammar except
+    cyclic ones (A =>+ A, which have infinitely many trees)."""
+
+    ACCEPT, SHIFT, REDUCE = SLR.ACCEPT, SLR.SHIFT, SLR.REDUCE
+
+    class NotInLanguage(ValueError):
+        pass
+
+    class GrammarNotGLR(ValueError):
+        pass
+
+    GrammarError = GrammarNotGLR
+
+    def __init__(self, grammar):
+        """Generate GLR parser corresponding to a Grammar object"""
+        self._check_cycles(grammar)
+        self.g = grammar
+        tables = _Tables(grammar)
+        self.actions, self.gotos = tables.actions, tables.gotos
+
+    def _check_cycles(self, g):
+        """Raise if some non-terminal A derives A in one or more steps"""
+        edges = {n: set() for n in g.non_terminals}
+        for lhs, rhs in g.productions:
+            for i, sym in enumerate(rhs):
+                if sym in g.non_terminals and all(
+                        s in g.nullable for j, s in enumerate(rhs) if j != i):
+                    edges[lhs].add(sym)
+        reach = digraph(g.non_terminals, edges,
+                        {n: set(e) for n, e in edges.items()})
+        for n in sorted(g.non_terminals):
+            if n in reach[n]:
+                raise self.GrammarNotGLR("Cyclic grammar: {} =>+ {}".format(
+                        n, n))
+
+    @staticmethod
+    def _check_builder(builder):
+        """Raise if a builder is given: values come from the forest"""
+        if builder is not None:
+            raise TypeError("GLR parsers give parse forests, not builder "
+                            "values: use the trees of the forest instead")
+
+    def parse(self, sentence, builder=None):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, return its parse forest, as the
+          ForestNode of the start symbol
+        - otherwise, raise NotInLanguage
+        builder is only there for compatibility with other parsers, and
+        must be None."""
+        self._check_builder(builder)
+        tokens = list(sentence) + [self.g.END]
+        actions = self.actions
+        frontier = {0: _StackNode(0)}
+
+        for i, token in enumerate(tokens):
+            forest = {}  # (symbol, start) -> ForestNode ending at i
+            self._reduce_all(frontier, token, i, forest)
+
+            if token == self.g.END:
+                for node in frontier.values():
+                    if (self.ACCEPT, 0) in actions.get((node.state, token),
+                                                       ()):
+                        return node.edges[0][1]
+                break
+
+            next_frontier = {}
+            leaf = ForestNode(token, i, i + 1)
+            for node in frontier.values():
+                for action, info in actions.get((node.state, token), ()):
+                    if action == self.SHIFT:
+                        if info not in next_frontier:
+                            next_frontier[info] = _StackNode(info)
+                        next_frontier[info].add_edge(node, leaf)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        states = sorted(frontier)
+        msg = "In states {}, got '{}'".format(states, token)
+        raise self.NotInLanguage(msg)
+
+    def _reduce_all(self, frontier, token, i, forest):
+        """Do all the reductions on token at position i, adding nodes to
+        frontier, the nodes of the stack at i (by state)"""
+        # worklist of (node, edge): reduce from node, only along paths
+        # using edge if it is not None (see _reduce)
+        todo = [(node, None) for node in frontier.values()]
+        while todo:
+            node, through = todo.pop()
+            for action, info in self.actions.get((node.state, token), ()):
+                if action == self.REDUCE and (
+                        through is None or self.g.productions[info][1]):
+                    self._reduce(frontier, node, info, through, i, forest,
+                                 todo)
+
+    def _paths(self, node, length):
+        """Iterator of the paths of length edges down from node, as lists
+        of edges from the top"""
+        if length == 0:
+            yield []
+            return
+        for edge in node.edges:
+            for path in self._paths(edge[0], length - 1):
+                yield [edge] + path
+
+    def _reduce(self, frontier, node, prod_nb, through, i, forest, todo):
+        """Reduce by production prod_nb from node, only along paths using
+        the edge through if it is not None, adding to todo the work for
+        the new nodes and edges of frontier"""
+        lhs, rhs = self.g.productions[prod_nb]
+        paths = self._paths(node, len(rhs))
+        if through is not None and self.g.nullable:
+            paths = (p for p in paths if any(e is through for e in p))
+        elif through is not None:
+            # through starts from node, see below
+            paths = ([through] + p
+                     for p in self._paths(through[0], len(rhs) - 1))
+
+        for path in paths:
+            below = path[-1][0] if path else node
+            children = tuple(e[1] for e in reversed(path))
+            start = children[0].start if children else i
+
+            if (lhs, start) not in forest:
+                forest[lhs, start] = ForestNode(lhs, start, i)
+            value = forest[lhs, start]
+            value.add_family(prod_nb, children)
+
+            state = self.gotos[below.state, lhs]
+            target = frontier.get(state)
+            if target is None:
+                target = frontier[state] = _StackNode(state)
+                target.add_edge(below, value)
+                todo.append((target, None))
+                continue
+            edge = target.add_edge(below, value)
+            if edge is not None:
+                # redo the reductions through the new edge: from all the
+                # nodes at this position, as they may reach it by edges
+                # for ε (Farshi), or just from target without ε
+                others = [target]
+                if self.g.nullable:
+                    others = list(frontier.values())
+                todo.extend((other, edge) for other in others)
+
+    def recognize(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, do nothing,
+        - otherwise, raise NotInLanguage"""
+        self.parse(sentence)
+
+    def parse_many(self, sentences, workers=None, chunksize=64,
+                   builder=None):
+        """Iterator of the forests of sentences, in order, using several
+        processes; see batch.parse_many()"""
+        self._check_builder(builder)
+        return parse_many(self, sentences, workers, chunksize, builder)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from grammar import Grammar
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.stderr.write("Usage: glr.py grammar_file string_to_parse\n")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as gram_in:
+        try:
+            glr = GLR(Grammar(gram_in))
+        except GLR.GrammarError as err:
+            sys.stderr.write("Grammar is not GLR:\n{}\n".format(err))
+            sys.exit(1)
+
+    try:
+        forest = glr.parse(sys.argv[2].split())
+    except GLR.NotInLanguage as err:
+        sys.stderr.write("Sentence not in language:\n{}\n".format(err))
+        sys.exit(1)
+
+    count = forest.count()
+    print("{} parse tree{}".format(count, "s" if count > 1 else ""))
+    for nb, tree in zip(range(10), forest.trees()):
+        print()
+        tree.write_lines(sys.stdout)
@@ -2,11 +2,74 @@
 # coding: utf-8
 
 
+def digraph(nodes, edges, init):
+    """Solve F(x) = init[x] | F(y) for all y in edges[x], for all nodes x
+
+    Values are combined with |= (in place if they are mutable), and each
+    strongly connected component of the relation is traversed only once,
+    its members sharing the same value at the end. Nodes missing from
+    edges have no successors.
+    [DP82] Sec. 4 (procedure Digraph), made iterative"""
+    nodes = list(nodes)
+    value = dict(init)
+    depth = dict.fromkeys(nodes, 0)
+    finished = len(nodes) + 1
+    stack = []
+
+    for root in nodes:
+        if depth[root]:
+            continue
+
+        stack.append(root)
+        depth[root] = len(stack)
+        work = [(root, len(stack), iter(edges.get(root, ())))]
+        while work:
+            x, d, succ = work[-1]
+            for y in succ:
+                if not depth[y]:
+                    stack.append(y)
+                    depth[y] = len(stack)
+                    work.append((y, len(stack), iter(edges.get(y, ()))))
+                    break
+                depth[x] = min(depth[x], depth[y])
+                value[x] |= value[y]
+            else:
+                work.pop()
+                if depth[x] == d:  # x is the root of its SCC
+                    while True:
+                        top = stack.pop()
+                        depth[top] = finished
+                        value[top] = value[x]
+                        if top == x:
+                            break
+                if work:
+                    parent = work[-1][0]
+                    depth[parent] = min(depth[parent], depth[x])
+                    value[parent] |= value[x]
+
+    return value
+
+
+def iter_bits(bits):
+    """Iterator over the positions of the bits set in an int"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
 class Grammar:
     """A grammar and associated tools"""
 
     END = -1  # end marker, guaranteed distinct from actual symbols
 
+    # ids of the special symbols, see _init_ids()
+    END_ID = 0
+    EMPTY_ID = 1
+    EMPTY_BIT = 1 << EMPTY_ID
+
+    ASSOCIATIVITIES = ("left", "right", "nonassoc")
+
     def __init__(self, rules):
         """
         Read grammar from an iterable containing strings like:
@@ -18,14 +81,41 @@ class Grammar:
 
         Sets of terminals and non-terminals are infered from the rules.
         The start symbol is taken as the lhs of the first production.
+
+        Strings may also be yacc-style precedence declarations like:
+            %left sym_1 ... sym_n
+        (or %right, or %nonassoc): all symbols on a line have the same
+        precedence level and associativity, and each line has a higher
+        level than the previous ones. A production has the precedence of
+        its rightmost terminal that has one, unless it ends with
+        "%prec sym"; sym does not have to appear anywhere else. This is
+        used by SLR (and subclasses) to resolve shift/reduce conflicts.
         """
         # store productions in a usable form
         self.productions = []
+        self.precedence = {}  # symbol -> (level, associativity)
+        prec_names = []  # %prec symbol of each production, if any
+        level = 0
         for line in rules:
+            if line.startswith("%"):
+                assoc, *symbols = line.split()
+                if assoc[1:] not in self.ASSOCIATIVITIES:
+                    raise ValueError("Unknown declaration: " + assoc)
+                level += 1
+                for s in symbols:
+                    self.precedence[s] = (level, assoc[1:])
+                continue
+
             (lhs, rhs) = line.split("->")
             for single_rhs in rhs.split("|"):
                 rhs_elements = tuple(single_rhs.split())
+                prec_name = None
+                if "%prec" in rhs_elements:
+                    i = rhs_elements.index("%prec")
+                    prec_name = rhs_elements[i + 1]
+                    rhs_elements = rhs_elements[:i]
                 self.productions.append((lhs.strip(), rhs_elements))
+                prec_names.append(prec_name)
 
         # infer remaining elements of the grammar
         self.start_symbol = self.productions[0][0]
@@ -34,70 +124,183 @@ class Grammar:
         self.terminals = rhs_symbols - self.non_terminals
         self.symbols = self.terminals | self.non_terminals
 
-        # pre-compute First and Follow sets (always useful)
+        # numbers of the productions of each non-terminal
+        by_lhs = {n: [] for n in self.non_terminals}
+        for i, (lhs, rhs) in enumerate(self.productions):
+            by_lhs[lhs].append(i)
+        self.productions_by_lhs = {n: tuple(p) for n, p in by_lhs.items()}
+
+        # precedence of each production: (level, associativity) or None
+        self.prod_precedence = []
+        for (lhs, rhs), prec_name in zip(self.productions, prec_names):
+            if prec_name is None:
+                prec_name = next((s for s in reversed(rhs)
+                                  if s in self.terminals and
+                                  s in self.precedence), None)
+            elif prec_name not in self.precedence:
+                raise ValueError("Undeclared precedence: " + prec_name)
+            self.prod_precedence.append(self.precedence.get(prec_name))
+
+        # intern symbols and pre-compute First and Follow sets
+        self._init_ids()
+        self._init_nullable()
         self._init_first()
         self._init_follow()
+        self._first = self._follow = None  # string views, built lazily
+
+    def _init_ids(self):
+        """Intern symbols as dense ints: END, then "" (only used in First
+        sets), then terminals, then non-terminals. This keeps bitmasks of
+        terminals (as used for First and Follow sets) small."""
+        names = [self.END, ""]
+        names.extend(sorted(self.terminals))
+        names.extend(sorted(self.non_terminals))
+        self.symbol_names = tuple(names)
+        self.symbol_ids = {s: i for i, s in enumerate(names)}
+        self.first_nt_id = 2 + len(self.terminals)
+
+        ids = self.symbol_ids
+        self.int_productions = tuple(
+                (ids[lhs], tuple(ids[s] for s in rhs))
+                for lhs, rhs in self.productions)
+
+    def symbols_of(self, bits):
+        """Set of symbol names corresponding to a bitmask of ids"""
+        return {self.symbol_names[i] for i in iter_bits(bits)}
+
+    def bits_of(self, symbols):
+        """Bitmask of ids corresponding to an iterable of symbol names"""
+        result = 0
+        for s in symbols:
+            result |= 1 << self.symbol_ids[s]
+        return result
+
+    @property
+    def first(self):
+        """First set of each symbol, as sets of names"""
+        if self._first is None:
+            self._first = {}
+            for s in self.symbols:
+                first = self.symbols_of(self.first_bits[self.symbol_ids[s]])
+                if s in self.terminals:
+                    first = frozenset(first)
+                self._first[s] = first
+        return self._first
+
+    @property
+    def follow(self):
+        """Follow set of each non-terminal, as sets of names"""
+        if self._follow is None:
+            self._follow = {
+                    n: self.symbols_of(self.follow_bits[self.symbol_ids[n]])
+                    for n in self.non_terminals}
+        return self._follow
+
+    def first_of_bits(self, ids):
+        """Compute the First set of a sequence of symbol ids, as a bitmask
+        [TRDB] Sec 4.4 (p. 189)"""
+        result = 0
+
+        for s in ids:
+            first = self.first_bits[s]
+            result |= first
+            if not first & self.EMPTY_BIT:
+                return result & ~self.EMPTY_BIT
+
+        return result | self.EMPTY_BIT
 
     def first_of(self, sequence):
         """Compute the First set of a sequence of symbols
         [TRDB] Sec 4.4 (p. 189)"""
-        result = set()
+        ids = (self.symbol_ids[s] for s in sequence)
+        return self.symbols_of(self.first_of_bits(ids))
 
-        for s in sequence:
-            result |= self.first[s] - {""}
-            if "" not in self.first[s]:
-                return result
+    def _init_nullable(self):
+        """Compute the set of nullable non-terminals
 
-        result.add("")
-        return result
+        Each production keeps a count of rhs symbols not yet known to be
+        nullable, and is only revisited when one of them becomes so."""
+        prods = self.int_productions
+        missing = [len(rhs) for lhs, rhs in prods]
+        uses = {n: [] for n in range(self.first_nt_id, len(self.symbol_ids))}
+        for i, (lhs, rhs) in enumerate(prods):
+            for s in rhs:
+                if s in uses:
+                    uses[s].append(i)
 
-    # helper for iteratively computing sets and tracking when we're done
-    @staticmethod
-    def _stable_update(cur, new):
-        "Update cur with new elements and return whether it's unchanged"""
-        if cur >= new:
-            return True
+        nullable = 0
+        todo = [lhs for lhs, rhs in prods if not rhs]
+        while todo:
+            n = todo.pop()
+            if nullable & (1 << n):
+                continue
+            nullable |= 1 << n
+            for i in uses[n]:
+                missing[i] -= 1
+                if not missing[i]:
+                    todo.append(prods[i][0])
 
-        cur |= new
-        return False
+        self.nullable = frozenset(self.symbols_of(nullable))
+        self._nullable_bits = nullable
 
     def _init_first(self):
-        """Compute the First set of each symbol
-        [TRDB] Sec 4.4 (p. 189)"""
-        self.first = {s: frozenset((s,)) if s in self.terminals else set()
-                      for s in self.symbols}
-
-        done = False
-        while not done:
-            done = True
-            for lhs, rhs in self.productions:
-                new = self.first_of(rhs)
-                done &= self._stable_update(self.first[lhs], new)
-
-    def _follow_for(self, lhs, symbol, after):
-        """Partial Follow set for an occurence of symbol in a production.
-        [TRDB] Sec 4.4 (p. 189)"""
-        result = self.first_of(after)
+        """Compute the First set of each symbol, as bitmasks indexed by id
+        [TRDB] Sec 4.4 (p. 189)
 
-        if "" in result:
-            result.remove("")
-            result |= self.follow[lhs]
+        First(A) includes First(X) for every symbol X that can start a
+        production of A; this relation is solved once per SCC."""
+        nt_ids = range(self.first_nt_id, len(self.symbol_ids))
+        nullable = self._nullable_bits
 
-        return result
+        direct = dict.fromkeys(nt_ids, 0)
+        starts = {n: set() for n in nt_ids}
+        for lhs, rhs in self.int_productions:
+            for s in rhs:
+                if s < self.first_nt_id:
+                    direct[lhs] |= 1 << s
+                    break
+                starts[lhs].add(s)
+                if not nullable & (1 << s):
+                    break
+
+        first = digraph(nt_ids, starts, direct)
+
+        self.first_bits = [1 << s for s in range(self.first_nt_id)]
+        self.first_bits[self.EMPTY_ID] = 0
+        for n in nt_ids:
+            empty = self.EMPTY_BIT if nullable & (1 << n) else 0
+            self.first_bits.append(first[n] | empty)
 
     def _init_follow(self):
-        """Compute the Follow set of each non-terminal"""
-        self.follow = {n: {self.END} if n == self.start_symbol else set()
-                       for n in self.non_terminals}
-
-        done = False
-        while not done:
-            done = True
-            for lhs, rhs in self.productions:
-                for i in range(len(rhs)):
-                    if rhs[i] in self.non_terminals:
-                        new = self._follow_for(lhs, rhs[i], rhs[i+1:])
-                        done &= self._stable_update(self.follow[rhs[i]], new)
+        """Compute the Follow set of each non-terminal, as bitmasks indexed
+        by id (terminals get an empty set)
+        [TRDB] Sec 4.4 (p. 189)
+
+        For each production A -> a B b, Follow(B) includes First(b), and
+        Follow(A) too if b is nullable; this relation is solved once per
+        SCC."""
+        nt_ids = range(self.first_nt_id, len(self.symbol_ids))
+
+        direct = dict.fromkeys(nt_ids, 0)
+        direct[self.symbol_ids[self.start_symbol]] = 1 << self.END_ID
+        ends = {n: set() for n in nt_ids}
+        for lhs, rhs in self.int_productions:
+            after = self.EMPTY_BIT  # First of the part after the symbol
+            for s in reversed(rhs):
+                if s >= self.first_nt_id:
+                    direct[s] |= after & ~self.EMPTY_BIT
+                    if after & self.EMPTY_BIT:
+                        ends[s].add(lhs)
+
+                first = self.first_bits[s]
+                if first & self.EMPTY_BIT:
+                    after |= first & ~self.EMPTY_BIT
+                else:
+                    after = first
+
+        follow = digraph(nt_ids, ends, direct)
+        self.follow_bits = [0] * self.first_nt_id
+        self.follow_bits.extend(follow[n] for n in nt_ids)
 
     def pprod(self, i):
         """Pretty representation of production number i"""
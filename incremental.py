@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Incremental reparsing with an SLR parser (or any of its subclasses)
+
+After an edit, subtrees of the previous parse tree that lie outside the
+edited region are shifted whole onto the parse stack when the parser
+reaches the state they were originally built in, as in Wagner, Graham:
+Efficient and Flexible Incremental Parsing, TOPLAS 20(5), 1998."""
+
+from parse_tree import ParseTree
+from weakref import WeakKeyDictionary
+
+
+class IncrementalParser:
+    """Parse sentences and reparse them after edits, reusing subtrees
+
+    For each node it builds, this remembers the number of tokens it
+    spans and its left state, the state under it on the parse stack. A
+    node from the previous tree is reused when the parser is in its left
+    state at the same position in the new sentence, and neither its
+    tokens nor the token following them (the look-ahead for the
+    reductions that built it) were edited: LR parsing is deterministic,
+    so parsing its tokens again would build the same subtree.
+
+    Nodes overlapping the edit are broken down, so the cost depends on
+    the shape of the tree: for a left-recursive list, the items after
+    the edit are reused one by one, and the separators shifted again."""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.NotInLanguage = parser.NotInLanguage
+        self._info = WeakKeyDictionary()  # node -> (left state, length)
+        self.nb_shifted = 0  # tokens shifted one by one in the last parse
+
+    def parse(self, sentence):
+        """Same as SLR.parse(), remembering information for reparse()"""
+        return self._parse(list(sentence), [], 0, 0, 0)
+
+    def reparse(self, tree, edit, sentence):
+        """Parse sentence, after replacing tokens start to old_end
+        (excluded) of the sentence of tree with tokens start to new_end
+        of sentence, where edit is (start, old_end, new_end).
+
+        tree must come from parse() or reparse() on this object."""
+        start, old_end, new_end = edit
+        if tree not in self._info:
+            raise ValueError("Tree not built by this IncrementalParser")
+        return self._parse(list(sentence), [(tree, 0)], start, old_end,
+                           new_end - old_end)
+
+    def _parse(self, sentence, pending, start, old_end, delta):
+        """Parse sentence, reusing nodes from pending, a stack of (node,
+        old position) of the previous tree in reverse order"""
+        p = self.parser
+        actions, gotos, productions = p.actions, p.gotos, p.g.productions
+        known = self._info
+        end = p.g.END
+        self.nb_shifted = 0
+
+        sentence.append(end)
+        stack = [(0, None)]
+        pos = 0
+        candidate = None
+
+        while True:
+            state = stack[-1][0]
+            token = sentence[pos]
+
+            # find the node of the previous tree that starts at pos, if
+            # it is reusable; break down the nodes in the way
+            if candidate is None and pending:
+                if pos < start:
+                    old_pos = pos
+                elif pos >= old_end + delta:
+                    old_pos = pos - delta
+                else:
+                    old_pos = None
+                while pending and old_pos is not None:
+                    node, a = pending[-1]
+                    b = a + known.get(node, (None, 0))[1]
+                    if b <= old_pos or (a >= old_pos and b == a):
+                        pending.pop()  # consumed or ε
+                    elif a == old_pos and (b < start or a >= old_end):
+                        candidate = node
+                        break
+                    elif a > old_pos:
+                        break
+                    else:  # overlaps pos or the edit: break down
+                        pending.pop()
+                        for child in reversed(node.children):
+                            b -= known.get(child, (None, 0))[1]
+                            pending.append((child, b))
+
+            if candidate is not None:
+                left, length = known[candidate]
+                if left == state and candidate.children:
+                    pending.pop()
+                    stack.append((gotos[state, candidate.symbol], candidate))
+                    candidate = None
+                    pos += length
+                    continue
+
+            try:
+                action, info = actions[state, token]
+            except KeyError:
+                msg = "In state '{}', got '{}'".format(state, token)
+                raise self.NotInLanguage(msg)
+
+            if action == p.SHIFT:
+                node = ParseTree(token)
+                known[node] = (state, 1)
+                stack.append((info, node))
+                self.nb_shifted += 1
+                pos += 1
+                candidate = None  # if any, it was not reused
+
+            elif action == p.REDUCE:
+                lhs, rhs = productions[info]
+                children = [stack.pop()[1] for _ in range(len(rhs))]
+                children.reverse()
+                length = sum(known[c][1] for c in children)
+                if not rhs:
+                    children.append(ParseTree(''))
+                node = ParseTree(lhs, children)
+                state = stack[-1][0]
+                known[node] = (state, length)
+                stack.append((gotos[state, lhs], node))
+
+            else:  # action == p.ACCEPT
+                return stack[-1][1]
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+from grammar import digraph
+from slr import SLR, main
+
+
+class LALR(SLR):
+    """LALR(1) parser
+
+    Uses the same LR(0) automaton as SLR(1), but with exact look-ahead
+    sets for reductions, computed with the relations of [DP82]."""
+
+    class GrammarNotLALR(SLR.GrammarNotSLR):
+        pass
+
+    GrammarError = GrammarNotLALR
+
+    def _init_tables(self):
+        self._init_lookaheads()
+        super()._init_tables()
+
+    def _nt_transitions(self):
+        """Iterator of (state, non-terminal, next state) transitions"""
+        for (p, sym), r in self.transitions.items():
+            if sym in self.g.non_terminals:
+                yield p, sym, r
+
+    def _init_lookaheads(self):
+        """Compute LA(q, A -> w) for each reduction [DP82] Sec. 3-4
+
+        Non-terminal transitions (p, A) are the nodes of the relations:
+        - DR(p, A): terminals that can be shifted right after (p, A);
+        - (p, A) reads (r, C) if p -A-> r -C-> with C nullable;
+        - (p, A) includes (p', B) if B -> b A c with c nullable and
+          p' -b-> p;
+        - (q, A -> w) lookback (p, A) if p -w-> q.
+        Then Read is DR closed under reads, Follow is Read closed under
+        includes, and LA(q, A -> w) is the union of Follow(p, A) over
+        lookback."""
+        g = self.g
+        ids = g.symbol_ids
+        accept = self._item_base[self.AUG_PROD] + 1
+
+        # terminals and nullable non-terminals accepted by each state
+        shifts = {}
+        nullables = {}
+        for (p, sym), r in self.transitions.items():
+            if sym in g.terminals:
+                shifts[p] = shifts.get(p, 0) | 1 << ids[sym]
+            elif sym in g.nullable:
+                nullables.setdefault(p, []).append((p, sym))
+        for p, kernel in enumerate(self.kernels):
+            if accept in kernel:
+                shifts[p] = shifts.get(p, 0) | 1 << g.END_ID
+
+        direct = {}
+        reads = {}
+        for p, sym, r in self._nt_transitions():
+            direct[p, sym] = shifts.get(r, 0)
+            reads[p, sym] = nullables.get(r, ())
+        read = digraph(direct, reads, direct)
+
+        # index of the start of the nullable suffix of each production
+        nullable_from = []
+        for lhs, rhs in g.productions:
+            i = len(rhs)
+            while i and rhs[i - 1] in g.nullable:
+                i -= 1
+            nullable_from.append(i)
+
+        includes = {node: [] for node in direct}
+        lookback = {}
+        for p, lhs, _ in self._nt_transitions():
+            for prod_nb in g.productions_by_lhs[lhs]:
+                q = p
+                rhs = g.productions[prod_nb][1]
+                for i, sym in enumerate(rhs):
+                    after_nullable = i + 1 >= nullable_from[prod_nb]
+                    if after_nullable and sym in g.non_terminals:
+                        includes[q, sym].append((p, lhs))
+                    q = self.transitions[q, sym]
+                lookback.setdefault((q, prod_nb), []).append((p, lhs))
+
+        follow = digraph(read, includes, read)
+
+        self._la = {}
+        for reduction, nodes in lookback.items():
+            la = 0
+            for node in nodes:
+                la |= follow[node]
+            self._la[reduction] = la
+
+    def _lookaheads(self, state, prod_nb):
+        """Terminals (as a bitmask) on which to reduce by production
+        prod_nb in state: for LALR(1), LA(state, prod_nb)"""
+        return self._la[state, prod_nb]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main(LALR)
@@ -1,7 +1,9 @@
 #!/usr/bin/python3
 # coding: utf-8
 
-from parse_tree import ParseTree
+from grammar import iter_bits
+from batch import parse_many
+from builders import TreeBuilder
 from itertools import chain
 
 
@@ -12,17 +14,15 @@ class LL1:
         [TRDB] Algorithm 4.4 (p. 190)"""
         self.g = grammar
         self.table = {}
-        for i, prod in enumerate(self.g.productions):
-            lhs, rhs = prod
-            first = self.g.first_of(rhs)
+        names = self.g.symbol_names
+        empty = self.g.EMPTY_BIT
+        for i, (lhs, rhs) in enumerate(self.g.int_productions):
+            first = self.g.first_of_bits(rhs)
+            if first & empty:
+                first |= self.g.follow_bits[lhs]
 
-            if '' in first:
-                for t in self.g.follow[lhs]:
-                    self._table_add(lhs, t, i)
-                first.remove('')
-
-            for t in first:
-                self._table_add(lhs, t, i)
+            for t in iter_bits(first & ~empty):
+                self._table_add(names[lhs], names[t], i)
 
     class GrammarNotLL1(ValueError):
         pass
@@ -39,79 +39,122 @@ class LL1:
     class NotInLanguage(ValueError):
         pass
 
-    def parse(self, sentence):
+    def parse(self, sentence, builder=None):
         """Read a sentence (iterable of terminals), and:
-        - if it's in the language, return its parse tree
+        - if it's in the language, return the value built for it by
+          builder (see builders.py): by default, its parse tree
         - otherwise, raise NotInLanguage
         [TRDB] Algorithm 4.3 p. 187"""
+        if builder is None:
+            builder = TreeBuilder()
+        productions = self.g.productions
 
         # use a mixed stack with:
         # - symbols corresponding to the productions in progress
-        # - tree nodes to go back to when their children are complete
+        # - production numbers (ints >= 0) below their right-hand side,
+        #   to reduce when the values of its symbols are complete
         stack = [self.g.END, self.g.start_symbol]
-        cur_node = None
+        values = []
         tok_stream = chain(iter(sentence), (self.g.END,))
         token = next(tok_stream)
 
         while stack:
             state = stack.pop()
-            if isinstance(state, ParseTree):
-                cur_node = state
-            elif state in self.g.non_terminals:
+            if state in self.g.non_terminals:
                 if (state, token) not in self.table:
                     msg = "In state '{}', got '{}'".format(state, token)
                     raise self.NotInLanguage(msg)
 
-                new_node = ParseTree(state)
-                if cur_node:
-                    cur_node.children.append(new_node)
-                    stack.append(cur_node)
-                cur_node = new_node
-
                 prod_idx = self.table[state, token]
-                rhs = self.g.productions[prod_idx][1]
-                stack.extend(list(reversed(rhs)))
-
-                if len(rhs) == 0:
-                    cur_node.children.append(ParseTree(''))
+                stack.append(prod_idx)
+                stack.extend(reversed(productions[prod_idx][1]))
+            elif isinstance(state, int) and state >= 0:
+                lhs, rhs = productions[state]
+                args = values[len(values) - len(rhs):]
+                del values[len(values) - len(rhs):]
+                values.append(builder.reduce(state, lhs, args))
             else:
                 if token != state:
                     msg = "Expected '{}', got '{}'".format(state, token)
                     raise self.NotInLanguage(msg)
 
                 if state != self.g.END:
-                    cur_node.children.append(ParseTree(token))
+                    values.append(builder.shift(token))
                     token = next(tok_stream)
 
-        return cur_node
+        return values[-1]
+
+    def recognize(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, do nothing,
+        - otherwise, raise NotInLanguage
+        Same as parse(), with only symbols on the stack."""
+        stack = [self.g.END, self.g.start_symbol]
+        tok_stream = chain(iter(sentence), (self.g.END,))
+        token = next(tok_stream)
+
+        while stack:
+            state = stack.pop()
+            if state in self.g.non_terminals:
+                if (state, token) not in self.table:
+                    msg = "In state '{}', got '{}'".format(state, token)
+                    raise self.NotInLanguage(msg)
+                rhs = self.g.productions[self.table[state, token]][1]
+                stack.extend(reversed(rhs))
+            else:
+                if token != state:
+                    msg = "Expected '{}', got '{}'".format(state, token)
+                    raise self.NotInLanguage(msg)
+                if state != self.g.END:
+                    token = next(tok_stream)
+
+    def parse_many(self, sentences, workers=None, chunksize=64,
+                   builder=None):
+        """Iterator of the values of sentences, in order, using several
+        processes; see batch.parse_many()"""
+        return parse_many(self, sentences, workers, chunksize, builder)
 
 
 if __name__ == "__main__":  # pragma: no cover
     from grammar import Grammar
     import sys
 
-    if not 2 <= len(sys.argv) <= 4:
-        usage = "Usage: ll1.py grammar_file [string_to_parse] [name]\n"
+    args = sys.argv[1:]
+    emit_to = emit_kind = None
+    if args[:1] in (["--emit"], ["--emit-rd"]) and len(args) == 3:
+        emit_kind, emit_to, args = args[0], args[1], args[2:]
+
+    if not 1 <= len(args) <= 3:
+        usage = ("Usage: ll1.py grammar_file [string_to_parse] [name]\n"
+                 "   or: ll1.py --emit out_file grammar_file\n"
+                 "   or: ll1.py --emit-rd out_file grammar_file\n")
         sys.stderr.write(usage)
         sys.exit(1)
 
-    with open(sys.argv[1]) as gram_in:
+    with open(args[0]) as gram_in:
         try:
             ll1 = LL1(Grammar(gram_in))
         except LL1.GrammarNotLL1 as err:
             sys.stderr.write("Grammar is not LL1:\n{}\n".format(err))
             sys.exit(1)
 
+    if emit_to:
+        from emit import emit_ll1, emit_rd
+        emitter = emit_rd if emit_kind == "--emit-rd" else emit_ll1
+        with open(emit_to, "w") as out:
+            emitter(ll1, out, args[0])
+        sys.exit(0)
+
     print("LL(1) parsing table:")
     for lhs, term in ll1.table:
         prod = ll1.g.pprod(ll1.table[lhs, term])
         print("{}\t{}\t{}".format(lhs, term, prod))
     print()
 
-    if len(sys.argv) == 2:
+    if len(args) == 1:
         sys.exit(0)
 
-    sentence = sys.argv[2]
+    sentence = args[1]
     try:
         tree = ll1.parse(sentence.split())
     except LL1.NotInLanguage as err:
@@ -119,13 +162,13 @@ if __name__ == "__main__":  # pragma: no cover
         sys.exit(1)
 
     print("Parse tree:")
-    print("\n".join(tree.lines()))
+    tree.write_lines(sys.stdout)
     print()
 
     print("Leftmost derivation:")
     print(" -> ".join(tree.leftmost()))
     print()
 
-    if len(sys.argv) == 4:
-        tree.draw(sys.argv[3])
-        print("Saved to {}.pdf".format(sys.argv[3]))
+    if len(args) == 3:
+        tree.draw(args[2])
+        print("Saved to {}.pdf".format(args[2]))
@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Recursive-descent parsers: Python source specialised for an LL(1)
+prediction table"""
+
+from itertools import chain
+from ll1 import LL1
+from lrcode import compile_code
+from parse_tree import ParseTree
+
+
+class LLCode:
+    """Recursive-descent parser for the table of an LL1 parser, generated
+    as Python source with one function per non-terminal
+
+    The functions are defined once, when the parser is built; they pass
+    the current token along in their arguments and return values. Each
+    one tests the current token against the terminals that
+    predict each production of its non-terminal, then matches or calls
+    the symbols of the right-hand side in turn. With loops (the default),
+    productions ending with their own left-hand side, like E' -> + T E',
+    continue a loop rather than call the function again, so long lists
+    do not hit the recursion limit: only nesting does. The generated
+    source is kept in the source attribute."""
+
+    NotInLanguage = LL1.NotInLanguage
+
+    def __init__(self, parser, loops=True):
+        """Generate and compile the code for parser"""
+        self.parser = parser
+        self.loops = loops
+        self.source = self._generate()
+        namespace = {
+                "chain": chain,
+                "ParseTree": ParseTree,
+                "NotInLanguage": self.NotInLanguage,
+        }
+        exec(compile_code(self.source, "<llcode>"), namespace)
+        self.parse = namespace["parse"]
+        self.recognize = namespace["recognize"]
+
+    def _generate(self):
+        """Source defining parse() and recognize(), and the functions for
+        the non-terminals they call"""
+        g = self.parser.g
+
+        # terminals predicting each production
+        self._predict = {}
+        for (lhs, term), prod_nb in self.parser.table.items():
+            self._predict.setdefault(prod_nb, []).append(term)
+
+        lines = []
+        for tree in (True, False):
+            prefix = "parse" if tree else "recognize"
+            self._names = {n: "{}_{}".format(prefix, i)
+                           for i, n in enumerate(sorted(g.non_terminals))}
+            for lhs in sorted(g.non_terminals):
+                lines.append("")
+                lines.append("")
+                lines.extend(self._non_terminal(lhs, tree))
+            lines.append("")
+            lines.append("")
+            lines.extend(self._function(tree))
+        return "\n".join(lines) + "\n"
+
+    def _function(self, tree):
+        """Lines of the definition of parse() or recognize()"""
+        g = self.parser.g
+        yield "def {}(sentence):".format("parse" if tree else "recognize")
+        yield "    tok_stream = chain(iter(sentence), ({!r},))".format(
+                g.END)
+        yield "    {}token = {}(next(tok_stream), tok_stream)".format(
+                "tree, " if tree else "", self._names[g.start_symbol])
+        yield from self._match(g.END, 4)
+        if tree:
+            yield "    return tree"
+
+    def _non_terminal(self, lhs, tree):
+        """Lines of the function for non-terminal lhs: it takes the current
+        token and the token stream, and returns the next token, after the
+        tree if any"""
+        g = self.parser.g
+        prods = [p for p in g.productions_by_lhs[lhs] if p in self._predict]
+        loop = self.loops and any(g.productions[p][1][-1:] == (lhs,)
+                                  for p in prods)
+
+        yield "def {}(token, tok_stream):  # {}".format(self._names[lhs], lhs)
+        indent = 4
+        if loop:
+            if tree:
+                yield "    node = root = ParseTree({!r})".format(lhs)
+            yield "    while True:"
+            indent = 8
+        pad = " " * indent
+
+        keyword = "if"
+        for prod_nb in prods:
+            terms = sorted(self._predict[prod_nb], key=repr)
+            if len(terms) == 1:
+                test = "token == {!r}".format(terms[0])
+            else:
+                test = "token in {{{}}}".format(", ".join(map(repr, terms)))
+            yield "{}{} {}:  # {}".format(pad, keyword, test,
+                                          g.pprod(prod_nb).rstrip())
+            yield from self._production(prod_nb, tree, loop, indent + 4)
+            keyword = "elif"
+
+        msg = "In state '{}', got '{{}}'".format(lhs)
+        yield "{}raise NotInLanguage({!r}.format(token))".format(pad, msg)
+
+    def _production(self, prod_nb, tree, loop, indent):
+        """Lines for the right-hand side of production prod_nb, in the
+        function for its lhs"""
+        g = self.parser.g
+        lhs, rhs = g.productions[prod_nb]
+        pad = " " * indent
+        tail = loop and rhs[-1:] == (lhs,)
+        symbols = rhs[:-1] if tail else rhs
+
+        children = []
+        for i, symbol in enumerate(symbols):
+            child = "c{}".format(i)
+            if symbol in g.non_terminals:
+                yield "{}{}token = {}(token, tok_stream)".format(
+                        pad, child + ", " if tree else "",
+                        self._names[symbol])
+            else:
+                # the first terminal is the one that predicted rhs
+                if i > 0:
+                    yield from self._match(symbol, indent)
+                if tree:
+                    yield "{}{} = ParseTree(token)".format(pad, child)
+                yield "{}token = next(tok_stream)".format(pad)
+            children.append(child)
+
+        if tail:
+            if tree:
+                children.append("child")
+                yield "{}child = ParseTree({!r})".format(pad, lhs)
+                yield "{}node.children = [{}]".format(pad,
+                                                      ", ".join(children))
+                yield "{}node = child".format(pad)
+            yield "{}continue".format(pad)
+            return
+
+        if not children:
+            children.append("ParseTree('')")
+        if not tree:
+            yield "{}return token".format(pad)
+        elif loop:
+            yield "{}node.children = [{}]".format(pad, ", ".join(children))
+            yield "{}return root, token".format(pad)
+        else:
+            yield "{}return ParseTree({!r}, [{}]), token".format(
+                    pad, lhs, ", ".join(children))
+
+    def _match(self, symbol, indent):
+        """Lines raising NotInLanguage unless the token is symbol"""
+        pad = " " * indent
+        msg = "Expected '{}', got '{{}}'".format(symbol)
+        yield "{}if token != {!r}:".format(pad, symbol)
+        yield "{}    raise NotInLanguage({!r}.format(token))".format(pad,
+                                                                     msg)
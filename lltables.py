@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+from ll1 import LL1
+from parse_tree import ParseTree
+from itertools import chain
+
+
+class LLTables:
+    """Compiled form of the prediction table of an LL1 parser, with a
+    faster parse loop
+
+    Symbols are numbered by their grammar id, so terminals are the ids
+    below first_nt_id. predict[n][t] is the number of the production to
+    expand non-terminal n with on terminal t, or -1 for an error; it has
+    a dense row for each non-terminal id (None for terminals), with an
+    extra column for unknown tokens. The right-hand sides of productions
+    are stored reversed, ready to be pushed on the stack."""
+
+    def __init__(self, parser):
+        """Compile the prediction table of parser"""
+        g = parser.g
+        self.symbol_names = g.symbol_names
+        self.first_nt_id = g.first_nt_id
+        self.start = g.symbol_ids[g.start_symbol]
+
+        # unknown tokens get a column with no entry
+        self.unknown = g.first_nt_id
+        self.terminal_ids = {g.symbol_names[i]: i
+                             for i in range(g.first_nt_id)}
+        del self.terminal_ids[""]
+
+        rows = {n: [-1] * (self.unknown + 1)
+                for n in range(g.first_nt_id, len(g.symbol_names))}
+        for (lhs, term), prod_nb in parser.table.items():
+            rows[g.symbol_ids[lhs]][g.symbol_ids[term]] = prod_nb
+        self.predict = (None,) * g.first_nt_id + tuple(
+                tuple(rows[n]) for n in sorted(rows))
+
+        self.rhs_reversed = tuple(tuple(reversed(rhs))
+                                  for _, rhs in g.int_productions)
+
+    NotInLanguage = LL1.NotInLanguage
+
+    def parse(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, return its parse tree
+        - otherwise, raise NotInLanguage
+        Same as LL1.parse(), using the compiled table."""
+        return parse_tables(self, sentence)
+
+    def recognize(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, do nothing,
+        - otherwise, raise NotInLanguage
+        Same as parse(), without building a tree."""
+        recognize_tables(self, sentence)
+
+
+def parse_tables(tables, sentence):
+    """Read a sentence (iterable of terminals), and:
+    - if it's in the language, return its parse tree
+    - otherwise, raise tables.NotInLanguage
+    tables is an LLTables, or any object with the same attributes: this
+    is the loop of LLTables.parse(), and of the modules written by emit.py,
+    which copy its source."""
+    # local names for speed
+    predict, rhs_reversed = tables.predict, tables.rhs_reversed
+    names, first_nt = tables.symbol_names, tables.first_nt_id
+    ids, unknown = tables.terminal_ids, tables.unknown
+
+    # parallel stacks of symbols to match and of their tree nodes,
+    # created with their parent: the stack only holds symbol ids
+    root = ParseTree(names[tables.start])
+    stack = [0, tables.start]
+    nodes = [None, root]
+    tok_stream = chain(iter(sentence), (names[0],))
+    token = next(tok_stream)
+    tok_id = ids.get(token, unknown)
+
+    while True:
+        symbol = stack.pop()
+        node = nodes.pop()
+        if symbol >= first_nt:
+            prod_nb = predict[symbol][tok_id]
+            if prod_nb < 0:
+                msg = "In state '{}', got '{}'".format(
+                        names[symbol], token)
+                raise tables.NotInLanguage(msg)
+
+            rhs = rhs_reversed[prod_nb]
+            if rhs:
+                stack.extend(rhs)
+                children = [ParseTree(names[s]) for s in rhs]
+                nodes.extend(children)
+                children.reverse()
+                node.children = children
+            else:
+                node.children = [ParseTree('')]
+
+        elif symbol == tok_id:
+            if not symbol:
+                return root
+            token = next(tok_stream)
+            tok_id = ids.get(token, unknown)
+
+        else:
+            msg = "Expected '{}', got '{}'".format(names[symbol], token)
+            raise tables.NotInLanguage(msg)
+
+
+def recognize_tables(tables, sentence):
+    """Read a sentence (iterable of terminals), and:
+    - if it's in the language, do nothing,
+    - otherwise, raise tables.NotInLanguage
+    Same as parse_tables(), without building a tree."""
+    predict, rhs_reversed = tables.predict, tables.rhs_reversed
+    names, first_nt = tables.symbol_names, tables.first_nt_id
+    ids, unknown = tables.terminal_ids, tables.unknown
+
+    stack = [0, tables.start]
+    tok_stream = chain(iter(sentence), (names[0],))
+    token = next(tok_stream)
+    tok_id = ids.get(token, unknown)
+
+    while True:
+        symbol = stack.pop()
+        if symbol >= first_nt:
+            prod_nb = predict[symbol][tok_id]
+            if prod_nb < 0:
+                msg = "In state '{}', got '{}'".format(
+                        names[symbol], token)
+                raise tables.NotInLanguage(msg)
+            stack.extend(rhs_reversed[prod_nb])
+
+        elif symbol == tok_id:
+            if not symbol:
+                return
+            token = next(tok_stream)
+            tok_id = ids.get(token, unknown)
+
+        else:
+            msg = "Expected '{}', got '{}'".format(names[symbol], token)
+            raise tables.NotInLanguage(msg)
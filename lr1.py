@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+from grammar import digraph
+from slr import SLR, main
+
+
+class LR1(SLR):
+    """LR(1) parser, with states merged as in LALR(1) when that is known
+    not to introduce conflicts (Pager's weak compatibility)
+
+    This accepts all LR(1) grammars, with tables close to the LALR(1)
+    size. With merge=False, it builds the canonical LR(1) automaton
+    instead [TRDB] Sec. 4.7, which is mostly useful for comparison."""
+
+    class GrammarNotLR1(SLR.GrammarNotSLR):
+        pass
+
+    GrammarError = GrammarNotLR1
+
+    def __init__(self, grammar, merge=True):
+        """Generate LR(1) parser corresponding to a Grammar object"""
+        self.merge = merge
+        super().__init__(grammar)
+
+    def _init_items(self):
+        """Also record, for each packed item A -> a | B b, the First set
+        of b (as a bitmask), needed for closures"""
+        super()._init_items()
+
+        self._item_first = []
+        for prod_nb in sorted(self._item_base):
+            lhs, rhs = self._get_prod(prod_nb)
+            rhs_ids = tuple(self.g.symbol_ids[s] for s in rhs)
+            for cursor in range(len(rhs) + 1):
+                after = rhs_ids[cursor + 1:]
+                self._item_first.append(self.g.first_of_bits(after))
+
+    def _init_closures(self):
+        """Also pre-compute, for each non-terminal A, the look-ahead sets
+        of the items in the closure of [A -> | ...] with look-ahead #.
+        The closure of an item [B -> a | A b, L] is then obtained by
+        replacing # with First(b L).
+
+        # is represented by a bit that no symbol id uses. All items
+        [B -> | ...] of a closure have the same look-ahead set L(B); for
+        each production C -> B c of a non-terminal C of the closure, L(B)
+        includes First(c), and L(C) if c is nullable: this is solved
+        with digraph()."""
+        super()._init_closures()
+
+        empty = self.g.EMPTY_BIT
+        propagated = self._propagated = 1 << len(self.g.symbol_names)
+
+        # (C, First(c), c is nullable) for each production C -> B c
+        left_uses = {n: [] for n in self._nt_closure}
+        for prod_nb, (lhs, rhs) in enumerate(self.g.int_productions):
+            if rhs and rhs[0] >= self.g.first_nt_id:
+                first = self._item_first[self._item_base[prod_nb]]
+                left_uses[rhs[0]].append((lhs, first & ~empty,
+                                          first & empty))
+
+        self._nt_la_closure = {}
+        for n, closure in self._nt_closure.items():
+            reached = {self._item_prod[c] for c in closure}
+            reached = {self.g.int_productions[p][0] for p in reached}
+            init = dict.fromkeys(reached, 0)
+            init[n] = propagated
+            edges = {b: [] for b in reached}
+            for b in reached:
+                for c, first, nullable in left_uses[b]:
+                    if c in reached:
+                        init[b] |= first
+                        if nullable:
+                            edges[b].append(c)
+
+            la = digraph(reached, edges, init)
+            self._nt_la_closure[n] = tuple(
+                    (c, la[self.g.int_productions[self._item_prod[c]][0]])
+                    for c in closure)
+
+    def _close_la(self, kernel, las):
+        """Closure of a set of LR(1) items [TRDB] Fig. 4.38 p. 232
+
+        Items are given as a sequence of packed LR(0) items and the
+        sequence of their look-ahead sets, as bitmasks; the result is a
+        dict of look-ahead sets indexed by packed items."""
+        empty = self.g.EMPTY_BIT
+        propagated = self._propagated
+        result = dict(zip(kernel, las))
+
+        for c, la in zip(kernel, las):
+            sym = self._item_next[c]
+            if sym < self.g.first_nt_id:
+                continue
+
+            first = self._item_first[c]
+            new = first & ~empty
+            if first & empty:
+                new |= la
+
+            for code, bits in self._nt_la_closure[sym]:
+                if bits & propagated:
+                    bits = bits & ~propagated | new
+                result[code] = result.get(code, 0) | bits
+
+        return result
+
+    @staticmethod
+    def _compatible(las1, las2):
+        """Tell if two states with the same kernel and the given
+        look-ahead sets can be merged without introducing conflicts that
+        would not appear in canonical LR(1): weak compatibility from
+        Pager: A Practical General Method for Constructing LR(k) Parsers,
+        Acta Informatica 7, 1977"""
+        for i in range(len(las1)):
+            for j in range(i + 1, len(las1)):
+                merged = (las1[i] | las2[i]) & (las1[j] | las2[j])
+                if merged and not (las1[i] & las1[j] or las2[i] & las2[j]):
+                    return False
+        return True
+
+    def _init_ccol(self):
+        """Compute the collection of sets of LR(1) items and transitions
+        between them, merging states as we go when they are compatible
+
+        Like for SLR, only kernels are stored, plus the look-ahead sets
+        of their items. When merging adds look-aheads to a state, it is
+        expanded again to propagate them."""
+        start = (self._item_base[self.AUG_PROD],)
+        kernels = [start]
+        las = [(1 << self.g.END_ID,)]
+        same_kernel = {start: [0]}
+        moves = [{}]  # symbol id -> next state, for each state
+        todo = [0]
+
+        while todo:
+            i = todo.pop()
+            succ = {}
+            for c, la in self._close_la(kernels[i], las[i]).items():
+                sym = self._item_next[c]
+                if sym >= 0:
+                    succ.setdefault(sym, {})[c + 1] = la
+
+            for sym, items in succ.items():
+                kernel = tuple(sorted(items))
+                new_las = tuple(items[c] for c in kernel)
+
+                # prefer the current target, then any compatible state
+                candidates = same_kernel.setdefault(kernel, [])
+                if sym in moves[i]:
+                    candidates = [moves[i][sym]] + candidates
+                for j in candidates:
+                    if new_las == las[j] or (
+                            self.merge and
+                            self._compatible(las[j], new_las)):
+                        break
+                else:
+                    j = len(kernels)
+                    kernels.append(kernel)
+                    las.append((0,) * len(kernel))
+                    same_kernel[kernel].append(j)
+                    moves.append({})
+
+                merged = tuple(a | b for a, b in zip(las[j], new_las))
+                if merged != las[j]:
+                    las[j] = merged
+                    todo.append(j)
+                moves[i][sym] = j
+
+        # drop states that became unreachable when retargeting moves
+        reachable = [0]
+        seen = {0}
+        for i in reachable:  # grows as we go
+            for j in moves[i].values():
+                if j not in seen:
+                    seen.add(j)
+                    reachable.append(j)
+        new_nb = {old: new for new, old in enumerate(reachable)}
+        kernels = [kernels[i] for i in reachable]
+        las = [las[i] for i in reachable]
+        moves = [[(sym, new_nb[j]) for sym, j in moves[i].items()]
+                 for i in reachable]
+
+        order = self._number_states(kernels, moves)
+        self._kernel_las = tuple(las[i] for i in order)
+
+    def _init_tables(self):
+        self._la = {}
+        for i, kernel in enumerate(self.kernels):
+            items = self._close_la(kernel, self._kernel_las[i])
+            for c, la in items.items():
+                if self._item_next[c] < 0:
+                    self._la[i, self._item_prod[c]] = la
+
+        super()._init_tables()
+
+    def _lookaheads(self, state, prod_nb):
+        """Terminals (as a bitmask) on which to reduce by production
+        prod_nb in state: for LR(1), the look-aheads of its item"""
+        return self._la[state, prod_nb]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main(LR1)
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Direct-coded LR parsers: Python source specialised for an automaton"""
+
+from functools import lru_cache
+from itertools import chain
+from parse_tree import ParseTree
+from slr import SLR
+
+
+@lru_cache(maxsize=32)
+def compile_code(source, filename):
+    """Compiled code for the source of a generated parser, shared by all
+    parsers (LRCode, LLCode) generated with identical source"""
+    return compile(source, filename, "exec")
+
+
+class LRCode:
+    """Parser for the automaton of an SLR parser (or of any of its
+    subclasses), generated as Python source with one branch per state
+
+    Each state tests the current token against the terminals it accepts
+    and inlines the corresponding shift or reduction; reductions know the
+    length and left-hand side of their production, and use a constant
+    next state when all gotos on that left-hand side agree. States are
+    selected by bisection on their number. The generated source is kept
+    in the source attribute."""
+
+    NotInLanguage = SLR.NotInLanguage
+
+    def __init__(self, parser):
+        """Generate and compile the code for parser"""
+        self.parser = parser
+        self.source = self._generate()
+        namespace = {
+                "chain": chain,
+                "ParseTree": ParseTree,
+                "NotInLanguage": self.NotInLanguage,
+        }
+        exec(compile_code(self.source, "<lrcode>"), namespace)
+        self.parse = namespace["parse"]
+        self.recognize = namespace["recognize"]
+
+    def _generate(self):
+        """Source defining parse() and recognize(), plus goto dicts"""
+        p = self.parser
+
+        # goto columns, by non-terminal
+        columns = {}
+        for (state, symbol), target in sorted(p.gotos.items()):
+            columns.setdefault(symbol, {})[state] = target
+        self._goto_names = {}
+        lines = []
+        for nb, (symbol, col) in enumerate(sorted(columns.items())):
+            if len(set(col.values())) > 1:
+                name = "GOTO_{}".format(nb)
+                self._goto_names[symbol] = name
+                lines.append("{} = {!r}  # {}".format(name, col, symbol))
+        self._columns = columns
+
+        for tree in (True, False):
+            lines.append("")
+            lines.append("")
+            lines.extend(self._function(tree))
+        return "\n".join(lines) + "\n"
+
+    def _function(self, tree):
+        """Lines of the definition of parse() or recognize()"""
+        name = "parse" if tree else "recognize"
+        yield "def {}(sentence):".format(name)
+        yield "    states = [0]"
+        if tree:
+            yield "    nodes = [None]"
+        yield "    state = 0"
+        end = self.parser.g.END
+        yield "    tok_stream = chain(iter(sentence), ({!r},))".format(end)
+        yield "    token = next(tok_stream)"
+        yield "    while True:"
+        states = range(len(self.parser.kernels))
+        yield from self._dispatch(states, tree, 8)
+
+    def _dispatch(self, states, tree, indent):
+        """Lines selecting the code for the current state by bisection"""
+        pad = " " * indent
+        if len(states) == 1:
+            yield from self._state(states[0], tree, indent)
+            return
+
+        half = len(states) // 2
+        yield "{}if state < {}:".format(pad, states[half])
+        yield from self._dispatch(states[:half], tree, indent + 4)
+        yield "{}else:".format(pad)
+        yield from self._dispatch(states[half:], tree, indent + 4)
+
+    def _state(self, state, tree, indent):
+        """Lines for the actions of one state"""
+        p = self.parser
+        pad = " " * indent
+
+        # group terminals by action, in a deterministic order
+        groups = {}
+        for (i, symbol), action in p.actions.items():
+            if i == state:
+                groups.setdefault(action, []).append(symbol)
+        keyword = "if"
+        for action in sorted(groups, key=repr):
+            symbols = sorted(groups[action], key=repr)
+            if len(symbols) == 1:
+                test = "token == {!r}".format(symbols[0])
+            else:
+                test = "token in {{{}}}".format(", ".join(map(repr, symbols)))
+            yield "{}{} {}:".format(pad, keyword, test)
+            yield from self._action(action, tree, indent + 4)
+            keyword = "elif"
+
+        if keyword == "elif":
+            yield "{}else:".format(pad)
+            pad += "    "
+        yield "{}msg = \"In state '{}', got '{{}}'\".format(token)".format(
+                pad, state)
+        yield "{}raise NotInLanguage(msg)".format(pad)
+
+    def _action(self, action, tree, indent):
+        """Lines for a shift, reduction or accept"""
+        p = self.parser
+        pad = " " * indent
+        kind, info = action
+
+        if kind == p.SHIFT:
+            yield "{}state = {}".format(pad, info)
+            yield "{}states.append({})".format(pad, info)
+            if tree:
+                yield "{}nodes.append(ParseTree(token))".format(pad)
+            yield "{}token = next(tok_stream)".format(pad)
+            return
+
+        if kind == p.ACCEPT:
+            yield "{}return{}".format(pad, " nodes[-1]" if tree else "")
+            return
+
+        lhs, rhs = p.g.productions[info]
+        n = len(rhs)
+        if tree:
+            if n == 0:
+                yield "{}nodes.append(ParseTree({!r}, [ParseTree('')]))" \
+                      .format(pad, lhs)
+            elif n == 1:
+                yield "{}nodes[-1] = ParseTree({!r}, [nodes[-1]])".format(
+                        pad, lhs)
+            else:
+                yield "{0}nodes[-{1}:] = [ParseTree({2!r}, nodes[-{1}:])]" \
+                      .format(pad, n, lhs)
+
+        # pop n states and push the goto target: change the stack top
+        # in place whenever possible
+        below = "state" if n == 0 else "states[-{}]".format(n + 1)
+        if n > 1:
+            yield "{}del states[-{}:]".format(pad, n - 1)
+            below = "states[-2]"
+        if lhs in self._goto_names:
+            target = "{}[{}]".format(self._goto_names[lhs], below)
+        else:
+            target = repr(next(iter(self._columns[lhs].values())))
+        yield "{}state = {}".format(pad, target)
+        if n == 0:
+            yield "{}states.append(state)".format(pad)
+        else:
+            yield "{}states[-1] = state".format(pad)
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+from array import array
+from parse_tree import ParseTree
+from slr import SLR
+from itertools import chain
+
+
+def pack_rows(rows, width):
+    """Pack sparse rows (dicts column -> value) in a single comb vector
+    [TRDB] Sec. 3.9 p. 144 (row displacement)
+
+    Return (base, value, check) arrays such that for each row r and
+    column 0 <= c < width: if check[base[r] + c] == r, then the entry
+    is value[base[r] + c], otherwise it is absent from row r.
+    Rows are placed first-fit by decreasing number of entries."""
+    base = array('i', [0]) * len(rows)
+    value = array('i')
+    check = array('i')
+    first_free = 0
+
+    for r in sorted(range(len(rows)), key=lambda r: -len(rows[r])):
+        cols = sorted(rows[r])
+        if not cols:
+            continue
+
+        b = max(0, first_free - cols[0])
+        while any(b + c < len(check) and check[b + c] != -1 for c in cols):
+            b += 1
+
+        end = b + cols[-1] + 1
+        if end > len(check):
+            value.extend(array('i', [0]) * (end - len(check)))
+            check.extend(array('i', [-1]) * (end - len(check)))
+        for c in cols:
+            value[b + c] = rows[r][c]
+            check[b + c] = r
+        base[r] = b
+
+        while first_free < len(check) and check[first_free] != -1:
+            first_free += 1
+
+    # pad so that base[r] + c is always a valid index
+    end = max(base, default=0) + width
+    if end > len(check):
+        value.extend(array('i', [0]) * (end - len(check)))
+        check.extend(array('i', [-1]) * (end - len(check)))
+
+    return base, value, check
+
+
+class LRTables:
+    """Compiled, compressed form of the tables of an SLR parser (or of
+    any of its subclasses), with a faster parse loop
+
+    Symbols are numbered by their grammar id; actions are ints: 0 for
+    error, s + 1 for shifting to state s, and -(p + 1) for reducing by
+    production p, where p is the number of productions for accept.
+    Each state has a default action, used for columns absent from its
+    row: its most frequent reduction, if any; errors from %nonassoc are
+    stored explicitly, as they must not get it. Gotos are stored by
+    non-terminal column, with the most frequent target as default."""
+
+    def __init__(self, parser):
+        """Compile the action and goto tables of parser"""
+        g = parser.g
+        self.symbol_names = g.symbol_names
+        self.first_nt_id = g.first_nt_id
+        self.nb_states = len(parser.kernels)
+
+        # unknown tokens get a column with no entry
+        self.unknown = g.first_nt_id
+        self.terminal_ids = {g.symbol_names[i]: i
+                             for i in range(g.first_nt_id)}
+        del self.terminal_ids[""]
+
+        self.accept = len(g.productions)
+        self.prod_lhs = array('i', (lhs for lhs, _ in g.int_productions))
+        self.prod_len = array('i', (len(r) for _, r in g.int_productions))
+
+        rows = [{} for _ in range(self.nb_states)]
+        for (state, symbol), (action, info) in parser.actions.items():
+            if action == parser.SHIFT:
+                code = info + 1
+            elif action == parser.REDUCE:
+                code = -(info + 1)
+            else:  # action == parser.ACCEPT
+                code = -(self.accept + 1)
+            rows[state][g.symbol_ids[symbol]] = code
+        for state, symbol in parser.errors:  # explicit, not the default
+            rows[state][g.symbol_ids[symbol]] = 0
+
+        self.default = array('i')
+        for row in rows:
+            reduces = [c for c in row.values()
+                       if c < 0 and c != -(self.accept + 1)]
+            default = max(set(reduces), key=reduces.count, default=0)
+            self.default.append(default)
+            for sym in [sym for sym, c in row.items() if c == default]:
+                del row[sym]
+
+        self.base, self.value, self.check = pack_rows(rows,
+                                                      self.unknown + 1)
+
+        nb_nts = len(g.symbol_ids) - g.first_nt_id
+        columns = [{} for _ in range(nb_nts)]
+        for (state, symbol), target in parser.gotos.items():
+            columns[g.symbol_ids[symbol] - g.first_nt_id][state] = target
+
+        self.goto_default = array('i')
+        for col in columns:
+            targets = list(col.values())
+            default = max(set(targets), key=targets.count, default=0)
+            self.goto_default.append(default)
+            for state in [s for s, t in col.items() if t == default]:
+                del col[state]
+
+        self.goto_base, self.goto_value, self.goto_check = pack_rows(
+                columns, self.nb_states)
+
+    @property
+    def nbytes(self):
+        """Size of the tables in bytes"""
+        arrays = (self.base, self.value, self.check, self.default,
+                  self.goto_base, self.goto_value, self.goto_check,
+                  self.goto_default, self.prod_lhs, self.prod_len)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def action(self, state, symbol_id):
+        """Action code for a state and terminal id"""
+        k = self.base[state] + symbol_id
+        if self.check[k] == state:
+            return self.value[k]
+        return self.default[state]
+
+    def goto(self, state, symbol_id):
+        """Next state for a state and non-terminal id"""
+        col = symbol_id - self.first_nt_id
+        k = self.goto_base[col] + state
+        if self.goto_check[k] == col:
+            return self.goto_value[k]
+        return self.goto_default[col]
+
+    NotInLanguage = SLR.NotInLanguage
+
+    def parse(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, return its parse tree
+        - otherwise, raise NotInLanguage
+        Same as SLR.parse(), using the compressed tables."""
+        return parse_tables(self, sentence)
+
+    def recognize(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, do nothing,
+        - otherwise, raise NotInLanguage
+        Same as parse(), without building a tree."""
+        recognize_tables(self, sentence)
+
+
+def parse_tables(tables, sentence):
+    """Read a sentence (iterable of terminals), and:
+    - if it's in the language, return its parse tree
+    - otherwise, raise tables.NotInLanguage
+    tables is an LRTables, or any object with the same attributes: this
+    is the loop of LRTables.parse(), and of the modules written by emit.py,
+    which copy its source."""
+    # local names for speed
+    base, value, check, default = (tables.base, tables.value, tables.check,
+                                   tables.default)
+    goto_base, goto_value, goto_check, goto_default = (
+            tables.goto_base, tables.goto_value, tables.goto_check,
+            tables.goto_default)
+    prod_lhs, prod_len, names = (tables.prod_lhs, tables.prod_len,
+                                 tables.symbol_names)
+    first_nt, accept = tables.first_nt_id, tables.accept
+    ids, unknown = tables.terminal_ids, tables.unknown
+
+    # parallel stacks of states and tree nodes
+    states = [0]
+    nodes = [None]
+    state = 0
+    tok_stream = chain(iter(sentence), (names[0],))
+    token = next(tok_stream)
+    tok_id = ids.get(token, unknown)
+
+    while True:
+        k = base[state] + tok_id
+        code = value[k] if check[k] == state else default[state]
+
+        if code > 0:
+            state = code - 1
+            states.append(state)
+            nodes.append(ParseTree(token))
+            token = next(tok_stream)
+            tok_id = ids.get(token, unknown)
+
+        elif code < 0:
+            prod_nb = -code - 1
+            if prod_nb == accept:
+                return nodes[-1]
+
+            n = prod_len[prod_nb]
+            if n:
+                children = nodes[-n:]
+                del nodes[-n:]
+                del states[-n:]
+            else:
+                children = [ParseTree('')]
+
+            lhs = prod_lhs[prod_nb] - first_nt
+            k = goto_base[lhs] + states[-1]
+            state = (goto_value[k] if goto_check[k] == lhs
+                     else goto_default[lhs])
+            states.append(state)
+            nodes.append(ParseTree(names[lhs + first_nt], children))
+
+        else:
+            msg = "In state '{}', got '{}'".format(state, token)
+            raise tables.NotInLanguage(msg)
+
+
+def recognize_tables(tables, sentence):
+    """Read a sentence (iterable of terminals), and:
+    - if it's in the language, do nothing,
+    - otherwise, raise tables.NotInLanguage
+    Same as parse_tables(), without building a tree."""
+    base, value, check, default = (tables.base, tables.value, tables.check,
+                                   tables.default)
+    goto_base, goto_value, goto_check, goto_default = (
+            tables.goto_base, tables.goto_value, tables.goto_check,
+            tables.goto_default)
+    prod_lhs, prod_len = tables.prod_lhs, tables.prod_len
+    first_nt, accept = tables.first_nt_id, tables.accept
+    ids, unknown = tables.terminal_ids, tables.unknown
+
+    states = [0]
+    state = 0
+    tok_stream = chain(iter(sentence), (tables.symbol_names[0],))
+    token = next(tok_stream)
+    tok_id = ids.get(token, unknown)
+
+    while True:
+        k = base[state] + tok_id
+        code = value[k] if check[k] == state else default[state]
+
+        if code > 0:
+            state = code - 1
+            states.append(state)
+            token = next(tok_stream)
+            tok_id = ids.get(token, unknown)
+
+        elif code < 0:
+            prod_nb = -code - 1
+            if prod_nb == accept:
+                return
+
+            n = prod_len[prod_nb]
+            if n:
+                del states[-n:]
+
+            lhs = prod_lhs[prod_nb] - first_nt
+            k = goto_base[lhs] + states[-1]
+            state = (goto_value[k] if goto_check[k] == lhs
+                     else goto_default[lhs])
+            states.append(state)
+
+        else:
+            msg = "In state '{}', got '{}'".format(state, token)
+            raise tables.NotInLanguage(msg)
@@ -1,64 +1,99 @@
 #!/usr/bin/python3
 # coding: utf-8
 
-from itertools import chain
+# children of all leaves: trees are mostly leaves, and each node only
+# has two slots, so a leaf takes less memory without its own empty list
+_LEAF = ()
 
 
 class ParseTree:
-    """Simple tree structure to use as output by the parsers"""
+    """Simple tree structure to use as output by the parsers
+
+    Leaves have an empty tuple of children, shared by all of them; other
+    nodes have a list."""
+
+    __slots__ = ("symbol", "children", "__weakref__")
+
     def __init__(self, symbol, children=None):
         self.symbol = symbol
-        self.children = children or []
+        self.children = children or _LEAF
 
     def lines(self, prefix=""):
         """Iterator of lines of a representation of the tree"""
-        yield prefix + (self.symbol or "ε")
-        for child in self.children:
-            yield from child.lines(prefix + "| ")
+        # iterative DFS with explicit stack of (node, depth)
+        todo = [(self, 0)]
+        while todo:
+            node, depth = todo.pop()
+            yield prefix + "| " * depth + (node.symbol or "ε")
+            if node.children:
+                depth += 1
+                todo.extend((child, depth)
+                            for child in reversed(node.children))
+
+    def write_lines(self, out, prefix=""):
+        """Write lines() to file object out, one at a time"""
+        out.writelines(line + "\n" for line in self.lines(prefix))
 
     def __str__(self):
         return "('{}', {} children)".format(self.symbol, len(self.children))
 
-    def _derive(self, rev):
-        """Iterator of steps in a left- or rightmost derivation"""
-        yield self.symbol
-
-        # iterative DFS with explicit stack
+    def steps(self, rightmost=False):
+        """Iterator of steps in a leftmost (or rightmost) derivation, as
+        diffs: (position, symbol, rhs) means that non-terminal symbol,
+        at position in the previous sentential form, is replaced by the
+        symbols of rhs ('' for ε). Unlike full sentential forms, each
+        step only takes time and memory for its own symbols."""
         todo = [self]  # nodes to be visited (stack: next on top)
-        done = []  # terminals produced so far (most recent on top)
-        beg, end = tuple(rev((todo, done)))  # for display
+        done = 0  # terminals produced so far
+        length = 1  # of the sentential form
         while todo:
             cur = todo.pop()
-            if cur.children:
-                todo.extend(list(rev(cur.children)))
-                symbols = map(lambda n: n.symbol, chain(beg, reversed(end)))
-                yield ' '.join(symbols)
+            children = cur.children
+            if children:
+                position = length - 1 - done if rightmost else done
+                yield position, cur.symbol, tuple(c.symbol for c in children)
+                length += len(children) - 1
+                todo.extend(children if rightmost else reversed(children))
             else:
-                done.append(cur)
+                done += 1
+
+    def _derive(self, rightmost):
+        """Iterator of sentential forms in a left- or rightmost
+        derivation"""
+        form = [self.symbol]
+        yield self.symbol
+        for position, _, rhs in self.steps(rightmost):
+            form[position:position + 1] = rhs
+            yield ' '.join(form)
 
     def leftmost(self):
         """Iterator of steps in a leftmost derivation"""
-        yield from self._derive(reversed)
+        yield from self._derive(False)
 
     def rightmost(self):
         """Iterator of steps in a rightmost derivation"""
-        yield from self._derive(lambda x: x)
+        yield from self._derive(True)
+
+    def write_steps(self, out, rightmost=False):
+        """Write the start symbol, then steps() to file object out, as
+        one line "position symbol -> rhs" per step"""
+        out.write(self.symbol + "\n")
+        out.writelines("{} {} -> {}\n".format(position, symbol, " ".join(rhs))
+                       for position, symbol, rhs in self.steps(rightmost))
+
+    def leaves(self):
+        """Iterator of the symbols of the leaves, in order"""
+        todo = [self]
+        while todo:
+            cur = todo.pop()
+            if cur.children:
+                todo.extend(reversed(cur.children))
+            else:
+                yield cur.symbol
 
     def unparse(self):
         """Return a string that would parse as this tree"""
-        leave_symbols = []
-        self._unparse(leave_symbols)
-        while '' in leave_symbols:
-            leave_symbols.remove('')
-        return ' '.join(leave_symbols)
-
-    def _unparse(self, leave_symbols):
-        """Traverse in-order, collecting symbols of leaves"""
-        if not self.children:
-            leave_symbols.append(self.symbol)
-        else:
-            for c in self.children:
-                c._unparse(leave_symbols)
+        return ' '.join(symbol for symbol in self.leaves() if symbol)
 
     def draw(self, name):  # pragma: no cover
         """Create a picture of the tree in <name>.pdf"""
@@ -68,10 +103,47 @@ class ParseTree:
         dot.render(cleanup=True)
 
     def _build_dot(self, dot):  # pragma: no cover
-        dot.node(repr(self), self.symbol)
-        for c in self.children:
-            c._build_dot(dot)
-            dot.edge(repr(self), repr(c))
+        todo = [self]
+        while todo:
+            cur = todo.pop()
+            dot.node(repr(cur), cur.symbol)
+            for c in cur.children:
+                dot.edge(repr(cur), repr(c))
+                todo.append(c)
+
+
+class TreeView(ParseTree):
+    """View of node number index of a tree stored in arrays, with the
+    attributes of a ParseTree read from them on demand; views of the same
+    node are equal
+
+    The tree must have symbol_names, symbols (the number of the symbol of
+    each node in symbol_names) and child_indexes(index), the numbers of
+    the children of a node."""
+
+    __slots__ = ("_tree", "_index")
+
+    def __init__(self, tree, index):
+        self._tree = tree
+        self._index = index
+
+    @property
+    def symbol(self):
+        tree = self._tree
+        return tree.symbol_names[tree.symbols[self._index]]
+
+    @property
+    def children(self):
+        tree = self._tree
+        return [TreeView(tree, i) for i in tree.child_indexes(self._index)] \
+            or _LEAF
+
+    def __eq__(self, other):
+        return isinstance(other, TreeView) and \
+            self._tree is other._tree and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._tree), self._index))
 
 
 if __name__ == "__main__":  # pragma: no cover
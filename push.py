@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Push parsers: tokens are given as they arrive rather than pulled from
+an iterable, so parsing can be suspended and resumed
+
+Stacks are persistent (linked tuples), so copying a push parser, or
+checking whether it can accept a token, costs nothing."""
+
+from abc import ABC, abstractmethod
+from builders import TreeBuilder
+
+
+class PushParser(ABC):
+    """Base class for push parsers, built from an SLR (or subclass) or
+    LL1 parser and an optional builder (see builders.py); subclasses
+    implement the abstract methods, which work on their stacks
+
+    After NotInLanguage, the push parser is left as it was before the
+    bad token, but the builder may already have seen some reductions."""
+
+    def __init__(self, parser, builder=None):
+        self.parser = parser
+        self.builder = builder if builder is not None else TreeBuilder()
+        self.NotInLanguage = parser.NotInLanguage
+        self._stacks = self._start()
+
+    @abstractmethod
+    def _start(self):
+        """Initial stacks"""
+
+    @abstractmethod
+    def _advance(self, stacks, token, build):
+        """Return stacks after reading token, calling the builder if
+        build is true, or raise NotInLanguage"""
+
+    @abstractmethod
+    def _result(self, stacks):
+        """Value of the start symbol, after reading END"""
+
+    def _check_running(self):
+        if self._stacks is None:
+            raise self.NotInLanguage("Got tokens after the end")
+
+    def feed(self, tokens):
+        """Read tokens (an iterable of terminals)"""
+        self._check_running()
+        for token in tokens:
+            self._stacks = self._advance(self._stacks, token, True)
+
+    def feed_end(self):
+        """Read the end of the sentence and return its value (by
+        default, its parse tree)"""
+        self._check_running()
+        stacks = self._advance(self._stacks, self.parser.g.END, True)
+        self._stacks = None
+        return self._result(stacks)
+
+    def can_accept(self, token=None):
+        """Tell if token can be read next, or if the tokens read so far
+        are a sentence when token is None"""
+        if self._stacks is None:
+            return False
+        if token is None:
+            token = self.parser.g.END
+        try:
+            self._advance(self._stacks, token, False)
+        except self.NotInLanguage:
+            return False
+        return True
+
+    def copy(self):
+        """Independent push parser in the same state, sharing the builder
+        (which does not matter for stateless builders)"""
+        new = object.__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        return new
+
+    async def parse_async(self, tokens):
+        """Read tokens from an async iterable, then the end, and return
+        the value of the sentence"""
+        async for token in tokens:
+            self.feed((token,))
+        return self.feed_end()
+
+
+class LRPushParser(PushParser):
+    """Push parser for SLR and its subclasses
+
+    The stack is a linked list of (state, value, rest) tuples."""
+
+    def _start(self):
+        return (0, None, None)
+
+    def _advance(self, stack, token, build):
+        p = self.parser
+        actions, gotos, productions = p.actions, p.gotos, p.g.productions
+        shift, reduce = self.builder.shift, self.builder.reduce
+
+        while True:
+            try:
+                action, info = actions[stack[0], token]
+            except KeyError:
+                msg = "In state '{}', got '{}'".format(stack[0], token)
+                raise self.NotInLanguage(msg)
+
+            if action == p.SHIFT:
+                return (info, shift(token) if build else None, stack)
+
+            elif action == p.REDUCE:
+                lhs, rhs = productions[info]
+                values = []
+                for _ in rhs:
+                    values.append(stack[1])
+                    stack = stack[2]
+                value = None
+                if build:
+                    values.reverse()
+                    value = reduce(info, lhs, values)
+                stack = (gotos[stack[0], lhs], value, stack)
+
+            else:  # action == p.ACCEPT
+                return stack
+
+    def _result(self, stack):
+        return stack[1]
+
+
+class LL1PushParser(PushParser):
+    """Push parser for LL1
+
+    The stacks are linked lists of (item, rest) tuples: one for symbols
+    and production numbers, as in LL1.parse(), and one for values."""
+
+    def _start(self):
+        g = self.parser.g
+        return (g.start_symbol, (g.END, None)), None
+
+    def _advance(self, stacks, token, build):
+        p = self.parser
+        g = p.g
+        table, productions = p.table, g.productions
+        shift, reduce = self.builder.shift, self.builder.reduce
+        stack, values = stacks
+
+        while True:
+            state, stack = stack
+            if state in g.non_terminals:
+                if (state, token) not in table:
+                    msg = "In state '{}', got '{}'".format(state, token)
+                    raise self.NotInLanguage(msg)
+
+                prod_idx = table[state, token]
+                stack = (prod_idx, stack)
+                for sym in reversed(productions[prod_idx][1]):
+                    stack = (sym, stack)
+            elif isinstance(state, int) and state >= 0:
+                if build:
+                    lhs, rhs = productions[state]
+                    args = []
+                    for _ in rhs:
+                        value, values = values
+                        args.append(value)
+                    args.reverse()
+                    values = (reduce(state, lhs, args), values)
+            else:
+                if token != state:
+                    msg = "Expected '{}', got '{}'".format(state, token)
+                    raise self.NotInLanguage(msg)
+
+                if build and state != g.END:
+                    values = (shift(token), values)
+                return stack, values
+
+    def _result(self, stacks):
+        return stacks[1][0]
@@ -1,7 +1,9 @@
 #!/usr/bin/python3
 # coding: utf-8
 
-from parse_tree import ParseTree
+from grammar import digraph, iter_bits
+from batch import parse_many
+from builders import TreeBuilder
 from itertools import chain
 
 
@@ -19,13 +21,15 @@ class SLR:
     def __init__(self, grammar):
         """Generate SLR(1) parser corresponding to a Grammar object"""
         self.g = grammar
+        self._init_items()
+        self._init_closures()
         self._init_ccol()
         self._init_tables()
 
     def _get_prod(self, nb):
         """Get production by number in the augmented grammar"""
         if nb == self.AUG_PROD:
-            return "|", self.g.start_symbol
+            return "|", (self.g.start_symbol,)
         return self.g.productions[nb]
 
     def str_item(self, item):
@@ -35,120 +39,325 @@ class SLR:
         out = chain((lhs, '->'), rhs[:cursor], ('|',), rhs[cursor:])
         return ' '.join(out)
 
-    def _get_after_cursor(self, item):
-        """Return the symbol after the cursor in item"""
+    def _init_items(self):
+        """Number LR(0) items so that each one is packed in a single int:
+        item (prod_nb, cursor) is item_base[prod_nb] + cursor.
+
+        For each packed item, also record the id of the symbol after the
+        cursor, or -1 if the cursor is at the end."""
+        start_id = self.g.symbol_ids[self.g.start_symbol]
+        prods = chain(((self.AUG_PROD, (None, (start_id,))),),
+                      enumerate(self.g.int_productions))
+
+        self._item_base = {}
+        item_prod, item_cursor, item_next = [], [], []
+        for prod_nb, (lhs, rhs) in prods:
+            self._item_base[prod_nb] = len(item_prod)
+            for cursor in range(len(rhs) + 1):
+                item_prod.append(prod_nb)
+                item_cursor.append(cursor)
+                item_next.append(rhs[cursor] if cursor < len(rhs) else -1)
+
+        self._item_prod = tuple(item_prod)
+        self._item_cursor = tuple(item_cursor)
+        self._item_next = tuple(item_next)
+
+    def pack_item(self, item):
+        """Packed int form of an item given as (prod_nb, cursor)"""
         prod_nb, cursor = item
-        lhs, rhs = self._get_prod(prod_nb)
-        return rhs[cursor] if cursor < len(rhs) else ''
+        return self._item_base[prod_nb] + cursor
+
+    def unpack_item(self, code):
+        """Item as (prod_nb, cursor) from its packed int form"""
+        return self._item_prod[code], self._item_cursor[code]
+
+    def _init_closures(self):
+        """Pre-compute the closure of the items [A -> | ...] for each
+        non-terminal A, that is the items of all productions of A and of
+        the non-terminals that can start them, recursively; also record
+        which of those items are for empty productions"""
+        nt_ids = range(self.g.first_nt_id, len(self.g.symbol_ids))
+        names = self.g.symbol_names
+        prods = self.g.int_productions
+
+        init, starts = {}, {}
+        for n in nt_ids:
+            prod_nbs = self.g.productions_by_lhs[names[n]]
+            init[n] = frozenset(self._item_base[p] for p in prod_nbs)
+            starts[n] = {prods[p][1][0] for p in prod_nbs
+                         if prods[p][1]
+                         and prods[p][1][0] >= self.g.first_nt_id}
+
+        self._nt_closure = digraph(nt_ids, starts, init)
+        self._nt_empty = {n: frozenset(c for c in self._nt_closure[n]
+                                       if self._item_next[c] < 0)
+                          for n in nt_ids}
+
+    def _close(self, kernel):
+        """Closure of an iterable of packed items, as a set"""
+        result = set(kernel)
+
+        for sym in {self._item_next[c] for c in result}:
+            if sym >= self.g.first_nt_id:
+                result |= self._nt_closure[sym]
+
+        return result
 
     def closure(self, items):
         """Return the closure of s set of items [TRDB] Fig 4.33 p. 223"""
-        todo = set(items)
-        done = set()
-
-        while todo:
-            it = todo.pop()
-            after_cursor = self._get_after_cursor(it)
-            if after_cursor in self.g.non_terminals:
-                for i, prod in enumerate(self.g.productions):
-                    if prod[0] == after_cursor:
-                        new_it = (i, 0)
-                        if new_it not in done:
-                            todo.add(new_it)
-            done.add(it)
-
-        return frozenset(done)
+        kernel = map(self.pack_item, items)
+        return frozenset(map(self.unpack_item, self._close(kernel)))
 
     def goto(self, items, symbol):
         """Return the set of new items reachable from items after symbol
         [TRDB] Fig 4.34 p. 224"""
-        new_items = set()
-
-        for it in items:
-            after_cursor = self._get_after_cursor(it)
-            if after_cursor == symbol:
-                prod_nb, cursor = it
-                new_items.add((prod_nb, cursor + 1))
-
-        return self.closure(new_items)
+        sym = self.g.symbol_ids.get(symbol)
+        kernel = (c + 1 for c in map(self.pack_item, items)
+                  if self._item_next[c] == sym)
+        return frozenset(map(self.unpack_item, self._close(kernel)))
 
     def _init_ccol(self):
-        """Compute the canonical collection of sets of LR(0) items
-        [TRDB] Fig 4.34 p. 224"""
-        todo = {self.closure({(self.AUG_PROD, 0)})}
-        done = set()
-
-        while todo:
-            cur = todo.pop()
-            for s in self.g.symbols:
-                new = self.goto(cur, s)
-                if new and new not in done:
-                    todo.add(new)
-            done.add(cur)
-
-        # for testing convenience, sort in the same order as [TRDB]
-        ccol = [tuple(sorted(s, key=lambda t: (-t[1], t[0]))) for s in done]
-        self.ccol = tuple(sorted(ccol, key=lambda tt: (tt[0][1], tt[0][0])))
-
-        # reverse index, to convert goto() result to a state number
-        self.ccol_idx = {frozenset(t): i for i, t in enumerate(self.ccol)}
+        """Compute the canonical collection of sets of LR(0) items,
+        and the transitions between them
+        [TRDB] Fig 4.34 p. 224
+
+        Only kernel items are stored, as sorted tuples of packed items
+        that identify the states; closures are only computed temporarily
+        for expanding a state, or on demand (see ccol)."""
+        start = (self._item_base[self.AUG_PROD],)
+        kernels = [start]
+        state_of = {start: 0}
+        moves = []  # list of (symbol id, next state) for each state
+
+        for kernel in kernels:  # grows as we go
+            succ = {}
+            for c in self._close(kernel):
+                sym = self._item_next[c]
+                if sym >= 0:
+                    succ.setdefault(sym, []).append(c + 1)
+
+            row = []
+            for sym, new in succ.items():
+                new = tuple(sorted(new))
+                if new not in state_of:
+                    state_of[new] = len(kernels)
+                    kernels.append(new)
+                row.append((sym, state_of[new]))
+            moves.append(row)
+
+        self._number_states(kernels, moves)
+
+    def _number_states(self, kernels, moves):
+        """Set kernels and transitions from states numbered in any order,
+        renumbering them in the order of [TRDB] for testing convenience;
+        return the list of previous numbers in the new order
+
+        Moves are lists of (symbol id, next state) for each state."""
+        # the order of [TRDB] only depends on the first item of kernels
+        def key(i):
+            items = sorted(map(self.unpack_item, kernels[i]),
+                           key=self._trdb_order)
+            return (items[0][1], items[0][0]), items
+
+        order = sorted(range(len(kernels)), key=key)
+        new_nb = {old: new for new, old in enumerate(order)}
+        self.kernels = tuple(kernels[i] for i in order)
+
+        # goto() between states numbers, for all symbols
+        names = self.g.symbol_names
+        self.transitions = {(new_nb[i], names[sym]): new_nb[j]
+                            for i, row in enumerate(moves)
+                            for sym, j in row}
+
+        self._ccol = self._ccol_idx = None  # built on demand
+        return order
+
+    @staticmethod
+    def _trdb_order(item):
+        """Sort key for items in a set: by decreasing cursor, then by
+        production number"""
+        prod_nb, cursor = item
+        return -cursor, prod_nb
+
+    @property
+    def ccol(self):
+        """The canonical collection as closed sets of (prod_nb, cursor)
+        items, sorted as in [TRDB]; built from the kernels on demand"""
+        if self._ccol is None:
+            self._ccol = tuple(
+                    tuple(sorted(map(self.unpack_item, self._close(k)),
+                                 key=self._trdb_order))
+                    for k in self.kernels)
+        return self._ccol
+
+    @property
+    def ccol_idx(self):
+        """Reverse index of ccol, to convert goto() result to a state
+        number; built on demand"""
+        if self._ccol_idx is None:
+            self._ccol_idx = {frozenset(t): i
+                              for i, t in enumerate(self.ccol)}
+        return self._ccol_idx
+
+    def _reductions(self, kernel):
+        """Packed items with the cursor at the end in the closure of
+        kernel, without computing the whole closure"""
+        result = {c for c in kernel if self._item_next[c] < 0}
+
+        for sym in {self._item_next[c] for c in kernel}:
+            if sym >= self.g.first_nt_id:
+                result |= self._nt_empty[sym]
+
+        return result
 
     class GrammarNotSLR(ValueError):
         pass
 
-    def _set_action(self, state, symbol, action, info=0):
-        if symbol == '':
-            symbol = self.g.END
+    GrammarError = GrammarNotSLR  # raised on conflicts, see subclasses
+
+    def _compare_precedence(self, symbol, prod_nb):
+        """For a shift/reduce conflict between terminal symbol and
+        production prod_nb, return 1 if reducing wins, -1 if shifting
+        wins, 0 if neither (non-associative), or None if precedence
+        declarations don't tell"""
+        prod_prec = self.g.prod_precedence[prod_nb]
+        sym_prec = self.g.precedence.get(symbol)
+        if prod_prec is None or sym_prec is None:
+            return None
+        if prod_prec[0] != sym_prec[0]:
+            return 1 if prod_prec[0] > sym_prec[0] else -1
+        return {"left": 1, "right": -1, "nonassoc": 0}[sym_prec[1]]
+
+    def _resolve(self, state, symbol, prev, new):
+        """Action to keep in the cell (state, symbol) of the action table
+        for two of its (action, info): None for an error, when they are
+        non-associative operators; raise GrammarError if precedence
+        declarations don't tell"""
+        if prev == new:
+            return prev
+        action, info = new
+        prev_action, prev_info = prev
+
+        # shift/reduce conflicts can be resolved by precedence
+        if {action, prev_action} == {self.SHIFT, self.REDUCE}:
+            prod_nb = info if action == self.REDUCE else prev_info
+            order = self._compare_precedence(symbol, prod_nb)
+            if order == 0:
+                return None
+            if order is not None:
+                return new if (order > 0) == (action == self.REDUCE) \
+                    else prev
+
+        msg = "{}/reduce conflict for ({}, {}): {}{} vs {}{}".format(
+                "Reduce" if prev_action == action else "Shift",
+                state, symbol, self.STR_ACTION[action], info,
+                self.STR_ACTION[prev_action], prev_info)
+        raise self.GrammarError(msg)
 
-        if (state, symbol) in self.actions:
-            prev_action, prev_info = self.actions[state, symbol]
-            if prev_action == action and prev_info == info:
+    def _set_action(self, state, symbol, action, info=0):
+        key, new = (state, symbol), (action, info)
+        if key in self.errors:
+            # still an error, unless new conflicts with what was there
+            for prev in self.errors[key]:
+                self._resolve(state, symbol, prev, new)
+            self.errors[key].add(new)
+            return
+
+        if key in self.actions:
+            new = self._resolve(state, symbol, self.actions[key], new)
+            if new is None:
+                self.errors[key] = {self.actions.pop(key), (action, info)}
                 return
+        self.actions[key] = new
 
-            msg = "{}/reduce conflict for ({}, {}): {}{} vs {}{}".format(
-                    "Reduce" if prev_action == action else "Shift",
-                    state, symbol, self.STR_ACTION[action], info,
-                    self.STR_ACTION[prev_action], prev_info)
-            raise self.GrammarNotSLR(msg)
-
-        self.actions[state, symbol] = (action, info)
+    def _lookaheads(self, state, prod_nb):
+        """Terminals (as a bitmask) on which to reduce by production
+        prod_nb in state: for SLR(1), Follow of its lhs"""
+        lhs = self.g.int_productions[prod_nb][0]
+        return self.g.follow_bits[lhs]
 
     def _init_tables(self):
-        """Compute parsing tables [TRDB] Alg 4.8 p. 227"""
+        """Compute parsing tables [TRDB] Alg 4.8 p. 227
+
+        Cells of the action table made errors by %nonassoc are missing
+        from actions, and listed in errors, with the actions that were
+        there: tables with default actions must keep them errors."""
         self.actions = {}
+        self.errors = {}
         self.gotos = {}
 
-        for i, set_i in enumerate(self.ccol):
-            for item in set_i:
-                prod_nb = item[0]
-                sym = self._get_after_cursor(item)
-
-                if sym in self.g.terminals:
-                    set_j = self.goto(set_i, sym)
-                    j = self.ccol_idx[set_j]
-                    self._set_action(i, sym, self.SHIFT, j)
-
-                elif sym == '' and prod_nb != self.AUG_PROD:
-                    lhs = self.g.productions[prod_nb][0]
-                    for f in self.g.follow[lhs]:
-                        self._set_action(i, f, self.REDUCE, prod_nb)
-
-                elif sym == '' and prod_nb == self.AUG_PROD:
-                    self._set_action(i, sym, self.ACCEPT)
-
-                else:  # sym in self.g.non_terminals:
-                    set_j = self.goto(set_i, sym)
-                    j = self.ccol_idx[set_j]
-                    self.gotos[i, sym] = j
+        for (i, sym), j in self.transitions.items():
+            if sym in self.g.terminals:
+                self._set_action(i, sym, self.SHIFT, j)
+            else:
+                self.gotos[i, sym] = j
+
+        for i, kernel in enumerate(self.kernels):
+            for c in self._reductions(kernel):
+                prod_nb = self._item_prod[c]
+                if prod_nb == self.AUG_PROD:
+                    self._set_action(i, self.g.END, self.ACCEPT)
+                    continue
+
+                for f in iter_bits(self._lookaheads(i, prod_nb)):
+                    f = self.g.symbol_names[f]
+                    self._set_action(i, f, self.REDUCE, prod_nb)
+
+        self._unit_chains = None  # built on demand
+
+    @property
+    def unit_chains(self):
+        """Precomposed gotos through unit reductions (by productions
+        A -> B with B a non-terminal): for each goto from state p on B
+        and terminal t such that the next action is a unit reduction,
+        (p, B, t) -> (state, unit productions), the state reached after
+        the whole chain of unit reductions, and their numbers in order"""
+        if self._unit_chains is not None:
+            return self._unit_chains
+
+        productions = self.g.productions
+        units = {i for i, (lhs, rhs) in enumerate(productions)
+                 if len(rhs) == 1 and rhs[0] in self.g.non_terminals}
+        by_state = {}
+        for (state, symbol), (action, info) in self.actions.items():
+            if action == self.REDUCE and info in units:
+                by_state.setdefault(state, []).append((symbol, info))
+
+        self._unit_chains = {}
+        for (p, lhs), s in self.gotos.items():
+            for t, prod_nb in by_state.get(s, ()):
+                chain = [prod_nb]
+                state = self.gotos[p, productions[prod_nb][0]]
+                while len(chain) <= len(units):
+                    action, info = self.actions.get((state, t), (0, 0))
+                    if action != self.REDUCE or info not in units:
+                        break
+                    chain.append(info)
+                    state = self.gotos[p, productions[info][0]]
+                self._unit_chains[p, lhs, t] = (state, tuple(chain))
+        return self._unit_chains
 
     class NotInLanguage(ValueError):
         pass
 
-    def parse(self, sentence):
+    def parse(self, sentence, builder=None, units="reduce"):
         """Read a sentence (iterable of terminals), and:
-        - if it's in the language, do nothing (for now),
+        - if it's in the language, return the value built for it by
+          builder (see builders.py): by default, its parse tree
         - otherwise, raise NotInLanguage
-        [TRDB] Algorithm Fig 4.30 p. 219"""
+        [TRDB] Algorithm Fig 4.30 p. 219
+
+        With units="keep" or "collapse", unit reductions (A -> B with B
+        a non-terminal) are done in one step, using unit_chains: "keep"
+        still gives them to the builder, "collapse" skips them, so that
+        for instance B is a child of the parent of A in the tree."""
+        if builder is None:
+            builder = TreeBuilder()
+        shift, reduce = builder.shift, builder.reduce
+        if units not in ("reduce", "keep", "collapse"):
+            raise ValueError("Unknown units mode: {!r}".format(units))
+        chains = self.unit_chains if units != "reduce" else {}
+        keep = units == "keep"
 
         # store pairs on the stack instead of two values
         stack = [(0, None)]
@@ -165,39 +374,95 @@ class SLR:
                 raise self.NotInLanguage(msg)
 
             if action == self.SHIFT:
-                node = ParseTree(token)
-                stack.append((info, node))
+                stack.append((info, shift(token)))
                 token = next(tok_stream)
 
             elif action == self.REDUCE:
                 lhs, rhs = self.g.productions[info]
-                children = [stack.pop()[1] for _ in range(len(rhs))]
-                children.reverse()
-                node = ParseTree(lhs, children)
+                values = [stack.pop()[1] for _ in range(len(rhs))]
+                values.reverse()
+                value = reduce(info, lhs, values)
                 prev_state = stack[-1][0]
                 new_state = self.gotos[prev_state, lhs]
-                stack.append((new_state, node))
+                if chains and (prev_state, lhs, token) in chains:
+                    new_state, unit_prods = chains[prev_state, lhs, token]
+                    if keep:
+                        for prod_nb in unit_prods:
+                            lhs = self.g.productions[prod_nb][0]
+                            value = reduce(prod_nb, lhs, [value])
+                stack.append((new_state, value))
 
             else:  # action == self.ACCEPT:
                 return stack[-1][1]
 
+    def recognize(self, sentence):
+        """Read a sentence (iterable of terminals), and:
+        - if it's in the language, do nothing,
+        - otherwise, raise NotInLanguage
+        Same as parse(), with only states on the stack."""
+        actions, gotos = self.actions, self.gotos
+        productions = self.g.productions
+        stack = [0]
+        tok_stream = chain(iter(sentence), (self.g.END,))
+        token = next(tok_stream)
 
-if __name__ == "__main__":  # pragma: no cover
+        while True:
+            try:
+                action, info = actions[stack[-1], token]
+            except KeyError:
+                msg = "In state '{}', got '{}'".format(stack[-1], token)
+                raise self.NotInLanguage(msg)
+
+            if action == self.SHIFT:
+                stack.append(info)
+                token = next(tok_stream)
+
+            elif action == self.REDUCE:
+                lhs, rhs = productions[info]
+                if rhs:
+                    del stack[-len(rhs):]
+                stack.append(gotos[stack[-1], lhs])
+
+            else:  # action == self.ACCEPT:
+                return
+
+    def parse_many(self, sentences, workers=None, chunksize=64,
+                   builder=None):
+        """Iterator of the values of sentences, in order, using several
+        processes; see batch.parse_many()"""
+        return parse_many(self, sentences, workers, chunksize, builder)
+
+
+def main(parser_class):  # pragma: no cover
+    """Command-line interface shared by SLR and its subclasses"""
     from grammar import Grammar
     import sys
 
-    if not 2 <= len(sys.argv) <= 4:
-        usage = "Usage: slr.py grammar_file [string_to_parse] [name]\n"
-        sys.stderr.write(usage)
+    name = parser_class.__name__
+    args = sys.argv[1:]
+    emit_to = None
+    if args[:1] == ["--emit"] and len(args) == 3:
+        emit_to, args = args[1], args[2:]
+
+    if not 1 <= len(args) <= 3:
+        usage = ("Usage: {}.py grammar_file [string_to_parse] [name]\n"
+                 "   or: {}.py --emit out_file grammar_file\n")
+        sys.stderr.write(usage.format(name.lower(), name.lower()))
         sys.exit(1)
 
-    with open(sys.argv[1]) as gram_in:
+    with open(args[0]) as gram_in:
         try:
-            slr = SLR(Grammar(gram_in))
-        except SLR.GrammarNotSLR as err:
-            sys.stderr.write("Grammar is not SLR:\n{}\n".format(err))
+            slr = parser_class(Grammar(gram_in))
+        except parser_class.GrammarError as err:
+            sys.stderr.write("Grammar is not {}:\n{}\n".format(name, err))
             sys.exit(1)
 
+    if emit_to:
+        from emit import emit_lr
+        with open(emit_to, "w") as out:
+            emit_lr(slr, out, args[0])
+        sys.exit(0)
+
     print("Canonical collection of LR(0) items:")
     for i, items in enumerate(slr.ccol):
         print(i)
@@ -223,24 +488,28 @@ if __name__ == "__main__":  # pragma: no cover
         print("{}\t{}\t{}".format(state, symbol, slr.gotos[state, symbol]))
     print()
 
-    if len(sys.argv) == 2:
+    if len(args) == 1:
         sys.exit(0)
 
-    sentence = sys.argv[2]
+    sentence = args[1]
     try:
         tree = slr.parse(sentence.split())
-    except SLR.NotInLanguage as err:
+    except parser_class.NotInLanguage as err:
         sys.stderr.write("Sentence not in language:\n{}\n".format(err))
         sys.exit(1)
 
     print("Parse tree:")
-    print("\n".join(tree.lines()))
+    tree.write_lines(sys.stdout)
     print()
 
     print("Rightmost derivation:")
     print(" -> ".join(tree.rightmost()))
     print()
 
-    if len(sys.argv) == 4:
-        tree.draw(sys.argv[3])
-        print("Saved to {}.pdf".format(sys.argv[3]))
+    if len(args) == 3:
+        tree.draw(args[2])
+        print("Saved to {}.pdf".format(args[2]))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main(SLR)
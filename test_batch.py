@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+import batch
+from builders import Builder
+from grammar import Grammar
+from ll1 import LL1
+from llcode import LLCode
+from lltables import LLTables
+from lrcode import LRCode
+from lrtables import LRTables
+from slr import SLR
+
+
+class KnownValues(unittest.TestCase):
+    lr_gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+    ll_gram = ("E -> T E'", "E' -> + T E' |", "T -> F T'", "T' -> * F T' |",
+               "F -> ( E ) | id")
+
+    sentences = ("id", "id + id * id", "id +", "( id + id ) * id", "+",
+                 "( id * ( id + id ) + id ) * id * id") * 20
+
+    def test_parse_many(self):
+        """batch: parse_many() should give values and errors in order"""
+        for parser in (SLR(Grammar(self.lr_gram)),
+                       LL1(Grammar(self.ll_gram))):
+            words = [s.split() for s in self.sentences]
+            for workers in (1, 2):
+                results = parser.parse_many(words, workers, chunksize=7)
+                for sentence, result in zip(words, results):
+                    try:
+                        ref = tuple(parser.parse(sentence).lines())
+                    except parser.NotInLanguage:
+                        self.assertIsInstance(result, parser.NotInLanguage)
+                    else:
+                        self.assertEqual(ref, tuple(result.lines()))
+
+    def test_no_builder(self):
+        """batch: parse_many() should work with parsers without builders"""
+        slr, ll1 = SLR(Grammar(self.lr_gram)), LL1(Grammar(self.ll_gram))
+        words = [s.split() for s in self.sentences[:6]]
+        for ref, parser in ((slr, LRTables(slr)), (slr, LRCode(slr)),
+                            (ll1, LLTables(ll1)), (ll1, LLCode(ll1))):
+            for workers in (1, 2):
+                results = list(batch.parse_many(parser, words, workers))
+                self.assertIsInstance(results[2], parser.NotInLanguage)
+                self.assertIsInstance(results[4], parser.NotInLanguage)
+                for i in (0, 1, 3, 5):
+                    self.assertEqual(tuple(ref.parse(words[i]).lines()),
+                                     tuple(results[i].lines()))
+
+    def test_builder(self):
+        """batch: parse_many() should pass the builder to the workers"""
+        parser = SLR(Grammar(self.lr_gram))
+        results = list(parser.parse_many([["id"], ["id", "+", "id"]],
+                                         workers=2, builder=Builder()))
+        self.assertEqual([None, None], results)
+
+    def test_interleaved(self):
+        """batch: parse_many() iterators should not share their parsers"""
+        slr, ll1 = SLR(Grammar(self.lr_gram)), LL1(Grammar(self.ll_gram))
+        words = [s.split() for s in self.sentences[:6]]
+        for workers in (1, 2):
+            slr_results = slr.parse_many(words, workers)
+            ll1_results = ll1.parse_many(words, workers, builder=Builder())
+            for sentence in words:
+                slr_result, ll1_result = next(slr_results), next(ll1_results)
+                try:
+                    ref = tuple(slr.parse(sentence).lines())
+                except slr.NotInLanguage:
+                    self.assertIsInstance(slr_result, slr.NotInLanguage)
+                    self.assertIsInstance(ll1_result, ll1.NotInLanguage)
+                else:
+                    self.assertEqual(ref, tuple(slr_result.lines()))
+                    self.assertIsNone(ll1_result)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from builders import Actions, Builder, FlatTree, ReductionLog, \
+    SharedTreeBuilder, TreeBuilder
+from earley import Earley
+from grammar import Grammar
+from ll1 import LL1
+from slr import SLR
+
+
+class Counter(Builder):
+    """Visitor counting tokens and reductions"""
+    def __init__(self):
+        self.tokens = self.reductions = 0
+
+    def shift(self, token):
+        self.tokens += 1
+
+    def reduce(self, prod_nb, lhs, values):
+        self.reductions += 1
+
+
+class KnownValues(unittest.TestCase):
+    lr_gram = Grammar(("E -> E + T | T", "T -> T * F | F",
+                       "F -> ( E ) | id"))
+    ll_gram = Grammar(("E -> T E'", "E' -> + T E' |", "T -> F T'",
+                       "T' -> * F T' |", "F -> ( E ) | id"))
+
+    # sentences (ids are replaced by 2) and their values
+    values = (
+            ("id", 2),
+            ("id + id * id", 6),
+            ("( id + id ) * id", 8),
+            ("( id * ( id + id ) + id ) * id * id", 40),
+    )
+
+    def test_actions_lr(self):
+        """builders: Actions should evaluate expressions with SLR"""
+        builder = Actions(self.lr_gram, {
+                "E -> E + T": lambda e, plus, t: e + t,
+                "T -> T * F": lambda t, times, f: t * f,
+                "F -> ( E )": lambda lpar, e, rpar: e,
+                "F -> id": lambda id: 2,
+        })
+        slr = SLR(self.lr_gram)
+        for sentence, value in self.values:
+            self.assertEqual(value, slr.parse(sentence.split(), builder))
+
+    def test_actions_ll1(self):
+        """builders: Actions should evaluate expressions with LL1"""
+        # E' and T' return a function applying the rest of the sums or
+        # products to their left operand
+        rest = {
+                "E' -> + T E'": lambda plus, t, r: lambda x: r(x + t),
+                "T' -> * F T'": lambda times, f, r: lambda x: r(x * f),
+                "E' -> ": lambda: lambda x: x,
+                "T' -> ": lambda: lambda x: x,
+        }
+        builder = Actions(self.ll_gram, dict(rest, **{
+                "E": lambda t, r: r(t),
+                "T": lambda f, r: r(f),
+                "F -> ( E )": lambda lpar, e, rpar: e,
+                "F -> id": lambda id: 2,
+        }))
+        ll1 = LL1(self.ll_gram)
+        for sentence, value in self.values:
+            self.assertEqual(value, ll1.parse(sentence.split(), builder))
+
+    def test_actions_keys(self):
+        """builders: Actions should take productions in several ways"""
+        gram = Grammar(("S -> A b | c", "A -> a"))
+        slr = SLR(gram)
+        join = "".join
+        tests = (
+                ({}, "c", "a"),  # first value by default
+                ({"S": lambda *v: join(v)}, "c", "ab"),
+                ({"S": lambda *v: join(v), "S -> c": str.upper}, "C", "ab"),
+                ({"S -> c": str.upper, "S": lambda *v: join(v)}, "C", "ab"),
+                ({"S": lambda *v: join(v), 0: lambda a, b: b}, "c", "b"),
+        )
+        for actions, value_c, value_ab in tests:
+            builder = Actions(gram, actions)
+            self.assertEqual(value_c, slr.parse(["c"], builder))
+            self.assertEqual(value_ab, slr.parse(["a", "b"], builder))
+        for key in ("T", "S -> d", 3):
+            with self.assertRaises(KeyError):
+                Actions(gram, {key: None})
+
+    def test_visitor(self):
+        """builders: parsers should call Builder methods as they go"""
+        sentence = "( id + id ) * id".split()
+        for parser in (SLR(self.lr_gram), LL1(self.ll_gram)):
+            counter = Counter()
+            self.assertIsNone(parser.parse(sentence, counter))
+            self.assertEqual(len(sentence), counter.tokens)
+            tree = parser.parse(sentence, TreeBuilder())
+            nb_nodes = len(list(tree.lines()))
+            self.assertEqual(nb_nodes - len(sentence), counter.reductions
+                             + sum(line.endswith("ε")
+                                   for line in tree.lines()))
+
+    def test_reduction_log(self):
+        """builders: ReductionLog should give back trees and sentences"""
+        gram = Grammar(("S -> A B c | d A B", "A -> a A |", "B -> b |"))
+        for sentence in ("c", "a b c", "a a c", "d", "d a a b"):
+            words = sentence.split()
+            for parser in (SLR(gram), LL1(gram)):
+                tree = parser.parse(words)
+                log = parser.parse(words, ReductionLog(gram))
+                self.assertEqual(tuple(tree.lines()),
+                                 tuple(log.tree().lines()))
+                self.assertEqual(tuple(tree.rightmost()),
+                                 tuple(log.rightmost()))
+                self.assertEqual(sentence, log.unparse())
+
+    def test_reduction_log_values(self):
+        """builders: check ReductionLog against known values"""
+        log = SLR(self.lr_gram).parse("id * ( id )".split(),
+                                      ReductionLog(self.lr_gram))
+        # F -> id, T -> F, F -> id, T -> F, E -> T, F -> ( E ),
+        # T -> T * F, E -> T
+        self.assertEqual([5, 3, 5, 3, 1, 4, 2, 1], list(log.prods))
+        self.assertEqual([1, 1, 4, 4, 4, 5, 5, 5], list(log.positions))
+        self.assertEqual(8, len(log))
+        self.assertEqual(8 * 2 * 4, log.nbytes)
+
+    def test_shared_trees(self):
+        """builders: SharedTreeBuilder should share identical subtrees"""
+        for parser in (SLR(self.lr_gram), LL1(self.ll_gram)):
+            builder = SharedTreeBuilder()
+            for sentence, _ in self.values:
+                words = sentence.split()
+                tree = parser.parse(words, builder)
+                self.assertEqual(tuple(parser.parse(words).lines()),
+                                 tuple(tree.lines()))
+                self.assertIs(tree, parser.parse(words, builder))
+
+        # F -> id, T -> F, and the leaves: one node each
+        builder = SharedTreeBuilder()
+        tree = SLR(self.lr_gram).parse("id * id + id".split(), builder)
+        left, plus, right = tree.children
+        self.assertIs(right, left.children[0].children[0])
+        self.assertIs(right.children[0], left.children[0].children[2])
+        self.assertEqual(8, len(builder))
+        self.assertEqual((5, 8), (builder.hits, builder.misses))
+
+    def test_shared_trees_bounded(self):
+        """builders: SharedTreeBuilder should keep at most maxsize nodes"""
+        words = "( id * ( id + id ) + id ) * id * id".split()
+        parser = SLR(self.lr_gram)
+        for maxsize in (0, 1, 3, 8):
+            builder = SharedTreeBuilder(maxsize)
+            for _ in range(3):
+                tree = parser.parse(words, builder)
+                self.assertEqual(tuple(parser.parse(words).lines()),
+                                 tuple(tree.lines()))
+                self.assertLessEqual(len(builder), maxsize)
+        builder = SharedTreeBuilder(None)
+        parser.parse(words, builder)
+        self.assertEqual(builder.misses, len(builder))
+
+    def test_flat_tree(self):
+        """builders: FlatTree views should be the trees of TreeBuilder"""
+        gram = Grammar(("S -> A B c | d A B", "A -> a A |", "B -> b |"))
+        for sentence in ("c", "a b c", "a a c", "d", "d a a b"):
+            words = sentence.split()
+            for parser in (SLR(gram), LL1(gram), Earley(gram)):
+                tree = parser.parse(words)
+                flat = FlatTree(gram)
+                root = parser.parse(words, flat)
+                self.assertEqual(len(flat) - 1, root)
+                self.assertEqual(tuple(tree.lines()),
+                                 tuple(flat.root.lines()))
+                self.assertEqual(tuple(tree.rightmost()),
+                                 tuple(flat.root.rightmost()))
+                self.assertEqual(sentence, flat.root.unparse())
+                self.assertEqual(sentence, flat.unparse())
+
+    def test_flat_tree_values(self):
+        """builders: check FlatTree against known values"""
+        flat = FlatTree(self.lr_gram)
+        SLR(self.lr_gram).parse("id * ( id )".split(), flat)
+        # nodes in the order of shifts and reductions
+        names = self.lr_gram.symbol_names
+        self.assertEqual("id F T * ( id F T E ) F T E".split(),
+                         [names[i] for i in flat.symbols])
+        self.assertEqual([-1, 0, 1, -1, -1, -1, 5, 6, 7, -1, 4, 2, 11],
+                         list(flat.first_child))
+        self.assertEqual([-1, -1, 3, 10, 8, -1, -1, -1, 9, -1, -1, -1, -1],
+                         list(flat.next_sibling))
+        self.assertEqual(13, len(flat))
+        self.assertEqual(13 * 3 * 4, flat.nbytes)
+
+        root = flat.root
+        self.assertEqual(("E", 1), (root.symbol, len(root.children)))
+        self.assertEqual(flat.view(11), root.children[0])
+        self.assertEqual(["T", "*", "F"],
+                         [c.symbol for c in flat.view(11).children])
+        self.assertEqual((), flat.view(0).children)
+        paren = root.children[0].children[2].children[0]
+        self.assertEqual(flat.view(4), paren)
+        self.assertNotEqual(flat.view(4), flat.view(5))
+        self.assertEqual(1, len({flat.view(4), flat.view(4)}))
+        self.assertEqual([2, 3, 10], flat.child_indexes(11))
+        self.assertEqual([], flat.child_indexes(0))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
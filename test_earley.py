@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from builders import Actions, ReductionLog
+from earley import Earley
+from grammar import Grammar
+from slr import SLR
+
+
+class KnownValues(unittest.TestCase):
+    gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+    sentences = ("id", "id + id * id", "( id + id ) * id * ( id )")
+
+    def test_same_as_slr(self):
+        """Earley: parse() should give the SLR tree for SLR grammars"""
+        for rules, sentences in ((self.gram, self.sentences),
+                                 (("S -> a S |",), ("", "a", "a a a"))):
+            g = Grammar(rules)
+            slr, earley = SLR(g), Earley(g)
+            for sentence in sentences:
+                words = sentence.split()
+                self.assertEqual(tuple(slr.parse(words).lines()),
+                                 tuple(earley.parse(words).lines()))
+                log = earley.parse(words, ReductionLog(g))
+                ref = slr.parse(words, ReductionLog(g))
+                self.assertEqual(ref.prods, log.prods)
+                self.assertEqual(ref.positions, log.positions)
+
+    def test_any_grammar(self):
+        """Earley: parse() should accept ambiguous and cyclic grammars"""
+        for rules, sentence in (
+                (("E -> E + E | E * E | ( E ) | id",), "id + id * id + id"),
+                (("S -> A S b | x", "A -> "), "x b b"),
+                (("S -> A A a", "A -> a |"), "a a"),
+                (("S -> S | A | a", "A -> S"), "a"),
+                (("S -> S S | a |",), "a a a")):
+            tree = Earley(Grammar(rules)).parse(sentence.split())
+            self.assertEqual(sentence, tree.unparse())
+
+    def test_builder(self):
+        """Earley: parse() should call the builder like SLR"""
+        g = Grammar(self.gram)
+        actions = Actions(g, {"E -> E + T": lambda a, _, b: a + b,
+                              "T -> T * F": lambda a, _, b: a * b,
+                              "F -> ( E )": lambda _, a, __: a,
+                              "F -> id": lambda _: 2})
+        for sentence in self.sentences:
+            self.assertEqual(SLR(g).parse(sentence.split(), actions),
+                             Earley(g).parse(sentence.split(), actions))
+
+    def test_right_recursion(self):
+        """Earley: right recursion should use a constant number of items
+        per token"""
+        earley = Earley(Grammar(("S -> a S |",)))
+        for length in (10, 100, 1000):
+            earley.recognize(["a"] * length)
+            self.assertEqual(5 * length + 1, earley.nb_items)
+
+    def test_errors(self):
+        """Earley: parse() should raise NotInLanguage on bad sentences"""
+        earley = Earley(Grammar(self.gram))
+        for sentence in ("", "id +", "id + * id", "( id", "id id", "x"):
+            with self.assertRaises(Earley.NotInLanguage):
+                earley.parse(sentence.split())
+            with self.assertRaises(Earley.NotInLanguage):
+                earley.recognize(sentence.split())
+        earley.recognize(["id"])
+
+    def test_parse_many(self):
+        """Earley: parse_many() should give trees and errors in order"""
+        earley = Earley(Grammar(self.gram))
+        words = [s.split() for s in self.sentences + ("id +",)]
+        results = list(earley.parse_many(words, workers=2))
+        for sentence, tree in zip(self.sentences, results):
+            self.assertEqual(sentence, tree.unparse())
+        self.assertIsInstance(results[-1], Earley.NotInLanguage)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
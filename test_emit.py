@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+import importlib.util
+import inspect
+import io
+import os
+import tempfile
+from emit import emit_lr, emit_ll1, emit_rd
+from grammar import Grammar
+from lalr import LALR
+from ll1 import LL1
+import lltables
+import lrtables
+from slr import SLR
+
+
+def load(emitter, parser):
+    """Emit a module for parser and import it"""
+    out = io.StringIO()
+    emitter(parser, out, "test")
+    source = out.getvalue()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "generated.py")
+        with open(path, "w") as f:
+            f.write(source)
+        spec = importlib.util.spec_from_file_location("generated", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return source, module
+
+
+class KnownValues(unittest.TestCase):
+    lr_gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id",
+               "F -> [ L ]", "L -> E L |")
+    ll1_gram = ("E -> T E'", "E' -> + T E' |", "T -> F T'", "T' -> * F T' |",
+                "F -> ( E ) | id")
+    sentences = ("id", "id + id * id", "( id + id ) * id", "[ ]",
+                 "[ id id * ( id ) ] + id")
+    bad = ("", "id +", "( id", "id id", "oops", "+")
+
+    def check(self, emitter, parser, sentences):
+        source, module = load(emitter, parser)
+        self.assertNotIn("import grammar", source)
+        for sentence in sentences:
+            words = sentence.split()
+            self.assertEqual(list(parser.parse(words).lines()),
+                             list(module.parse(words).lines()))
+            self.assertIsNone(module.recognize(words))
+        for sentence in self.bad:
+            words = sentence.split()
+            with self.assertRaises(module.NotInLanguage):
+                module.parse(words)
+            with self.assertRaises(module.NotInLanguage):
+                module.recognize(words)
+
+    def test_emit_lr(self):
+        """emit: generated LR modules should parse like their parser"""
+        for parser_class in (SLR, LALR):
+            parser = parser_class(Grammar(self.lr_gram))
+            self.check(emit_lr, parser, self.sentences)
+
+    def test_emit_nonassoc(self):
+        """emit: generated LR modules should keep %nonassoc errors"""
+        rules = ("%nonassoc <", "%left +", "E -> E < E | E + E | id")
+        for parser_class in (SLR, LALR):
+            _, module = load(emit_lr, parser_class(Grammar(rules)))
+            self.assertIsNone(module.recognize("id < id + id".split()))
+            with self.assertRaises(module.NotInLanguage):
+                module.parse("id < id < id".split())
+
+    def check_tables(self, emitter, tables_module, tables, parser):
+        """The module emitted for parser should have the loops of
+        tables_module, and give the same trees and errors as tables"""
+        source, module = load(emitter, parser)
+        for f in (tables_module.parse_tables,
+                  tables_module.recognize_tables):
+            self.assertIn(inspect.getsource(f), source)
+        for sentence in self.sentences + self.bad:
+            words = sentence.split()
+            try:
+                ref = tuple(tables.parse(words).lines())
+            except tables.NotInLanguage as err:
+                with self.assertRaises(module.NotInLanguage) as cm:
+                    module.parse(words)
+                self.assertEqual(str(err), str(cm.exception))
+            else:
+                self.assertEqual(ref, tuple(module.parse(words).lines()))
+
+    def test_emit_tables(self):
+        """emit: generated modules should parse like LRTables and
+        LLTables"""
+        for parser_class in (SLR, LALR):
+            parser = parser_class(Grammar(self.lr_gram))
+            self.check_tables(emit_lr, lrtables, lrtables.LRTables(parser),
+                              parser)
+        parser = LL1(Grammar(self.ll1_gram))
+        self.check_tables(emit_ll1, lltables, lltables.LLTables(parser),
+                          parser)
+
+    def test_emit_ll1(self):
+        """emit: generated LL(1) modules should parse like LL1"""
+        parser = LL1(Grammar(self.ll1_gram))
+        self.check(emit_ll1, parser, self.sentences[:3])
+
+    def test_emit_rd(self):
+        """emit: generated recursive-descent modules should parse like
+        LL1"""
+        parser = LL1(Grammar(self.ll1_gram))
+        self.check(emit_rd, parser, self.sentences[:3])
+        self.check(lambda *args: emit_rd(*args, loops=False), parser,
+                   self.sentences[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
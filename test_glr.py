@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from builders import Builder
+from glr import GLR
+from grammar import Grammar
+from slr import SLR
+
+
+class KnownValues(unittest.TestCase):
+    ambiguous = ("E -> E + E | E * E | ( E ) | id",)
+    catalan = (1, 1, 2, 5, 14, 42, 132, 429)
+
+    def test_ambiguous(self):
+        """glr: parse() should count the trees of ambiguous sentences"""
+        glr = GLR(Grammar(self.ambiguous))
+        for ids, count in enumerate(self.catalan, 1):
+            sentence = " + ".join(["id"] * ids).split()
+            forest = glr.parse(sentence)
+            self.assertEqual(("E", 0, len(sentence)),
+                             (forest.symbol, forest.start, forest.end))
+            self.assertEqual(count, forest.count())
+
+    def test_trees(self):
+        """glr: trees() should give count() distinct trees"""
+        glr = GLR(Grammar(self.ambiguous))
+        forest = glr.parse("id + id * id + id".split())
+        trees = set(tuple(t.lines()) for t in forest.trees())
+        self.assertEqual(forest.count(), len(trees))
+        self.assertIn(tuple(forest.tree().lines()), trees)
+
+        forest = glr.parse("id + id * id".split())
+        roots = set(t.children[1].symbol for t in forest.trees())
+        self.assertEqual({"+", "*"}, roots)
+
+    def test_unambiguous(self):
+        """glr: tree() should be the SLR tree for SLR grammars"""
+        rules = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+        slr, glr = SLR(Grammar(rules)), GLR(Grammar(rules))
+        for sentence in ("id", "id + id * id", "( id + id ) * id * ( id )"):
+            forest = glr.parse(sentence.split())
+            self.assertEqual(1, forest.count())
+            self.assertEqual(tuple(slr.parse(sentence.split()).lines()),
+                             tuple(forest.tree().lines()))
+
+    def test_epsilon(self):
+        """glr: parse() should handle ε and hidden left recursion"""
+        glr = GLR(Grammar(("S -> A S b | x", "A -> ")))
+        for n in range(4):
+            forest = glr.parse(["x"] + ["b"] * n)
+            self.assertEqual(1, forest.count())
+            tree, depth = forest.tree(), 0
+            while len(tree.children) == 3:
+                tree, depth = tree.children[1], depth + 1
+            self.assertEqual(n, depth)
+
+        glr = GLR(Grammar(("S -> A A a", "A -> a |")))
+        self.assertEqual(2, glr.parse(["a", "a"]).count())
+        self.assertEqual(1, glr.parse(["a"]).count())
+
+    def test_deep(self):
+        """glr: parse() should not hit the recursion limit on deep
+        right recursion"""
+        forest = GLR(Grammar(("S -> a S | b",))).parse(["a"] * 5000 + ["b"])
+        self.assertEqual(("S", 0, 5001),
+                         (forest.symbol, forest.start, forest.end))
+        forest = GLR(Grammar(("S -> A S b | x", "A -> "))).parse(
+                ["x"] + ["b"] * 2000)
+        self.assertEqual(2001, forest.end)
+
+    def test_deep_forest(self):
+        """glr: count(), tree() and trees() should not hit the recursion
+        limit on deep forests"""
+        for rules, words in ((("S -> a S | b",), ["a"] * 3000 + ["b"]),
+                             (("S -> S a | b",), ["b"] + ["a"] * 3000)):
+            forest = GLR(Grammar(rules)).parse(words)
+            self.assertEqual(1, forest.count())
+            self.assertEqual(words, list(forest.tree().leaves()))
+            trees = list(forest.trees())
+            self.assertEqual([words], [list(t.leaves()) for t in trees])
+
+    def test_errors(self):
+        """glr: parse() should raise NotInLanguage on bad sentences"""
+        glr = GLR(Grammar(self.ambiguous))
+        for sentence in ("", "id +", "id + * id", "( id", "id id"):
+            with self.assertRaises(GLR.NotInLanguage):
+                glr.parse(sentence.split())
+            with self.assertRaises(GLR.NotInLanguage):
+                glr.recognize(sentence.split())
+        glr.recognize(["id"])
+
+    def test_parse_many(self):
+        """glr: parse_many() should give forests and errors in order"""
+        glr = GLR(Grammar(self.ambiguous))
+        words = [s.split() for s in ("id + id * id", "id +", "id")]
+        results = list(glr.parse_many(words, workers=2))
+        self.assertEqual([2, 1], [results[0].count(), results[2].count()])
+        self.assertIsInstance(results[1], GLR.NotInLanguage)
+
+        # forests are the only values, and GLR is not an SLR
+        with self.assertRaises(TypeError):
+            glr.parse(words[0], Builder())
+        with self.assertRaises(TypeError):
+            glr.parse_many(words, builder=Builder())
+        self.assertFalse(hasattr(glr, "unit_chains"))
+
+    def test_cyclic(self):
+        """glr: GLR() should raise on cyclic grammars"""
+        for rules in (("S -> S | a",), ("S -> A B | a", "A -> S", "B ->"),
+                      ("S -> A | a", "A -> B", "B -> S")):
+            with self.assertRaises(GLR.GrammarError):
+                GLR(Grammar(rules))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 # coding: utf-8
 
-from grammar import Grammar
+from grammar import Grammar, digraph
 import unittest
 import collections
 
@@ -110,6 +110,58 @@ class KnownValues(unittest.TestCase):
             for s in first:
                 self.assertEqual(first[s], g.first[s])
 
+    def test_productions_by_lhs(self):
+        """Grammar: init should index productions by lhs"""
+        g = Grammar(("S -> A | b |", "A -> A a | a", "S -> A b"))
+        self.assertEqual({"S": (0, 1, 2, 5), "A": (3, 4)},
+                         g.productions_by_lhs)
+
+    def test_symbol_ids(self):
+        """Grammar: init should intern symbols as dense ints"""
+        g = Grammar(("S -> A | b |", "A -> A a | a"))
+        self.assertEqual(len(g.symbol_names), len(g.symbols) + 2)
+        self.assertEqual(Grammar.END, g.symbol_names[Grammar.END_ID])
+        self.assertEqual("", g.symbol_names[Grammar.EMPTY_ID])
+        for s in g.symbols:
+            s_id = g.symbol_ids[s]
+            self.assertEqual(s, g.symbol_names[s_id])
+            self.assertEqual(s in g.terminals, s_id < g.first_nt_id)
+
+        for (lhs, rhs), (lhs_id, rhs_ids) in zip(g.productions,
+                                                 g.int_productions):
+            self.assertEqual(lhs, g.symbol_names[lhs_id])
+            self.assertEqual(rhs, tuple(g.symbol_names[s] for s in rhs_ids))
+
+    def test_bits(self):
+        """Grammar: bitmask sets should match their string views"""
+        g = Grammar(self.known_firsts[0][0])
+        for s in g.symbols:
+            first = g.first_bits[g.symbol_ids[s]]
+            self.assertEqual(g.first[s], g.symbols_of(first))
+            self.assertEqual(g.bits_of(g.first[s]), first)
+        for n in g.non_terminals:
+            follow = g.follow_bits[g.symbol_ids[n]]
+            self.assertEqual(g.follow[n], g.symbols_of(follow))
+
+        seq = ("A", "B", "x")
+        seq_ids = [g.symbol_ids[s] for s in seq]
+        self.assertEqual(g.first_of(seq),
+                         g.symbols_of(g.first_of_bits(seq_ids)))
+        self.assertEqual({"x", "y", "("}, g.first_of(seq))
+        self.assertEqual({"", "x", "y", "("}, g.first_of(("A", "S")))
+
+    known_nullables = [
+            (("S -> A | b |", "A -> A a | a"), {"S"}),
+            (("S -> A B", "A -> B |", "B -> A | b"), {"S", "A", "B"}),
+            (("S -> A B", "A -> a |", "B -> b"), {"A"}),
+    ]
+
+    def test_nullable(self):
+        """Grammar: init should compute nullable non-terminals"""
+        for rules, nullable in self.known_nullables:
+            g = Grammar(rules)
+            self.assertEqual(nullable, g.nullable)
+
     known_follows = [
             (
                 (
@@ -138,7 +190,15 @@ class KnownValues(unittest.TestCase):
                     "R'": {Grammar.END, ")", ".", "+", "*"},
                     "X": {Grammar.END, ")", ".", "+", "*"},
                 }
-            )
+            ),
+            (
+                ("S -> A B c | B", "A -> a", "B -> b |"),
+                {
+                    "S": {Grammar.END},
+                    "A": {"b", "c"},
+                    "B": {"c", Grammar.END},
+                }
+            ),
         ]
 
     def test_follow(self):
@@ -149,6 +209,16 @@ class KnownValues(unittest.TestCase):
             for s in follow:
                 self.assertEqual(follow[s], g.follow[s])
 
+    def test_digraph(self):
+        """Grammar: digraph() should propagate values through cycles"""
+        edges = {"a": ("b",), "b": ("c", "d"), "c": ("a",), "e": ("a",)}
+        init = {"a": {1}, "b": {2}, "c": {3}, "d": {4}, "e": {5}}
+        result = digraph("abcde", edges, init)
+        self.assertEqual({1, 2, 3, 4}, result["a"])
+        self.assertEqual({1, 2, 3, 4}, result["c"])
+        self.assertEqual({4}, result["d"])
+        self.assertEqual({1, 2, 3, 4, 5}, result["e"])
+
     pprod = (
             ("S -> A | b |", "A -> A a | a"),
             ("S -> A", "S -> b", "S -> ", "A -> A a", "A -> a"),
@@ -161,6 +231,29 @@ class KnownValues(unittest.TestCase):
         g_pprods = tuple(g.pprod(i) for i in range(len(g.productions)))
         self.assertEqual(pprods, g_pprods)
 
+    prec_rules = (
+            "%left + -",
+            "%right ^",
+            "%nonassoc UMINUS",
+            "E -> E + E | E - E | E ^ E | - E %prec UMINUS | ( E ) | id",
+    )
+
+    def test_precedence(self):
+        """Grammar: init should read precedence declarations"""
+        g = Grammar(self.prec_rules)
+        self.assertEqual({"+": (1, "left"), "-": (1, "left"),
+                          "^": (2, "right"), "UMINUS": (3, "nonassoc")},
+                         g.precedence)
+        self.assertEqual([(1, "left"), (1, "left"), (2, "right"),
+                          (3, "nonassoc"), None, None], g.prod_precedence)
+        self.assertEqual(("-", "E"), g.productions[3][1])
+        self.assertNotIn("UMINUS", g.symbols)
+
+        with self.assertRaisesRegex(ValueError, "Unknown declaration"):
+            Grammar(("%token id", "E -> id"))
+        with self.assertRaisesRegex(ValueError, "Undeclared precedence"):
+            Grammar(("E -> - E %prec UMINUS | id",))
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
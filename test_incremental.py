@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from grammar import Grammar
+from incremental import IncrementalParser
+from lalr import LALR
+from slr import SLR
+
+
+class KnownValues(unittest.TestCase):
+    gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+    sentence = "id * ( id + id ) + id * id + ( id )"
+
+    # (start, old_end, replacement)
+    edits = (
+            (0, 0, "id +"),
+            (0, 1, "( id * id )"),
+            (2, 7, "id"),
+            (3, 3, "( id ) *"),
+            (6, 6, "* id"),
+            (7, 7, "* id"),
+            (8, 11, "( id )"),
+            (11, 15, ""),
+            (14, 14, "* id"),
+            (15, 15, "+ id"),
+            (0, 15, "id"),
+    )
+
+    def test_reparse(self):
+        """incremental: reparse() should give the same trees as SLR"""
+        for parser_class in (SLR, LALR):
+            parser = parser_class(Grammar(self.gram))
+            inc = IncrementalParser(parser)
+            words = self.sentence.split()
+            tree = inc.parse(words)
+            for start, old_end, replacement in self.edits:
+                new_words = replacement.split()
+                new = words[:start] + new_words + words[old_end:]
+                edit = (start, old_end, start + len(new_words))
+                new_tree = inc.reparse(tree, edit, new)
+                self.assertEqual(tuple(parser.parse(new).lines()),
+                                 tuple(new_tree.lines()))
+
+                # then edit back
+                edit = (start, start + len(new_words), old_end)
+                back = inc.reparse(new_tree, edit, words)
+                self.assertEqual(tuple(tree.lines()), tuple(back.lines()))
+
+    def test_reuse(self):
+        """incremental: reparse() should reuse nodes outside the edit"""
+        inc = IncrementalParser(SLR(Grammar(self.gram)))
+        words = self.sentence.split()
+        tree = inc.parse(words)
+        self.assertEqual(len(words), inc.nb_shifted)
+
+        same = inc.reparse(tree, (0, 0, 0), words)
+        self.assertIs(tree, same)
+        self.assertEqual(0, inc.nb_shifted)
+
+        # only "+ ( id * id )" at the end needs to be shifted again
+        new = words[:-1] + ["*", "id", ")"]
+        new_tree = inc.reparse(tree, (14, 14, 16), new)
+        self.assertIs(tree.children[0], new_tree.children[0])
+        self.assertEqual(6, inc.nb_shifted)
+
+    def test_errors(self):
+        """incremental: reparse() should raise on bad edits or trees"""
+        parser = SLR(Grammar(self.gram))
+        inc = IncrementalParser(parser)
+        words = self.sentence.split()
+        tree = inc.parse(words)
+        with self.assertRaises(SLR.NotInLanguage):
+            inc.reparse(tree, (1, 1, 2), words[:1] + ["id"] + words[1:])
+        with self.assertRaises(ValueError):
+            inc.reparse(parser.parse(words), (0, 0, 0), words)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from lalr import LALR
+from slr import SLR
+from grammar import Grammar
+
+
+END = Grammar.END
+
+
+class KnownValues(unittest.TestCase):
+    # [TRDB] grammar (4.20) p. 229, which is not SLR
+    gram = ("S -> L = R | R", "L -> * R | id", "R -> L")
+
+    # [TRDB] Example 4.46 p. 240, by kernel of states
+    lalr_la = {
+            ((0, 1), (4, 1)): {END},  # S -> L | = R, R -> L |
+            ((4, 1),): {'=', END},  # R -> L |
+            }
+
+    def test_not_slr(self):
+        """LALR: check reference grammar is not SLR"""
+        with self.assertRaisesRegex(SLR.GrammarNotSLR, "^Shift/reduce"):
+            SLR(Grammar(self.gram))
+
+    def test_lookaheads(self):
+        """LALR: reduce actions should only use exact look-aheads"""
+        lalr = LALR(Grammar(self.gram))
+        for kernel, la in self.lalr_la.items():
+            state = lalr.ccol_idx[lalr.closure(kernel)]
+            t_la = {sym for (i, sym), (action, info) in lalr.actions.items()
+                    if i == state and action == LALR.REDUCE}
+            self.assertEqual(la, t_la)
+
+    def test_same_as_slr(self):
+        """LALR: tables should be those of SLR for this SLR grammar"""
+        gram = Grammar(("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id"))
+        slr, lalr = SLR(gram), LALR(gram)
+        self.assertEqual(slr.ccol, lalr.ccol)
+        self.assertEqual(slr.actions, lalr.actions)
+        self.assertEqual(slr.gotos, lalr.gotos)
+
+    nullable_gram = ("S -> A B c | d A B", "A -> a |", "B -> b |")
+
+    def test_nullable(self):
+        """LALR: look-aheads should go through nullable non-terminals"""
+        lalr = LALR(Grammar(self.nullable_gram))
+        for s in ("c", "a c", "b c", "a b c", "d", "d a", "d b", "d a b"):
+            self.assertEqual(s, lalr.parse(s.split()).unparse())
+
+    bad_grammars = (
+            # LR(1) but not LALR(1), [DP82] p. 620
+            (("S -> a E c | a F d | b F c | b E d", "E -> e", "F -> e"),
+             "Reduce"),
+            (("E -> E + E | id",), "Shift"),
+    )
+
+    def test_bad_grammar(self):
+        """LALR: init should raise if grammar is not LALR"""
+        for gram, action in self.bad_grammars:
+            msg_re = "^" + action + "/reduce conflict"
+            with self.assertRaisesRegex(LALR.GrammarNotLALR, msg_re):
+                LALR(Grammar(gram))
+            self.assertTrue(issubclass(LALR.GrammarNotLALR,
+                                       SLR.GrammarNotSLR))
+
+    good_sentences = ("id", "id = id", "* id = * * id", "* * id")
+    bad_sentences = ("=", "id =", "id = id = id", "* = id")
+
+    def test_parse(self):
+        """LALR: parse() should accept exactly the valid sentences"""
+        lalr = LALR(Grammar(self.gram))
+        for s in self.good_sentences:
+            self.assertEqual(s, lalr.parse(s.split()).unparse())
+        for s in self.bad_sentences:
+            with self.assertRaises(LALR.NotInLanguage):
+                lalr.parse(s.split())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -54,11 +54,13 @@ class KnownValues(unittest.TestCase):
     bad_sentences = ("a", "a b c", "b")
 
     def test_bad_sentences(self):
-        """LL1: parse() should raise on invalid sentences"""
+        """LL1: parse() and recognize() should raise on invalid sentences"""
         ll1 = LL1(Grammar(self.simple_grammar))
         for bs in self.bad_sentences:
             with self.assertRaises(LL1.NotInLanguage):
                 ll1.parse(bs.split())
+            with self.assertRaises(LL1.NotInLanguage):
+                ll1.recognize(bs.split())
 
     # for self.gram
     good_sentences = (
@@ -70,10 +72,11 @@ class KnownValues(unittest.TestCase):
     )
 
     def test_good_sentences(self):
-        """LL1: parse() should accept valid sentences"""
+        """LL1: parse() and recognize() should accept valid sentences"""
         ll1 = LL1(Grammar(self.gram))
         for s in self.good_sentences:
             ll1.parse(s.split())
+            self.assertIsNone(ll1.recognize(s.split()))
 
     ref_parse = (
             ("E -> id T | ( E ) T", "T -> + id | * id",),
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from llcode import LLCode
+from ll1 import LL1
+from grammar import Grammar
+
+
+class KnownValues(unittest.TestCase):
+    # grammar (4.11) p. 176 of [TRDB]
+    gram = ("E -> T E'", "E' -> + T E' |", "T -> F T'", "T' -> * F T' |",
+            "F -> ( E ) | id")
+
+    good_sentences = (
+            "id",
+            "id + id * id",
+            "( id + id ) * id",
+            "( ( id ) ) * ( id + id * id )",
+    )
+
+    bad_sentences = ("", "+ id", "id +", "id + + id", "id id", "( id", "x",
+                     "( id id )")
+
+    def test_parse(self):
+        """LLCode: parse() should give the same trees as LL1"""
+        ll1 = LL1(Grammar(self.gram))
+        for loops in (True, False):
+            code = LLCode(ll1, loops)
+            for s in self.good_sentences:
+                ref = tuple(ll1.parse(s.split()).lines())
+                self.assertEqual(ref, tuple(code.parse(s.split()).lines()))
+                self.assertIsNone(code.recognize(s.split()))
+            for s in self.bad_sentences:
+                with self.assertRaises(LL1.NotInLanguage):
+                    code.parse(s.split())
+                with self.assertRaises(LLCode.NotInLanguage):
+                    code.recognize(s.split())
+
+    def test_parse_empty(self):
+        """LLCode: parse() should handle empty productions"""
+        ll1 = LL1(Grammar(("S -> A B c | d A B", "A -> a |", "B -> b |")))
+        code = LLCode(ll1)
+        for s in ("c", "a b c", "d", "d b", "d a b"):
+            ref = tuple(ll1.parse(s.split()).lines())
+            self.assertEqual(ref, tuple(code.parse(s.split()).lines()))
+
+    def test_loops(self):
+        """LLCode: right recursion should not hit the recursion limit with
+        loops"""
+        ll1 = LL1(Grammar(self.gram))
+        sentence = " + id" * 5000
+        sentence = ("id" + sentence).split()
+        tree = LLCode(ll1).parse(sentence)
+        self.assertEqual("E'", tree.children[1].symbol)
+        LLCode(ll1).recognize(sentence)
+        with self.assertRaises(RecursionError):
+            LLCode(ll1, loops=False).recognize(sentence)
+
+    def test_cache(self):
+        """LLCode: identical tables should share compiled code"""
+        code1 = LLCode(LL1(Grammar(self.gram)))
+        code2 = LLCode(LL1(Grammar(self.gram)))
+        self.assertEqual(code1.source, code2.source)
+        self.assertIs(code1.parse.__code__, code2.parse.__code__)
+
+    def test_no_closures(self):
+        """LLCode: the functions for non-terminals should be defined once,
+        not in each call"""
+        for loops in (True, False):
+            code = LLCode(LL1(Grammar(self.gram)), loops)
+            defs = [line for line in code.source.splitlines()
+                    if line.lstrip().startswith("def ")]
+            self.assertEqual(2 * (1 + 5), len(defs))
+            self.assertTrue(all(line.startswith("def ") for line in defs))
+            self.assertFalse([c for c in code.parse.__code__.co_consts
+                              if hasattr(c, "co_code")])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from lltables import LLTables
+from ll1 import LL1
+from grammar import Grammar
+
+
+class KnownValues(unittest.TestCase):
+    # grammar (4.11) p. 176 of [TRDB]
+    gram = ("E -> T E'", "E' -> + T E' |", "T -> F T'", "T' -> * F T' |",
+            "F -> ( E ) | id")
+
+    def test_tables(self):
+        """LLTables: predict should match the dict table"""
+        ll1 = LL1(Grammar(self.gram))
+        tables = LLTables(ll1)
+        ids = ll1.g.symbol_ids
+        for n in ll1.g.non_terminals:
+            for t in ll1.g.terminals | {ll1.g.END}:
+                expected = ll1.table.get((n, t), -1)
+                self.assertEqual(expected, tables.predict[ids[n]][ids[t]])
+            self.assertEqual(-1, tables.predict[ids[n]][tables.unknown])
+        self.assertEqual((ids["E'"], ids["T"], ids["+"]),
+                         tables.rhs_reversed[1])
+
+    good_sentences = (
+            "id",
+            "id + id * id",
+            "( id + id ) * id",
+            "( ( id ) ) * ( id + id * id )",
+    )
+
+    bad_sentences = ("", "+ id", "id +", "id + + id", "id id", "( id", "x")
+
+    def test_parse(self):
+        """LLTables: parse() should give the same trees as LL1"""
+        ll1 = LL1(Grammar(self.gram))
+        tables = LLTables(ll1)
+        for s in self.good_sentences:
+            ref = tuple(ll1.parse(s.split()).lines())
+            self.assertEqual(ref, tuple(tables.parse(s.split()).lines()))
+            self.assertIsNone(tables.recognize(s.split()))
+        for s in self.bad_sentences:
+            with self.assertRaises(LL1.NotInLanguage):
+                tables.parse(s.split())
+            with self.assertRaises(LLTables.NotInLanguage):
+                tables.recognize(s.split())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from lalr import LALR
+from lr1 import LR1
+from slr import SLR
+from grammar import Grammar
+
+
+class KnownValues(unittest.TestCase):
+    # LR(1) but not LALR(1), [DP82] p. 620
+    gram = ("S -> a E c | a F d | b F c | b E d", "E -> e", "F -> e")
+
+    def test_not_lalr(self):
+        """LR1: check reference grammar is not LALR"""
+        with self.assertRaises(LALR.GrammarNotLALR):
+            LALR(Grammar(self.gram))
+
+    def test_split_states(self):
+        """LR1: states should only be split where merging conflicts"""
+        g = Grammar(self.gram)
+        lr1 = LR1(g)
+        # only the state [E -> e |, F -> e |] is split by prefix a or b
+        self.assertEqual(len(set(lr1.kernels)) + 1, len(lr1.kernels))
+        self.assertEqual(len(lr1.kernels), len(LR1(g, merge=False).kernels))
+
+    def test_merged_states(self):
+        """LR1: states of an LALR grammar should all be merged"""
+        g = Grammar(("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id"))
+        slr, lr1 = SLR(g), LR1(g)
+        self.assertEqual(slr.ccol, lr1.ccol)
+        self.assertEqual(slr.actions, lr1.actions)
+        self.assertEqual(slr.gotos, lr1.gotos)
+        self.assertEqual(22, len(LR1(g, merge=False).kernels))
+
+    def test_nullable(self):
+        """LR1: look-aheads should go through nullable non-terminals"""
+        lr1 = LR1(Grammar(("S -> A B c | d A B", "A -> a |", "B -> b |")))
+        for s in ("c", "a c", "b c", "a b c", "d", "d a", "d b", "d a b"):
+            self.assertEqual(s, lr1.parse(s.split()).unparse())
+
+    bad_grammars = (
+            (("S -> A | B", "A -> x", "B -> x"), "Reduce"),
+            (("E -> E + E | id",), "Shift"),
+    )
+
+    def test_bad_grammar(self):
+        """LR1: init should raise if grammar is not LR(1)"""
+        for gram, action in self.bad_grammars:
+            msg_re = "^" + action + "/reduce conflict"
+            with self.assertRaisesRegex(LR1.GrammarNotLR1, msg_re):
+                LR1(Grammar(gram))
+
+    good_sentences = ("a e c", "a e d", "b e c", "b e d")
+    bad_sentences = ("a e", "e c", "a c", "a e c d")
+
+    def test_parse(self):
+        """LR1: parse() should accept exactly the valid sentences"""
+        lr1 = LR1(Grammar(self.gram))
+        for s in self.good_sentences:
+            tree = lr1.parse(s.split())
+            lhs = "E" if s in ("a e c", "b e d") else "F"
+            self.assertEqual(lhs, tree.children[1].symbol)
+            self.assertEqual(s, tree.unparse())
+        for s in self.bad_sentences:
+            with self.assertRaises(LR1.NotInLanguage):
+                lr1.parse(s.split())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
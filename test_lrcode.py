@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from lrcode import LRCode
+from lalr import LALR
+from lr1 import LR1
+from slr import SLR
+from grammar import Grammar
+
+
+class KnownValues(unittest.TestCase):
+    gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+
+    good_sentences = (
+            "id",
+            "id + id * id",
+            "( id + id ) * id",
+            "( ( id ) ) * ( id + id * id )",
+    )
+
+    bad_sentences = ("", "+ id", "id +", "id + + id", "id id", "( id", "x")
+
+    def test_parse(self):
+        """LRCode: parse() should give the same trees as SLR"""
+        slr = SLR(Grammar(self.gram))
+        code = LRCode(slr)
+        for s in self.good_sentences:
+            ref = tuple(slr.parse(s.split()).lines())
+            self.assertEqual(ref, tuple(code.parse(s.split()).lines()))
+            self.assertIsNone(code.recognize(s.split()))
+        for s in self.bad_sentences:
+            with self.assertRaises(SLR.NotInLanguage):
+                code.parse(s.split())
+            with self.assertRaises(LRCode.NotInLanguage):
+                code.recognize(s.split())
+
+    def test_parse_empty(self):
+        """LRCode: parse() should handle empty productions"""
+        for parser_class in (LALR, LR1):
+            parser = parser_class(Grammar(("S -> A B c | d A B",
+                                           "A -> a |", "B -> b |")))
+            code = LRCode(parser)
+            for s in ("c", "a b c", "d", "d b", "d a b"):
+                ref = tuple(parser.parse(s.split()).lines())
+                self.assertEqual(ref, tuple(code.parse(s.split()).lines()))
+
+    def test_cache(self):
+        """LRCode: identical automata should share compiled code"""
+        code1 = LRCode(SLR(Grammar(self.gram)))
+        code2 = LRCode(SLR(Grammar(self.gram)))
+        self.assertEqual(code1.source, code2.source)
+        self.assertIs(code1.parse.__code__, code2.parse.__code__)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
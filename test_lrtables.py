@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from lrtables import LRTables, pack_rows
+from lalr import LALR
+from slr import SLR
+from grammar import Grammar
+
+
+class KnownValues(unittest.TestCase):
+    rows = (
+            {0: 1, 2: 2, 5: 3},
+            {},
+            {1: 4, 3: 5},
+            {0: 6, 1: 7, 2: 8, 3: 9, 4: 10, 5: 11},
+            {5: 12},
+    )
+
+    def test_pack_rows(self):
+        """LRTables: pack_rows() should preserve rows"""
+        base, value, check = pack_rows(self.rows, 6)
+        for r, row in enumerate(self.rows):
+            for c in range(6):
+                k = base[r] + c
+                if c in row:
+                    self.assertEqual(r, check[k])
+                    self.assertEqual(row[c], value[k])
+                else:
+                    self.assertNotEqual(r, check[k])
+        # rows 0, 2 and 4 fit together in less than 3 * 6 slots
+        self.assertLess(len(value), 6 * 3)
+
+    gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+
+    def test_tables(self):
+        """LRTables: actions and gotos should match the dict tables"""
+        slr = SLR(Grammar(self.gram))
+        tables = LRTables(slr)
+        ids = slr.g.symbol_ids
+        accept = -(len(slr.g.productions) + 1)
+        for (state, symbol), (action, info) in slr.actions.items():
+            code = tables.action(state, ids[symbol])
+            if action == SLR.SHIFT:
+                self.assertEqual(info + 1, code)
+            elif action == SLR.REDUCE:
+                self.assertEqual(-(info + 1), code)
+            else:
+                self.assertEqual(accept, code)
+        for state in range(len(slr.kernels)):
+            for t in slr.g.terminals | {slr.g.END}:
+                if (state, t) not in slr.actions:
+                    code = tables.action(state, ids[t])
+                    self.assertLessEqual(code, 0)  # error or default
+        for (state, symbol), target in slr.gotos.items():
+            self.assertEqual(target, tables.goto(state, ids[symbol]))
+
+    good_sentences = (
+            "id",
+            "id + id * id",
+            "( id + id ) * id",
+            "( ( id ) ) * ( id + id * id )",
+    )
+
+    bad_sentences = ("+ id", "id +", "id + + id", "id id", "( id", "x")
+
+    def test_parse(self):
+        """LRTables: parse() should give the same trees as SLR"""
+        slr = SLR(Grammar(self.gram))
+        tables = LRTables(slr)
+        for s in self.good_sentences:
+            ref = tuple(slr.parse(s.split()).lines())
+            self.assertEqual(ref, tuple(tables.parse(s.split()).lines()))
+            self.assertIsNone(tables.recognize(s.split()))
+        for s in self.bad_sentences:
+            with self.assertRaises(SLR.NotInLanguage):
+                tables.parse(s.split())
+            with self.assertRaises(LRTables.NotInLanguage):
+                tables.recognize(s.split())
+
+    def test_parse_empty(self):
+        """LRTables: parse() should handle empty productions"""
+        lalr = LALR(Grammar(("S -> A B c | d A B", "A -> a |", "B -> b |")))
+        tables = LRTables(lalr)
+        for s in ("c", "a b c", "d", "d b"):
+            ref = tuple(lalr.parse(s.split()).lines())
+            self.assertEqual(ref, tuple(tables.parse(s.split()).lines()))
+
+    def test_nonassoc(self):
+        """LRTables: %nonassoc errors should not get default reductions"""
+        rules = ("%nonassoc <", "%left +", "E -> E < E | E + E | id")
+        for parser_class in (SLR, LALR):
+            tables = LRTables(parser_class(Grammar(rules)))
+            for s in ("id < id", "id < id + id", "id + id < id"):
+                self.assertIsNone(tables.recognize(s.split()))
+            for s in ("id < id < id", "id + id < id < id"):
+                with self.assertRaises(LRTables.NotInLanguage):
+                    tables.parse(s.split())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
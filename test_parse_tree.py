@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 # coding: utf-8
 
+from io import StringIO
 from parse_tree import ParseTree as PT
 import unittest
 
@@ -107,6 +108,69 @@ class KnownValues(unittest.TestCase):
         t_unparse = self.sample_tree.unparse()
         self.assertEqual(self.sample_unparse, t_unparse)
 
+    sample_steps = (
+            (0, "E", ("T", "E'")),
+            (0, "T", ("F", "T'")),
+            (0, "F", ("id",)),
+            (1, "T'", ("",)),
+            (2, "E'", ("+", "T", "E'")),
+            (3, "T", ("F", "T'")),
+            (3, "F", ("id",)),
+            (4, "T'", ("*", "F", "T'")),
+            (5, "F", ("id",)),
+            (6, "T'", ("",)),
+            (7, "E'", ("",)),
+    )
+
+    def test_steps(self):
+        """ParseTree: check steps() against known result and derivations"""
+        self.assertEqual(self.sample_steps, tuple(self.sample_tree.steps()))
+        for rightmost in (False, True):
+            form = ["E"]
+            derivation = ["E"]
+            for position, symbol, rhs in self.sample_tree.steps(rightmost):
+                self.assertEqual(symbol, form[position])
+                form[position:position + 1] = rhs
+                derivation.append(" ".join(form))
+            self.assertEqual(self.sample_rightmost if rightmost
+                             else self.sample_leftmost, tuple(derivation))
+
+    def test_write(self):
+        """ParseTree: write_lines() and write_steps() should stream lines"""
+        out = StringIO()
+        self.sample_tree.write_lines(out)
+        self.assertEqual("\n".join(self.sample_lines) + "\n", out.getvalue())
+
+        out = StringIO()
+        self.sample_tree.write_steps(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(["E", "0 E -> T E'", "1 T' -> "],
+                         [lines[0], lines[1], lines[4]])
+        self.assertEqual(1 + len(self.sample_steps), len(lines))
+
+    def test_deep(self):
+        """ParseTree: traversals should not recurse on deep trees"""
+        # S -> a S | ε, for a sentence of a's longer than the stack
+        depth = 3000
+        tree = PT("S", [PT("")])
+        for _ in range(depth):
+            tree = PT("S", [PT("a"), tree])
+        lines = list(tree.lines())
+        self.assertEqual(2 * depth + 2, len(lines))
+        self.assertEqual("| " * (depth + 1) + "ε", lines[-1])
+        self.assertEqual(" ".join(["a"] * depth), tree.unparse())
+        self.assertEqual(depth + 1, len(list(tree.steps(True))))
+        self.assertEqual((depth, "S", ("",)), list(tree.steps())[-1])
+
+    def test_compact(self):
+        """ParseTree: nodes should have no __dict__, leaves no own list"""
+        leaves = [PT("id"), PT("+", []), PT("")]
+        for node in leaves:
+            self.assertFalse(hasattr(node, "__dict__"))
+            self.assertEqual(0, len(node.children))
+        self.assertIs(leaves[0].children, leaves[1].children)
+        self.assertEqual(2, len(self.sample_tree.children))
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
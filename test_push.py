@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+import asyncio
+from builders import ReductionLog
+from grammar import Grammar
+from lalr import LALR
+from ll1 import LL1
+from push import LL1PushParser, LRPushParser, PushParser
+from slr import SLR
+
+
+class KnownValues(unittest.TestCase):
+    lr_gram = Grammar(("E -> E + T | T", "T -> T * F | F",
+                       "F -> ( E ) | id"))
+    ll_gram = Grammar(("E -> T E'", "E' -> + T E' |", "T -> F T'",
+                       "T' -> * F T' |", "F -> ( E ) | id"))
+
+    sentences = ("id", "id + id * id", "( id + id ) * id",
+                 "( id * ( id + id ) + id ) * id * id")
+
+    def push_parsers(self):
+        """(parser, push parser class) pairs to test"""
+        return ((SLR(self.lr_gram), LRPushParser),
+                (LALR(self.lr_gram), LRPushParser),
+                (LL1(self.ll_gram), LL1PushParser))
+
+    def test_feed(self):
+        """push: feeding tokens one by one should give the same trees"""
+        for parser, push_class in self.push_parsers():
+            for sentence in self.sentences:
+                words = sentence.split()
+                push = push_class(parser)
+                for word in words:
+                    push.feed([word])
+                tree = push.feed_end()
+                self.assertEqual(tuple(parser.parse(words).lines()),
+                                 tuple(tree.lines()))
+
+    def test_builder(self):
+        """push: push parsers should use builders"""
+        for parser, push_class in self.push_parsers():
+            push = push_class(parser, ReductionLog(parser.g))
+            push.feed("( id + id ) *".split())
+            push.feed(["id"])
+            log = push.feed_end()
+            self.assertEqual("( id + id ) * id", log.unparse())
+
+    def test_can_accept(self):
+        """push: can_accept() should tell what can come next"""
+        for parser, push_class in self.push_parsers():
+            push = push_class(parser)
+            push.feed("( id".split())
+            for token, ok in (("+", True), ("*", True), (")", True),
+                              ("id", False), ("(", False), (None, False)):
+                self.assertEqual(ok, push.can_accept(token))
+            push.feed([")"])
+            self.assertTrue(push.can_accept())
+            self.assertTrue(push.can_accept("*"))
+            self.assertFalse(push.can_accept(")"))
+            push.feed_end()
+            self.assertFalse(push.can_accept())
+
+    def test_copy(self):
+        """push: copies should continue independently"""
+        for parser, push_class in self.push_parsers():
+            push = push_class(parser)
+            push.feed("id +".split())
+            other = push.copy()
+            push.feed(["id"])
+            other.feed("( id )".split())
+            self.assertEqual("id + id", push.feed_end().unparse())
+            self.assertEqual("id + ( id )", other.feed_end().unparse())
+
+    def test_errors(self):
+        """push: errors should leave the push parser unchanged"""
+        for parser, push_class in self.push_parsers():
+            push = push_class(parser)
+            push.feed("id *".split())
+            with self.assertRaises(parser.NotInLanguage):
+                push.feed(["+"])
+            with self.assertRaises(parser.NotInLanguage):
+                push.feed_end()
+            push.feed(["id"])
+            self.assertEqual("id * id", push.feed_end().unparse())
+            with self.assertRaises(parser.NotInLanguage):
+                push.feed(["id"])
+            with self.assertRaises(parser.NotInLanguage):
+                push.feed_end()
+
+    def test_async(self):
+        """push: parse_async() should read an async iterator"""
+        async def tokens(words):
+            for word in words:
+                await asyncio.sleep(0)
+                yield word
+
+        for parser, push_class in self.push_parsers():
+            words = self.sentences[-1].split()
+            push = push_class(parser)
+            tree = asyncio.run(push.parse_async(tokens(words)))
+            self.assertEqual(tuple(parser.parse(words).lines()),
+                             tuple(tree.lines()))
+
+    def test_abstract(self):
+        """push: incomplete push parser classes should not instantiate"""
+        class Incomplete(PushParser):
+            def _start(self):
+                return None
+
+        for push_class in (PushParser, Incomplete):
+            with self.assertRaises(TypeError):
+                push_class(SLR(self.lr_gram))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -23,11 +23,38 @@ $PYTHON ll1.py examples/a-star || die $LINENO
 $PYTHON ll1.py examples/g1 || die $LINENO
 $PYTHON ll1.py examples/g1 "id + id" || die $LINENO
 $PYTHON ll1.py examples/g1 "id + id + id" 2>/dev/null && die $LINENO
+$PYTHON ll1.py --emit /dev/null examples/g1 || die $LINENO
+$PYTHON ll1.py --emit-rd /dev/null examples/g1 || die $LINENO
 
 $PYTHON slr.py 2>/dev/null && die $LINENO
 $PYTHON slr.py examples/ex-4.34 || die $LINENO
 $PYTHON slr.py examples/ambiguous 2>/dev/null && die $LINENO
 $PYTHON slr.py examples/ex-4.34 "id + id * id" || die $LINENO
 $PYTHON slr.py examples/ex-4.34 "oops" 2>/dev/null && die $LINENO
+$PYTHON slr.py --emit /dev/null examples/ex-4.34 || die $LINENO
+$PYTHON slr.py --emit /dev/null 2>/dev/null && die $LINENO
+
+$PYTHON lalr.py 2>/dev/null && die $LINENO
+$PYTHON lalr.py examples/ambiguous 2>/dev/null && die $LINENO
+$PYTHON lalr.py examples/ex-4.34 "id + id * id" || die $LINENO
+$PYTHON lalr.py examples/prec "- id + id * id ^ id" || die $LINENO
+$PYTHON lalr.py examples/prec "id < id < id" 2>/dev/null && die $LINENO
+
+$PYTHON lr1.py examples/ambiguous 2>/dev/null && die $LINENO
+$PYTHON lr1.py examples/ex-4.34 "id + id * id" || die $LINENO
+
+$PYTHON earley.py 2>/dev/null && die $LINENO
+$PYTHON earley.py examples/ambiguous "id + id * id" || die $LINENO
+$PYTHON earley.py examples/a-star "a a a" || die $LINENO
+$PYTHON earley.py examples/ambiguous "id + * id" 2>/dev/null && die $LINENO
+
+$PYTHON glr.py 2>/dev/null && die $LINENO
+$PYTHON glr.py examples/ambiguous "id + id * id" || die $LINENO
+$PYTHON glr.py examples/ambiguous "id + * id" 2>/dev/null && die $LINENO
+
+$PYTHON transform.py examples/ex-4.34 || die $LINENO
+
+$PYTHON bench.py nope 2>/dev/null && die $LINENO
+$PYTHON bench.py --quick || die $LINENO
 
 echo PASSED >&2
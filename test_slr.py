@@ -83,6 +83,36 @@ class KnownValues(unittest.TestCase):
         slr = SLR(Grammar(self.gram))
         self.assertEqual(self.ccol, slr.ccol)
 
+    def test_packed_items(self):
+        """SLR: pack_item() and unpack_item() should be inverses"""
+        slr = SLR(Grammar(self.gram))
+        codes = [slr.pack_item(it) for it in self.items]
+        self.assertEqual(list(range(len(self.items))), codes)
+        for it, c in zip(self.items, codes):
+            self.assertEqual(it, slr.unpack_item(c))
+
+    def test_kernels(self):
+        """SLR: kernels should be the non-closure part of ccol"""
+        slr = SLR(Grammar(self.gram))
+        self.assertEqual(len(self.ccol), len(slr.kernels))
+        for items, kernel in zip(self.ccol, slr.kernels):
+            kernel = {slr.unpack_item(c) for c in kernel}
+            self.assertEqual(set(items), slr.closure(kernel))
+            self.assertTrue(all(it[1] > 0 or it[0] == AP for it in kernel))
+
+    def test_transitions(self):
+        """SLR: transitions should match goto() on the ccol"""
+        slr = SLR(Grammar(self.gram))
+        nb_trans = 0
+        for i, set_i in enumerate(slr.ccol):
+            for s in slr.g.symbols:
+                set_j = slr.goto(set_i, s)
+                if set_j:
+                    nb_trans += 1
+                    self.assertEqual(slr.ccol_idx[set_j],
+                                     slr.transitions[i, s])
+        self.assertEqual(nb_trans, len(slr.transitions))
+
     bad_grammars = (
             (("E -> E + E | E * E | ( E ) | id",), "Shift"),
             (("S -> A | B", "A -> x", "B -> x"), "Reduce"),
@@ -97,8 +127,52 @@ class KnownValues(unittest.TestCase):
 
     good_grammars = (
             ("E -> T * E | T", "T -> int + T | int | ( E )"),
+            ("Expr -> Expr + id | id",),
+    )
+
+    prec_gram = ("%nonassoc <", "%left + -", "%left *", "%right ^ UMINUS",
+                 "E -> E < E | E + E | E - E | E * E | E ^ E",
+                 "E -> - E %prec UMINUS | ( E ) | id")
+    prec_trees = (
+            ("id + id * id", "[id + [id * id]]"),
+            ("id * id + id", "[[id * id] + id]"),
+            ("id - id - id", "[[id - id] - id]"),
+            ("id ^ id ^ id", "[id ^ [id ^ id]]"),
+            ("- id ^ id", "[- [id ^ id]]"),
+            ("- id * id", "[[- id] * id]"),
+            ("id < id + id", "[id < [id + id]]"),
     )
 
+    @classmethod
+    def bracket(cls, tree):
+        """Sentence of tree, with operations in brackets"""
+        if not tree.children:
+            return tree.symbol
+        words = " ".join(cls.bracket(c) for c in tree.children)
+        return "[" + words + "]" if len(tree.children) > 1 else words
+
+    def test_precedence(self):
+        """SLR: precedence should resolve shift/reduce conflicts"""
+        slr = SLR(Grammar(self.prec_gram))
+        for sentence, bracketed in self.prec_trees:
+            tree = slr.parse(sentence.split())
+            self.assertEqual(bracketed, self.bracket(tree))
+        with self.assertRaises(SLR.NotInLanguage):
+            slr.parse("id < id < id".split())
+
+    def test_nonassoc_errors(self):
+        """SLR: %nonassoc errors should stay errors, or conflict"""
+        slr = SLR(Grammar(self.prec_gram))
+        (cell, dropped), = slr.errors.items()
+        self.assertEqual((cell[0], "<"), cell)
+        self.assertNotIn(cell, slr.actions)
+        for action in dropped:
+            slr._set_action(*cell, *action)
+        self.assertEqual({cell: dropped}, slr.errors)
+        with self.assertRaises(SLR.GrammarError):
+            slr._set_action(*cell, SLR.ACCEPT)
+        self.assertNotIn(cell, slr.actions)
+
     def test_good_grammar(self):
         """SLR: init should not raise if grammar is SLR"""
         for gram in self.good_grammars:
@@ -143,11 +217,13 @@ class KnownValues(unittest.TestCase):
     bad_sentences = ("+ id", "id +", "id + + id")
 
     def test_bad_sentences(self):
-        """SLR: parse() should raise on invalid sentences"""
+        """SLR: parse() and recognize() should raise on invalid sentences"""
         slr = SLR(Grammar(self.gram))
         for bs in self.bad_sentences:
             with self.assertRaises(SLR.NotInLanguage):
                 slr.parse(bs.split())
+            with self.assertRaises(SLR.NotInLanguage):
+                slr.recognize(bs.split())
 
     good_sentences = (
             "id",
@@ -158,10 +234,11 @@ class KnownValues(unittest.TestCase):
     )
 
     def test_good_sentences(self):
-        """SLR: parse() should accept valid sentences"""
+        """SLR: parse() and recognize() should accept valid sentences"""
         slr = SLR(Grammar(self.gram))
         for s in self.good_sentences:
             slr.parse(s.split())
+            self.assertIsNone(slr.recognize(s.split()))
 
     sentence = "id + id * id"
     rightmost = (
@@ -183,6 +260,31 @@ class KnownValues(unittest.TestCase):
         t_rightmost = tuple(tree.rightmost())
         self.assertEqual(t_rightmost, self.rightmost)
 
+    def test_parse_empty(self):
+        """SLR: parse() should give empty productions an ε leaf"""
+        slr = SLR(Grammar(("S -> a S |",)))
+        tree = slr.parse(["a"])
+        self.assertEqual(("S", "| a", "| S", "| | ε"), tuple(tree.lines()))
+        self.assertEqual("a", tree.unparse())
+
+    def test_unit_chains(self):
+        """SLR: parse() should skip unit reductions on demand"""
+        slr = SLR(Grammar(self.gram))
+        self.assertEqual((1, (3, 1)), slr.unit_chains[0, "F", "+"])
+        self.assertEqual((2, (3,)), slr.unit_chains[0, "F", "*"])
+        for s in self.good_sentences:
+            ref = tuple(slr.parse(s.split()).lines())
+            tree = slr.parse(s.split(), units="keep")
+            self.assertEqual(ref, tuple(tree.lines()))
+
+        # E -> T, T -> F (twice) and E -> T inside ( ) are skipped
+        tree = slr.parse("( id ) * id".split(), units="collapse")
+        self.assertEqual(("T", "| F", "| | (", "| | F", "| | | id",
+                          "| | )", "| *", "| F", "| | id"),
+                         tuple(tree.lines()))
+        with self.assertRaises(ValueError):
+            slr.parse(["id"], units="skip")
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+from builders import Actions
+from earley import Earley
+from grammar import Grammar
+from ll1 import LL1
+from lltables import LLTables
+from parse_tree import ParseTree
+from slr import SLR
+from transform import Transform
+
+
+class KnownValues(unittest.TestCase):
+    gram = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+
+    # [TRDB] (4.2) p. 176, and left-factored (4.11) p. 176
+    rules = ("E -> T E'", "E' -> + T E'", "E' -> ", "T -> F T'",
+             "T' -> * F T'", "T' -> ", "F -> ( E )", "F -> id")
+
+    # [TRDB] example 4.18 p. 177 (indirect left recursion)
+    indirect = ("S -> A a | b", "A -> A c | S d |")
+    indirect_rules = ("S -> A a", "S -> b", "A -> b d A'", "A -> A'",
+                      "A' -> c A'", "A' -> a d A'", "A' -> ")
+
+    # [TRDB] example 4.19 p. 178 (dangling else)
+    factor = ("S -> i E t S | i E t S e S | a", "E -> b")
+    factor_rules = ("S -> i E t S S'", "S -> a", "S' -> ", "S' -> e S",
+                    "E -> b")
+
+    def test_rules(self):
+        """Transform: check the transformed rules against known values"""
+        for gram, rules in ((self.gram, self.rules),
+                            (self.indirect, self.indirect_rules),
+                            (self.factor, self.factor_rules),
+                            (("S -> a B S | C", "B -> C C", "C -> "),
+                             ("S -> a S", "S -> ")),
+                            (("S -> S | a",), ("S -> a",))):
+            transform = Transform(Grammar(gram))
+            self.assertEqual(rules, transform.rules)
+
+    sentences = ("id", "id + id * id", "( id + id ) * id * ( id )",
+                 "id * id + id * ( id + id ) + id")
+
+    def test_trees(self):
+        """Transform: builder() and restore() should give the trees of
+        the original grammar"""
+        g = Grammar(self.gram)
+        slr = SLR(g)
+        transform = Transform(g)
+        ll1 = LL1(transform.grammar)
+        tables = LLTables(ll1)
+        for sentence in self.sentences:
+            words = sentence.split()
+            ref = tuple(slr.parse(words).lines())
+            tree = ll1.parse(words, transform.builder())
+            self.assertEqual(ref, tuple(tree.lines()))
+            tree = transform.restore(tables.parse(words))
+            self.assertEqual(ref, tuple(tree.lines()))
+
+    def test_empty(self):
+        """Transform: trees should keep the ε-only non-terminals"""
+        g = Grammar(("S -> a B S | C", "B -> C C", "C -> "))
+        earley = Earley(g)
+        transform = Transform(g)
+        ll1 = LL1(transform.grammar)
+        for sentence in ("", "a", "a a a"):
+            words = sentence.split()
+            self.assertEqual(tuple(earley.parse(words).lines()),
+                             tuple(ll1.parse(words,
+                                             transform.builder()).lines()))
+
+    def test_actions(self):
+        """Transform: builder() should keep left associativity"""
+        g = Grammar(("E -> E - T | E / T | T", "T -> 8 | 4 | 2 | ( E )"))
+        actions = Actions(g, {"E -> E - T": lambda a, _, b: a - b,
+                              "E -> E / T": lambda a, _, b: a / b,
+                              "T -> 8": lambda _: 8, "T -> 4": lambda _: 4,
+                              "T -> 2": lambda _: 2,
+                              "T -> ( E )": lambda _, a, __: a})
+        transform = Transform(g)
+        ll1 = LL1(transform.grammar)
+        self.assertIsInstance(ll1.parse(["8"], transform.builder()),
+                              ParseTree)
+        for sentence, value in (("8 - 4 - 2", 2), ("8 / 4 / 2", 1),
+                                ("8 - ( 4 - 2 ) / 2", 3)):
+            self.assertEqual(value, ll1.parse(sentence.split(),
+                                              transform.builder(actions)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+import unittest
+import os
+import tempfile
+from builders import FlatTree
+from grammar import Grammar
+from ll1 import LL1
+from parse_tree import ParseTree as PT
+from slr import SLR
+import test_parse_tree
+from tree_file import TreeFile, write
+
+
+class KnownValues(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tree")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def round_trip(self, tree):
+        """Write tree to a file and check its TreeFile against it"""
+        with open(self.path, "wb") as out:
+            write(tree, out)
+        with TreeFile(self.path) as tree_file:
+            self.assertEqual(tuple(tree.lines()),
+                             tuple(tree_file.root.lines()))
+            self.assertEqual(tree.unparse(), tree_file.root.unparse())
+            self.assertEqual(tree.unparse(), tree_file.unparse())
+
+    def test_known_values(self):
+        """tree_file: check the arrays of a file against known values"""
+        self.round_trip(test_parse_tree.KnownValues.sample_tree)
+        with TreeFile(self.path) as tree_file:
+            self.assertEqual(("E", "T", "F", "id", "T'", "", "E'", "+", "*"),
+                             tree_file.symbol_names)
+            self.assertEqual(19, len(tree_file))
+            self.assertEqual([0, 1, 2, 3, 4, 5, 6, 7, 1, 2, 3, 4, 8, 2, 3, 4,
+                              5, 6, 5], list(tree_file.symbols))
+            self.assertEqual([2, 2, 1, 0, 1, 0, 3, 0, 2, 1, 0, 3, 0, 1, 0,
+                              1, 0, 1, 0], list(tree_file.counts))
+            self.assertEqual([19, 5, 2, 1, 2, 1, 13, 1, 9, 2, 1, 6, 1, 2, 1,
+                              2, 1, 2, 1], list(tree_file.sizes))
+            self.assertIsInstance(tree_file.sizes, memoryview)
+            self.assertEqual(1, tree_file.sizes.itemsize)
+
+            root = tree_file.root
+            self.assertEqual(tree_file.view(6), root.children[1])
+            self.assertEqual(["+", "T", "E'"],
+                             [c.symbol for c in tree_file.view(6).children])
+            self.assertEqual((), tree_file.view(3).children)
+            self.assertEqual([7, 8, 17], tree_file.child_indexes(6))
+            self.assertNotEqual(tree_file.view(3), tree_file.view(4))
+            self.assertEqual(1, len({root, tree_file.view(0)}))
+        with self.assertRaises(ValueError):
+            root.symbol
+
+    def test_parsers(self):
+        """tree_file: trees from parsers and views should round-trip"""
+        rules = ("E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id")
+        slr = SLR(Grammar(rules))
+        words = "( id + id ) * id * ( ( id ) )".split()
+        self.round_trip(slr.parse(words))
+        flat = FlatTree(slr.g)
+        slr.parse(words, flat)
+        self.round_trip(flat.root)
+
+        ll1 = LL1(Grammar(("S -> A B c | d A B", "A -> a A |", "B -> b |")))
+        for sentence in ("c", "a b c", "d a a", "d"):
+            self.round_trip(ll1.parse(sentence.split()))
+
+        # again from a file, then the same bytes
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with TreeFile(self.path) as tree_file:
+            copy = os.path.join(self.tmp.name, "copy")
+            with open(copy, "wb") as out:
+                write(tree_file.root, out)
+        with open(copy, "rb") as f:
+            self.assertEqual(data, f.read())
+
+    def test_big(self):
+        """tree_file: deep trees and wider arrays should round-trip"""
+        tree = PT("S", [PT("")])
+        for _ in range(3000):
+            tree = PT("S", [PT("a"), tree])
+        self.round_trip(tree)
+        with TreeFile(self.path) as tree_file:
+            self.assertEqual(6002, tree_file.sizes[0])
+            self.assertEqual(2, tree_file.sizes.itemsize)
+            self.assertEqual(1, tree_file.symbols.itemsize)
+
+        tree = PT("S", [PT(str(i)) for i in range(300)])
+        self.round_trip(tree)
+        with TreeFile(self.path) as tree_file:
+            self.assertEqual(2, tree_file.symbols.itemsize)
+            self.assertEqual(300, tree_file.counts[0])
+
+    def test_errors(self):
+        """tree_file: TreeFile() should raise FormatError on bad files"""
+        with open(self.path, "wb") as out:
+            write(PT("S", [PT("a")]), out)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        bad = [data[:n] for n in range(len(data))]
+        bad.append(b"X" + data[1:])
+        bad.append(data.replace(b"BBB", b"BdB"))
+        for content in bad:
+            with open(self.path, "wb") as out:
+                out.write(content)
+            with self.assertRaises(TreeFile.FormatError):
+                TreeFile(self.path)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
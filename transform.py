@@ -0,0 +1,316 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Grammar transformations towards LL(1), with builders restoring the
+shape of the original grammar
+
+Each production of the transformed grammar has an action: a function
+taking the original builder and the values of its right-hand side, and
+returning its value. For the non-terminals of the original grammar, it
+is the value the original builder gives them; new non-terminals have
+intermediate values (lists, functions) that only make sense to the
+actions of their parents."""
+
+from builders import Builder, TreeBuilder
+from grammar import Grammar
+
+
+def _reduce(prod_nb, lhs):
+    """Action of an original production"""
+    def action(builder, values):
+        return builder.reduce(prod_nb, lhs, values)
+    return action
+
+
+def _insert(action, template):
+    """Action with the values of ε-only non-terminals inserted: template
+    has None for the values given, and the ε action of the others"""
+    def inserted(builder, values):
+        given = iter(values)
+        return action(builder, [next(given) if f is None else f(builder, [])
+                                for f in template])
+    return inserted
+
+
+def _substitute(outer, inner, length):
+    """Action of A -> δ γ, made from A -> B γ (outer) and B -> δ (inner)
+    where δ has length symbols"""
+    def substituted(builder, values):
+        first = inner(builder, values[:length])
+        return outer(builder, [first] + values[length:])
+    return substituted
+
+
+def _apply_suffixes(action):
+    """Action of A -> β A', from A -> β (action): A' is the list of
+    the left-recursive productions applied to it, last one first"""
+    def applied(builder, values):
+        value = action(builder, values[:-1])
+        for suffix_action, suffix_values in reversed(values[-1]):
+            value = suffix_action(builder, [value] + suffix_values)
+        return value
+    return applied
+
+
+def _push_suffix(action):
+    """Action of A' -> α A', from A -> A α (action)"""
+    def pushed(builder, values):
+        suffixes = values[-1]
+        suffixes.append((action, values[:-1]))
+        return suffixes
+    return pushed
+
+
+def _no_suffix(builder, values):
+    """Action of A' -> ε"""
+    return []
+
+
+def _defer(action):
+    """Action of A' -> β, from A -> α β (action): a function of the
+    values of α"""
+    def deferred(builder, values):
+        return lambda prefix: action(builder, prefix + values)
+    return deferred
+
+
+def _call_last(builder, values):
+    """Action of A -> α A', with A' -> β from _defer()"""
+    return values[-1](values[:-1])
+
+
+class Transform:
+    """Grammar equivalent to another, made closer to LL(1) by:
+    - dropping the non-terminals that only derive ε, from every rhs;
+    - removing left recursion, including indirect one, by substitution
+      then with new right-recursive non-terminals [TRDB] Algorithm 4.1
+      p. 177, only substituting non-terminals that lead back to the
+      left-hand side;
+    - left-factoring productions with common prefixes [TRDB] Algorithm
+      4.2 p. 178, repeatedly.
+
+    The result is in the grammar attribute, and may still not be LL(1),
+    eg if the original grammar is ambiguous. New non-terminals are named
+    after the one they come from, with primes. builder() and restore()
+    give values, and parse trees, in the shape of the original grammar.
+    """
+
+    def __init__(self, grammar):
+        self.original = g = grammar
+        self._taken = set(g.symbols)
+        self._order = []  # non-terminals, in order of first definition
+        self._prods = {}  # non-terminal -> list of (rhs, action)
+        for nb, (lhs, rhs) in enumerate(g.productions):
+            if lhs not in self._prods:
+                self._order.append(lhs)
+                self._prods[lhs] = []
+            self._prods[lhs].append((rhs, _reduce(nb, lhs)))
+
+        self._drop_empty()
+        self._remove_left_recursion()
+        self._left_factor()
+
+        rules = []
+        self._actions = []
+        for lhs in self._order:
+            for rhs, action in self._prods[lhs]:
+                rules.append("{} -> {}".format(lhs, " ".join(rhs)))
+                self._actions.append(action)
+        self.rules = tuple(rules)
+        self.grammar = Grammar(rules)
+        self._prod_nbs = {prod: i
+                          for i, prod in enumerate(self.grammar.productions)}
+
+    def _new_non_terminal(self, after):
+        """Fresh name for a non-terminal derived from after, defined just
+        after it"""
+        name = after + "'"
+        while name in self._taken:
+            name += "'"
+        self._taken.add(name)
+        self._order.insert(self._order.index(after) + 1, name)
+        self._prods[name] = []
+        return name
+
+    def _drop_empty(self):
+        """Remove the non-terminals whose only derivation is ε from the
+        right-hand sides, except the start symbol"""
+        empty = {}  # non-terminal -> action of its ε derivation
+        changed = True
+        while changed:
+            changed = False
+            for lhs in self._order:
+                prods = self._prods[lhs]
+                if lhs in empty or not all(all(s in empty for s in rhs)
+                                           for rhs, _ in prods):
+                    continue
+                rhs, action = prods[0]
+                empty[lhs] = _insert(action, [empty[s] for s in rhs])
+                changed = True
+        if not empty:
+            return
+
+        start = self._order[0]
+        for lhs in list(self._order):
+            if lhs in empty and lhs != start:
+                self._order.remove(lhs)
+                del self._prods[lhs]
+                continue
+            if lhs in empty:
+                self._prods[lhs] = [((), empty[lhs])]
+                continue
+            prods = []
+            for rhs, action in self._prods[lhs]:
+                if any(s in empty for s in rhs):
+                    action = _insert(action, [empty.get(s) for s in rhs])
+                    rhs = tuple(s for s in rhs if s not in empty)
+                if all(rhs != other for other, _ in prods):  # first wins
+                    prods.append((rhs, action))
+            self._prods[lhs] = prods
+
+    def _left_corners(self, symbol):
+        """Non-terminals that can start a derivation of symbol, through
+        the first symbols of productions"""
+        seen = set()
+        todo = [symbol]
+        while todo:
+            for rhs, _ in self._prods.get(todo.pop(), ()):
+                if rhs and rhs[0] in self._prods and rhs[0] not in seen:
+                    seen.add(rhs[0])
+                    todo.append(rhs[0])
+        return seen
+
+    def _remove_left_recursion(self):
+        """[TRDB] Algorithm 4.1 p. 177, substituting B in A -> B γ only
+        if B leads back to A
+
+        The algorithm assumes there are no ε-productions: otherwise
+        substitutions may not end, so there are at most as many rounds
+        of them as there are earlier non-terminals."""
+        for lhs in list(self._order):
+            earlier = set(self._order[:self._order.index(lhs)])
+            changed = True
+            for _ in range(len(earlier)):
+                if not changed:
+                    break
+                changed = False
+                prods = []
+                for rhs, action in self._prods[lhs]:
+                    first = rhs[0] if rhs else None
+                    if first in earlier and lhs in self._left_corners(first):
+                        for delta, inner in self._prods[first]:
+                            prods.append((delta + rhs[1:], _substitute(
+                                    action, inner, len(delta))))
+                        changed = True
+                    else:
+                        prods.append((rhs, action))
+                self._prods[lhs] = [p for i, p in enumerate(prods)
+                                    if all(p[0] != q[0] for q in prods[:i])]
+            self._remove_direct_recursion(lhs)
+
+    def _remove_direct_recursion(self, lhs):
+        """A -> A α | β becomes A -> β A' and A' -> α A' | ε
+        (A -> A is dropped, as it derives nothing new)"""
+        prods = self._prods[lhs]
+        recursive = [(rhs[1:], action) for rhs, action in prods
+                     if rhs[:1] == (lhs,) and len(rhs) > 1]
+        others = [(rhs, action) for rhs, action in prods
+                  if rhs[:1] != (lhs,)]
+        if not others:  # lhs derives no sentence: keep it as it is
+            return
+        if not recursive:
+            self._prods[lhs] = others
+            return
+
+        suffix = self._new_non_terminal(lhs)
+        self._prods[lhs] = [(beta + (suffix,), _apply_suffixes(action))
+                            for beta, action in others]
+        self._prods[suffix] = [(alpha + (suffix,), _push_suffix(action))
+                               for alpha, action in recursive]
+        self._prods[suffix].append(((), _no_suffix))
+
+    def _left_factor(self):
+        """[TRDB] Algorithm 4.2 p. 178: A -> α β1 | ... | α βn becomes
+        A -> α A' and A' -> β1 | ... | βn, for the longest α common to
+        productions with the same first symbol"""
+        todo = list(self._order)
+        while todo:
+            lhs = todo.pop(0)
+            prods = self._prods[lhs]
+            firsts = [rhs[0] for rhs, _ in prods if rhs]
+            shared = next((s for s in firsts if firsts.count(s) > 1), None)
+            if shared is None:
+                continue
+
+            group = [(rhs, action) for rhs, action in prods
+                     if rhs[:1] == (shared,)]
+            length = 1
+            while all(len(rhs) > length and rhs[length] == group[0][0][length]
+                      for rhs, _ in group):
+                length += 1
+            prefix = group[0][0][:length]
+
+            rest = self._new_non_terminal(lhs)
+            self._prods[rest] = [(rhs[length:], _defer(action))
+                                 for rhs, action in group]
+            position = prods.index(group[0])
+            prods = [p for p in prods if p not in group]
+            prods.insert(position, (prefix + (rest,), _call_last))
+            self._prods[lhs] = prods
+            todo[:0] = [lhs, rest]
+
+    def builder(self, builder=None):
+        """Builder for the transformed grammar, giving the values that
+        builder (by default, a TreeBuilder) gives for the original one
+
+        Reductions of the original grammar may be called in a different
+        order than an LR parser would, so this only works with builders
+        whose values only depend on their arguments, not ReductionLog."""
+        return _Restore(self._actions,
+                        TreeBuilder() if builder is None else builder)
+
+    def restore(self, tree, builder=None):
+        """Value given by builder (by default, the parse tree) in the
+        original grammar for a parse tree of the transformed grammar"""
+        restore = self.builder(builder)
+        names = self.grammar.non_terminals
+        root = []
+        # depth-first, with an explicit stack of (node, values, parent's
+        # values), a node being visited again when its values are done
+        stack = [(tree, None, root)]
+        while stack:
+            node, values, parent = stack.pop()
+            if node.symbol not in names:
+                parent.append(restore.shift(node.symbol))
+            elif values is None:
+                values = []
+                stack.append((node, values, parent))
+                stack.extend((child, None, values)
+                             for child in reversed(node.children)
+                             if child.symbol != '')
+            else:
+                rhs = tuple(c.symbol for c in node.children if c.symbol)
+                prod_nb = self._prod_nbs[node.symbol, rhs]
+                parent.append(restore.reduce(prod_nb, node.symbol, values))
+        return root[0]
+
+
+class _Restore(Builder):
+    """Builder calling the actions of a Transform with another builder"""
+
+    def __init__(self, actions, builder):
+        self._actions = actions
+        self._builder = builder
+
+    def shift(self, token):
+        return self._builder.shift(token)
+
+    def reduce(self, prod_nb, lhs, values):
+        return self._actions[prod_nb](self._builder, values)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import fileinput
+
+    transform = Transform(Grammar(fileinput.input()))
+    print("\n".join(transform.rules))
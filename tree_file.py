@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""Binary files of parse trees, loaded lazily through a memory map
+
+The file starts with a header (see _HEADER): a magic string, the byte
+order and the type codes of the arrays, then the number of symbols,
+the size of the symbol table and the number of nodes. The symbol table
+follows: the symbols in UTF-8, each one followed by a NUL byte, in order
+of first appearance. Then come three arrays, each aligned on a multiple
+of its item size, with one entry per node in preorder: the number of its
+symbol in the table, its number of children, and its number of nodes
+including itself (used to skip subtrees)."""
+
+from array import array
+from mmap import mmap, ACCESS_READ
+from parse_tree import TreeView
+import struct
+import sys
+
+_MAGIC = b"PTREE\0"
+_HEADER = struct.Struct("<6sc3sIII")
+
+
+def _typecode(largest):
+    """Smallest array type code for unsigned ints up to largest"""
+    for code in "BHI":
+        if largest < 1 << (8 * array(code).itemsize):
+            return code
+    raise OverflowError("Tree too big: {} nodes".format(largest))
+
+
+def _padding(offset, size):
+    """Bytes to add at offset to reach a multiple of size"""
+    return -offset % size
+
+
+def write(tree, out):
+    """Write tree (a ParseTree, or a view of one) to out, a binary file
+    object"""
+    ids = {}  # symbol -> number in the table
+    symbols, counts, sizes = [], [], []
+    # iterative DFS, in preorder; a node is visited a second time, as
+    # ~index, when its subtree is done, to compute its size
+    todo = [tree]
+    while todo:
+        node = todo.pop()
+        if isinstance(node, int):
+            sizes[~node] = len(sizes) + node + 1
+            continue
+        symbol = node.symbol
+        if symbol not in ids:
+            ids[symbol] = len(ids)
+        symbols.append(ids[symbol])
+        children = node.children
+        counts.append(len(children))
+        sizes.append(1)
+        if children:
+            todo.append(~(len(sizes) - 1))
+            todo.extend(reversed(children))
+
+    table = b"".join(s.encode() + b"\0" for s in ids)
+    arrays = [array(_typecode(max(a)), a) for a in (symbols, counts, sizes)]
+    byteorder = b"<" if sys.byteorder == "little" else b">"
+    codes = "".join(a.typecode for a in arrays).encode()
+    out.write(_HEADER.pack(_MAGIC, byteorder, codes, len(ids), len(table),
+                           len(symbols)))
+    out.write(table)
+    offset = _HEADER.size + len(table)
+    for a in arrays:
+        padding = _padding(offset, a.itemsize)
+        out.write(b"\0" * padding)
+        a.tofile(out)
+        offset += padding + a.itemsize * len(a)
+
+
+class TreeFile:
+    """Parse tree in a file written by write(), memory-mapped: the arrays
+    are read from the map as needed, without copies
+
+    root is a read-only view of the tree, with the methods of ParseTree;
+    each node only becomes an object when it is reached. Views are only
+    valid until close(), which is also called at the end of a with
+    statement."""
+
+    class FormatError(ValueError):
+        pass
+
+    def __init__(self, path):
+        """Map the file at path and check its header"""
+        self._map = None
+        self._views = []  # of the map, to release before closing it
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap(f.fileno(), 0, access=ACCESS_READ)
+            self._load()
+        except (struct.error, ValueError) as err:
+            self.close()
+            raise self.FormatError("Not a parse tree file: {}".format(err))
+
+    def _load(self):
+        """Decode the header and symbol table, and set the arrays as
+        views of the map"""
+        data = memoryview(self._map)
+        self._views.append(data)
+        magic, byteorder, codes, nb_symbols, table_size, nb_nodes = \
+            _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("bad magic {!r}".format(magic))
+        if byteorder.decode() != ("<" if sys.byteorder == "little" else ">"):
+            raise ValueError("byte order {!r}".format(byteorder))
+        if not nb_nodes or not set(codes.decode()) <= set("BHI"):
+            raise ValueError("bad array sizes")
+
+        offset = _HEADER.size + table_size
+        table = bytes(data[_HEADER.size:offset]).split(b"\0")
+        self.symbol_names = tuple(s.decode() for s in table[:nb_symbols])
+        if len(table) != nb_symbols + 1:
+            raise ValueError("bad symbol table")
+
+        arrays = []
+        for code in codes.decode():
+            size = array(code).itemsize
+            offset += _padding(offset, size)
+            end = offset + size * nb_nodes
+            if end > len(data):
+                raise ValueError("truncated")
+            arrays.append(data[offset:end].cast(code))
+            self._views.append(arrays[-1])
+            offset = end
+        self.symbols, self.counts, self.sizes = arrays
+
+    def close(self):
+        """Release the arrays and unmap the file"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def child_indexes(self, index):
+        """Numbers of the children of node number index: the first one
+        follows it, and each next one follows the subtree of the
+        previous one"""
+        sizes = self.sizes
+        children = []
+        child = index + 1
+        for _ in range(self.counts[index]):
+            children.append(child)
+            child += sizes[child]
+        return children
+
+    def view(self, index):
+        """ParseTree for node number index, in preorder"""
+        return TreeView(self, index)
+
+    @property
+    def root(self):
+        """ParseTree for the whole tree"""
+        return TreeView(self, 0)
+
+    def unparse(self):
+        """Return the sentence of the tree, as root.unparse() would: the
+        leaves are in order in the arrays"""
+        names = self.symbol_names
+        return " ".join(names[s] for s, c in zip(self.symbols, self.counts)
+                        if c == 0 and names[s])